@@ -16,10 +16,15 @@
 
 import requests
 import logging
+import threading
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import urllib
+from DremioHttpSession import DremioHttpSession
+from DremioPathTrie import DremioPathTrie
+from DremioCircuitBreaker import DremioCircuitBreaker
 
 ###
 # Dremio API wrapper.
@@ -52,30 +57,43 @@ class Dremio:
 	_authtoken = ""
 	_headers = ""
 	_verify_ssl = None
+	_http = None					# Pooled HTTP transport
+	_schema_trie = None				# Paths recovered from INFORMATION_SCHEMA schemas
 	# Dremio Config
 	_api_timeout = None 			# Default 10 seconds
-	_retry_timedout_source = None 	# Do not retry SOURCE that has timed out in previous API calls. Default False
+	_circuit_breaker = None 		# Skips API calls to sources that have timed out in previous API calls, None to never skip
+	_source_names = None			# Catalog entity id -> top level container name, to apply the circuit breaker to by-id calls
 	errors_encountered = 0
-	# Misc
-	_timed_out_sources = []
+	# Guards errors_encountered, API calls may be issued by worker threads
+	_lock = None
+	# Serializes reauthentication when a token expires during concurrent calls
+	_auth_lock = None
 
-	def __init__(self, endpoint, username, password, accept_eula, api_timeout=10, retry_timedout_source=False, verify_ssl=True):
+	def __init__(self, endpoint, username, password, accept_eula, api_timeout=10, retry_timedout_source=False, verify_ssl=True, http_pool_size=10, rate_limiter=None, retry_policy=None, circuit_breaker=None):
 		if not verify_ssl:
 			logging.warning("Unverified HTTPS requests will be made as per configuration.")
 			requests.packages.urllib3.disable_warnings(requests.packages.urllib3.exceptions.InsecureRequestWarning)
 		self._endpoint = endpoint
 		self._verify_ssl = verify_ssl
 		self._api_timeout = api_timeout
-		self._retry_timedout_source = retry_timedout_source
+		if circuit_breaker is not None:
+			self._circuit_breaker = circuit_breaker
+		elif not retry_timedout_source:
+			self._circuit_breaker = DremioCircuitBreaker()
+		self._source_names = {}
 		self._username = username
 		self._password = password
+		self._lock = threading.Lock()
+		self._auth_lock = threading.Lock()
+		self._http = DremioHttpSession(api_timeout, verify_ssl, http_pool_size, rate_limiter, retry_policy)
+		self._schema_trie = DremioPathTrie(self._catalog_path_exists)
 		if accept_eula:
 			self._accept_eula()
 		self._authenticate()
 
 	def _accept_eula(self):
 		headers = {"Content-Type": "application/json"}
-		response = requests.request("POST", self._endpoint + self._eula_url, headers=headers,
+		response = self._http.request("POST", self._endpoint + self._eula_url, headers=headers,
 									timeout=self._api_timeout, verify=self._verify_ssl)
 		if response.status_code != 204 and response.status_code != 200:
 			logging.critical("EULA Accept Error " + str(response.status_code))
@@ -85,7 +103,7 @@ class Dremio:
 		headers = {"Content-Type": "application/json"}
 		payload = '{"userName": "' + self._username + '","password": "' + self._password + '"}'
 		payload = payload.encode(encoding='utf-8')
-		response = requests.request("POST", self._endpoint + self._login_url, data=payload, headers=headers, timeout=self._api_timeout, verify=self._verify_ssl)
+		response = self._http.request("POST", self._endpoint + self._login_url, data=payload, headers=headers, timeout=self._api_timeout, verify=self._verify_ssl)
 		if response.status_code != 200:
 			logging.critical("Authentication Error " + str(response.status_code))
 			raise RuntimeError("Authentication error.")
@@ -93,6 +111,16 @@ class Dremio:
 		# print(self._authtoken)
 		self._headers = {"Content-Type": "application/json", "Authorization": self._authtoken}
 
+	# Reauthenticates unless another thread already replaced the headers used by a failed call
+	def _reauthenticate(self, headers):
+		with self._auth_lock:
+			if self._headers is headers:
+				self._authenticate()
+
+	def _count_error(self):
+		with self._lock:
+			self.errors_encountered = self.errors_encountered + 1
+
 	def _build_url(self, url):
 		return self._endpoint + url
 
@@ -115,23 +143,23 @@ class Dremio:
 	def get_catalog_entity_graph_by_id(self, entity_id, report_error=True):
 		return self._api_get_json(self._catalog_url + entity_id + '/' + self._graph_url_postfix, source="get_catalog_entity_graph", report_error=report_error)
 
-	def get_user(self, user_id):
-		return self._api_get_json(self._user_url + user_id, source="get_user")
+	def get_user(self, user_id, not_found=None):
+		return self._api_get_json(self._user_url + user_id, source="get_user", not_found=not_found)
 
-	def get_user_by_name(self, username):
-		return self._api_get_json(self._user_by_name_url + username, source="get_user_by_name")
+	def get_user_by_name(self, username, not_found=None):
+		return self._api_get_json(self._user_by_name_url + username, source="get_user_by_name", not_found=not_found)
 
-	def get_group(self, group_id):
-		return self._api_get_json(self._group_url + group_id, source="get_group")
+	def get_group(self, group_id, not_found=None):
+		return self._api_get_json(self._group_url + group_id, source="get_group", not_found=not_found)
 
-	def get_group_by_name(self, groupname):
-		return self._api_get_json(self._group_by_name_url + groupname, source="get_group_by_name")
+	def get_group_by_name(self, groupname, not_found=None):
+		return self._api_get_json(self._group_by_name_url + groupname, source="get_group_by_name", not_found=not_found)
 
-	def get_role(self, role_id):
-		return self._api_get_json(self._role_url + role_id, source="get_role")
+	def get_role(self, role_id, not_found=None):
+		return self._api_get_json(self._role_url + role_id, source="get_role", not_found=not_found)
 
-	def get_role_by_name(self, rolename):
-		return self._api_get_json(self._role_by_name_url + rolename, source="get_role_by_name")
+	def get_role_by_name(self, rolename, not_found=None):
+		return self._api_get_json(self._role_by_name_url + rolename, source="get_role_by_name", not_found=not_found)
 
 	def get_catalog_tags(self, entity_id):
 		return self._api_get_json(self._catalog_url + entity_id + "/collaboration/tag", source="get_catalog_tags", report_error=False)
@@ -156,7 +184,7 @@ class Dremio:
 
 	# This method has to be refactored when DX-16597 is resolved
 	def list_pds(self, sources, source_folder_filter=None, source_folder_filter_paths=None,
-				 source_folder_exclude_filter=None, pds_filter=None, pds_exclude_filter=None, pds_error_list=None):
+				 source_folder_exclude_filter=None, pds_filter=None, pds_exclude_filter=None, pds_error_list=None, page_size=100, concurrency=1):
 		pds_list = []
 		# Check filters for complete PDS suppression
 		if not sources:
@@ -218,43 +246,43 @@ class Dremio:
 		if num_rows == 0:
 			logging.warning("list_pds: no PDS found as per filter criteria.")
 			return pds_list
-		logging.info("list_pds: processing " + str(num_rows) + " PDSs in batches of 100.")
-		# Page through the results, 100 rows per page
-		limit = 100
-		for i in range(0, int(num_rows / limit) + 1):
-			logging.info("list_pds: processing batch " + str(i + 1))
-			job_result = self.get_job_result(jobid, limit * i, limit)
-			if job_result != None:
+		logging.info("list_pds: processing " + str(num_rows) + " PDSs in batches of " + str(page_size) + ".")
+		executor = ThreadPoolExecutor(max_workers=concurrency)
+		try:
+			# Result pages are fetched concurrently, PDS entities are resolved by the same workers as pages arrive.
+			# Entities are collected in the order of the result rows.
+			offsets = range(0, num_rows, page_size)
+			pages = executor.map(lambda offset: self.get_job_result(jobid, offset, page_size), offsets)
+			resolved_rows = []
+			for i, job_result in enumerate(pages):
+				logging.info("list_pds: processing batch " + str(i + 1))
+				if job_result is None:
+					logging.error("list_pds: error reading job result for jobId: " + jobid)
+					continue
+				# The schema (path) is denormalized: instead of abc/ab.c/abc it has abc.ab.c.abc, we need to recover it
+				# Every schema is normalized once before the PDSs in it are resolved
+				schemas = set([row['TABLE_SCHEMA'] for row in job_result['rows']])
+				list(executor.map(self._normalize_schema, schemas))
 				for row in job_result['rows']:
-					# The schema (path) is denormalized: instead of abc/ab.c/abc it has abc.ab.c.abc, we need to recover it
 					normalized_path = self._normalize_schema(row['TABLE_SCHEMA'])
-					entity = self.get_catalog_entity_by_path(normalized_path + row['TABLE_NAME'])
-					if entity is None:
-						if pds_error_list is not None:
-							pds_error_list.append({"name": row['TABLE_NAME'], "path": normalized_path})
-						logging.error("list_pds: error reading entity for: " + normalized_path + row['TABLE_NAME'] + " The SOURCE is likely not available at the moment. See DEBUG logging for more information.")
-					else:
-						pds_list.append(entity)
-			else:
-				logging.error("list_pds: error reading job result for jobId: " + jobid)
-
+					resolved_rows.append((row, normalized_path, executor.submit(self.get_catalog_entity_by_path, normalized_path + row['TABLE_NAME'])))
+			for row, normalized_path, future in resolved_rows:
+				entity = future.result()
+				if entity is None:
+					if pds_error_list is not None:
+						pds_error_list.append({"name": row['TABLE_NAME'], "path": normalized_path})
+					logging.error("list_pds: error reading entity for: " + normalized_path + row['TABLE_NAME'] + " The SOURCE is likely not available at the moment. See DEBUG logging for more information.")
+				else:
+					pds_list.append(entity)
+		finally:
+			executor.shutdown()
 		return pds_list
 
-	_cached_schemas = {}
 	def _normalize_schema(self, schema):
-		if schema in self._cached_schemas:
-			return self._cached_schemas[schema]
-		path = schema.split('.')
-		normalized_path = ""
-		for i in range(0, len(path)):
-			normalized_path = normalized_path + path[i]
-			entity = self.get_catalog_entity_by_path(normalized_path, report_error=False)
-			if entity is not None:
-				normalized_path = normalized_path + '/'
-			else:
-				normalized_path = normalized_path + '.'
-		self._cached_schemas[schema] = normalized_path
-		return normalized_path
+		return self._schema_trie.normalize_name(schema)
+
+	def _catalog_path_exists(self, path):
+		return self.get_catalog_entity_by_path(path, report_error=False) is not None
 
 	def create_catalog_entity(self, entity, dry_run=True):
 		if dry_run:
@@ -348,28 +376,23 @@ class Dremio:
 			return
 		return self._api_delete(self._catalog_url + entity_id, source="delete_catalog_entity", report_error = report_error)
 
-	# Returns JSON if success or None
-	def _api_get_json(self, url, source="", report_error=True, reauthenticate=False):
-		if reauthenticate:
-			self._authenticate()
-		# Extract source
-		source_name = None
-		pos = url.find(self._catalog_url_by_path)
-		if pos >= 0:
-			source_name = url[pos + 23:]
-			source_name = source_name[0:source_name.find("/")]
-		else:
-			pos = url.find(self._catalog_url)
-			if pos >= 0:
-				source_name = url[pos + 23:]
-				source_name = source_name[0:source_name.find("/")]
-
+	# Returns JSON if success, not_found if the object does not exist (HTTP 404) or None
+	def _api_get_json(self, url, source="", report_error=True, reauthenticate=False, not_found=None):
+		# Headers of this call, compared on reauthentication to not refresh a token already refreshed by another thread
+		headers = self._headers
+		source_name = self._get_source_name(url)
+		if source_name is not None and self._circuit_breaker is not None and not self._circuit_breaker.allow(source_name):
+			logging.debug(source + ": skipping API call to not responding " + source_name + ": <" + str(url) + ">")
+			return None
 		try:
-			if source_name in self._timed_out_sources and not self._retry_timedout_source:
-				raise requests.exceptions.Timeout()
-			response = requests.request("GET", self._endpoint + url, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
+			response = self._http.request("GET", self._endpoint + url, headers=headers, timeout=self._api_timeout, verify=self._verify_ssl)
+			if source_name is not None and self._circuit_breaker is not None:
+				self._circuit_breaker.record_success(source_name)
 			if response.status_code == 200:
-				return response.json()
+				json_data = response.json()
+				if self._circuit_breaker is not None:
+					self._record_source_names(url, json_data)
+				return json_data
 			elif response.status_code == 400:  # Bad Request
 				if report_error:
 					logging.info(source + ": received HTTP Response Code " + str(response.status_code) +
@@ -378,10 +401,12 @@ class Dremio:
 				if report_error:
 					logging.info(source + ": received HTTP Response Code " + str(response.status_code) +
 									" for : <" + str(url) + ">" + self._get_error_message(response))
+				return not_found
 			elif response.status_code == 401 or response.status_code == 403:
 				# Try to reauthenticate since the token might expire
 				if not reauthenticate:
-					return self._api_get_json(url, source, report_error, True)
+					self._reauthenticate(headers)
+					return self._api_get_json(url, source, report_error, True, not_found)
 				logging.critical(source + ": received HTTP Response Code " + str(response.status_code) +
 								 " for : <" + str(url) + ">" + self._get_error_message(response))
 				raise RuntimeError(
@@ -390,24 +415,47 @@ class Dremio:
 				if report_error:
 					logging.error(source + ": received HTTP Response Code " + str(response.status_code) +
 								" for : <" + str(url) + ">" + self._get_error_message(response))
-					self.errors_encountered = self.errors_encountered + 1
+					self._count_error()
 			return None
 		except requests.exceptions.Timeout:
-			if source_name is None or source_name not in self._timed_out_sources:
-				# This situation might happen when an underlying object (file system eg) is not responding
-				if report_error:
-					logging.error(source + ": HTTP Request Timed-out: " + " <" + str(url) + ">")
-					self.errors_encountered = self.errors_encountered + 1
-				else:
-					logging.info(source + ": HTTP Request Timed-out: " + " <" + str(url) + ">")
-			if source_name is not None and source_name not in self._timed_out_sources:
-				self._timed_out_sources.append(source_name)
+			# This situation might happen when an underlying object (file system eg) is not responding
+			if report_error:
+				logging.error(source + ": HTTP Request Timed-out: " + " <" + str(url) + ">")
+				self._count_error()
+			else:
+				logging.info(source + ": HTTP Request Timed-out: " + " <" + str(url) + ">")
+			if source_name is not None and self._circuit_breaker is not None:
+				self._circuit_breaker.record_failure(source_name)
+			return None
+
+	# Top level container (source, space or home) of a catalog URL, None for other URLs.
+	# By-id URLs are resolved with the ids recorded from previous catalog responses.
+	def _get_source_name(self, url):
+		pos = url.find(self._catalog_url_by_path)
+		if pos >= 0:
+			return url[pos + len(self._catalog_url_by_path):].split("/")[0]
+		pos = url.find(self._catalog_url)
+		if pos < 0:
 			return None
+		entity_id = url[pos + len(self._catalog_url):].split("/")[0].split("?")[0]
+		return self._source_names.get(entity_id)
+
+	# Records the top level container of the entity, the children or the containers listed in a catalog response
+	def _record_source_names(self, url, json_data):
+		if self._catalog_url not in url or not isinstance(json_data, dict):
+			return
+		entities = [json_data]
+		for key in ['children', 'data']:
+			if isinstance(json_data.get(key), list):
+				entities.extend(json_data[key])
+		for entity in entities:
+			if isinstance(entity, dict) and 'id' in entity and isinstance(entity.get('path'), list) and entity['path']:
+				self._source_names[entity['id']] = entity['path'][0]
 
 	# Returns JSON if success or None
 	def _api_post_json(self, url, json_data, source="", as_json=True, reauthenticate=False):
-		if reauthenticate:
-			self._authenticate()
+		# Headers of this call, compared on reauthentication to not refresh a token already refreshed by another thread
+		headers = self._headers
 		try:
 			try:
 				if json_data and isinstance(json_data, str):
@@ -416,11 +464,11 @@ class Dremio:
 				logging.error(e)
 				logging.error(f"Data: {json_data}")
 			if json_data is None:
-				response = requests.request("POST", self._endpoint + url, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
+				response = self._http.request("POST", self._endpoint + url, headers=headers, timeout=self._api_timeout, verify=self._verify_ssl)
 			elif as_json:
-				response = requests.request("POST", self._endpoint + url, json=json_data, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
+				response = self._http.request("POST", self._endpoint + url, json=json_data, headers=headers, timeout=self._api_timeout, verify=self._verify_ssl)
 			else:
-				response = requests.request("POST", self._endpoint + url, data=json_data, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
+				response = self._http.request("POST", self._endpoint + url, data=json_data, headers=headers, timeout=self._api_timeout, verify=self._verify_ssl)
 			if response.status_code == 200:
 				return response.json()
 			# Success, but no response
@@ -432,7 +480,8 @@ class Dremio:
 			elif response.status_code == 401 or response.status_code == 403:
 				# Try to reauthenticate since the token might expire
 				if not reauthenticate:
-					return self._api_post_json(url, json_data, source, as_json, False)
+					self._reauthenticate(headers)
+					return self._api_post_json(url, json_data, source, as_json, True)
 				logging.critical(source + ": received HTTP Response Code " + str(response.status_code) +
 								 " for : <" + str(url) + ">" + self._get_error_message(response))
 				raise RuntimeError(
@@ -446,20 +495,20 @@ class Dremio:
 			else:
 				logging.error(source + ": received HTTP Response Code " + str(response.status_code) +
 							  " for : <" + str(url) + ">" + self._get_error_message(response))
-			self.errors_encountered = self.errors_encountered + 1
+			self._count_error()
 			return None
 		except requests.exceptions.Timeout:
 			# This situation might happen when an underlying object (file system eg) is not responding
 			logging.error(source + ": HTTP Request Timed-out: " + " <" + str(url) + ">")
-			self.errors_encountered = self.errors_encountered + 1
+			self._count_error()
 			return None
 
 	# Returns JSON if success or None
 	def _api_put_json(self, url, json_data, source="", report_error = True, reauthenticate=False):
-		if reauthenticate:
-			self._authenticate()
+		# Headers of this call, compared on reauthentication to not refresh a token already refreshed by another thread
+		headers = self._headers
 		try:
-			response = requests.request("PUT", self._endpoint + url, json=json_data, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
+			response = self._http.request("PUT", self._endpoint + url, json=json_data, headers=headers, timeout=self._api_timeout, verify=self._verify_ssl)
 			if response.status_code == 200:
 				return response.json()
 			elif response.status_code == 400:  # The supplied CatalogEntity object is invalid.
@@ -472,7 +521,8 @@ class Dremio:
 			elif response.status_code == 401 or response.status_code == 403:
 				# Try to reauthenticate since the token might expire
 				if not reauthenticate:
-					return self._api_put_json(url, json_data, source, report_error, False)
+					self._reauthenticate(headers)
+					return self._api_put_json(url, json_data, source, report_error, True)
 				logging.critical(source + ": received HTTP Response Code " + str(response.status_code) +
 								 " for : <" + str(url) + ">" + self._get_error_message(response))
 				raise RuntimeError(
@@ -494,20 +544,20 @@ class Dremio:
 				else:
 					logging.debug(source + ": received HTTP Response Code " + str(response.status_code) +
 								  " for : <" + str(url) + ">" + self._get_error_message(response))
-			self.errors_encountered = self.errors_encountered + 1
+			self._count_error()
 			return None
 		except requests.exceptions.Timeout:
 			# This situation might happen when an underlying object (file system eg) is not responding
 			logging.error(source + ": HTTP Request Timed-out: " + " <" + str(url) + ">")
-			self.errors_encountered = self.errors_encountered + 1
+			self._count_error()
 			return None
 
 	# Returns JSON if success or None
 	def _api_delete(self, url, source="", report_error = True, reauthenticate=False):
-		if reauthenticate:
-			self._authenticate()
+		# Headers of this call, compared on reauthentication to not refresh a token already refreshed by another thread
+		headers = self._headers
 		try:
-			response = requests.request("DELETE", self._endpoint + url, headers=self._headers, timeout=self._api_timeout, verify=self._verify_ssl)
+			response = self._http.request("DELETE", self._endpoint + url, headers=headers, timeout=self._api_timeout, verify=self._verify_ssl)
 			if response.status_code == 200:
 				if response.text == '':
 					# if text is empty then response.json() fails, e.g. delete reflections return 200 and empty text.
@@ -525,7 +575,8 @@ class Dremio:
 			elif response.status_code == 401 or response.status_code == 403:
 				# Try to reauthenticate since the token might expire
 				if not reauthenticate:
-					return self._api_delete(url, source, report_error, False)
+					self._reauthenticate(headers)
+					return self._api_delete(url, source, report_error, True)
 				logging.critical(source + ": received HTTP Response Code " + str(response.status_code) +
 								 " for : <" + str(url) + ">" + self._get_error_message(response))
 				raise RuntimeError(
@@ -547,12 +598,12 @@ class Dremio:
 				else:
 					logging.debug(source + ": received HTTP Response Code " + str(response.status_code) +
 								  " for : <" + str(url) + ">" + self._get_error_message(response))
-			self.errors_encountered = self.errors_encountered + 1
+			self._count_error()
 			return None
 		except requests.exceptions.Timeout:
 			# This situation might happen when an underlying object (file system eg) is not responding
 			logging.error(source + ": HTTP Request Timed-out: " + " <" + str(url) + ">")
-			self.errors_encountered = self.errors_encountered + 1
+			self._count_error()
 			return None
 
 	def _get_error_message(self, response):
@@ -0,0 +1,174 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+from DremioClonerUtils import DremioClonerUtils
+from DremioClonerLogger import DremioClonerLogger
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+
+###
+# Snapshot of the target catalog used by DremioWriter for existence checks.
+# The snapshot is taken once: every top-level container is listed, and the tree of every Space and Home
+# is crawled, keeping container entities and the ids of datasets. Path lookups are then answered from the
+# snapshot. A path directly under a crawled container that is not in the snapshot does not exist, so no API call
+# is needed. Containers whose entity could not be retrieved are not crawled, paths under them are looked up. Dataset entities are retrieved by id on first use. Paths in Sources are not crawled and are always
+# looked up with the API. The writer keeps the snapshot current by reporting created, updated and deleted entities.
+###
+class DremioCatalogSnapshot:
+
+	# Dremio Cloner Config, Utils, ...
+	_config = None
+	_utils = None
+	_logger = None
+
+	# Dremio object pointing to the target environment
+	_dremio_env = None
+
+	# Catalog entries keyed by lower case normalized path. Full entities, or stubs with an id only for datasets.
+	_entities = None
+	_stubs = None
+	# Keys of containers whose children are all in the snapshot, "" for the list of top-level containers
+	_crawled_keys = None
+	# Keys whose existence is unknown after a failed write, they are looked up with the API
+	_unknown_keys = None
+	_lock = None
+
+	_hits = 0
+	_misses = 0
+
+	def __init__(self, dremio_env, config):
+		self._config = config
+		self._dremio_env = dremio_env
+		self._logger = DremioClonerLogger(self._config.max_errors, self._config.logging_verbose)
+		self._utils = DremioClonerUtils(config)
+		self._entities = {}
+		self._stubs = {}
+		self._crawled_keys = set()
+		self._unknown_keys = set()
+		self._lock = threading.Lock()
+
+	def load(self):
+		self._logger.info("load: taking snapshot of the target catalog.")
+		catalog = self._dremio_env.list_catalog()
+		if catalog is None:
+			self._logger.error("load: unable to list target catalog, snapshot is not used.")
+			return
+		# Every top-level container is listed, a lookup of any other top-level path can be answered
+		self._crawled_keys.add("")
+		level = []
+		for container in catalog['data']:
+			self._stubs[self._get_key(container['path'])] = container
+			if container['containerType'] in ["SPACE", "HOME"]:
+				level.append(container)
+		executor = ThreadPoolExecutor(max_workers=self._config.concurrency)
+		try:
+			while len(level) > 0:
+				next_level = []
+				for stub, entity in zip(level, executor.map(self._get_container_entity, level)):
+					# Paths under a container that could not be retrieved are looked up with the API
+					if entity is None:
+						continue
+					self._entities[self._get_key(stub['path'])] = entity
+					self._crawled_keys.add(self._get_key(stub['path']))
+					for child in entity.get('children', []):
+						self._stubs[self._get_key(child['path'])] = child
+						if child['type'] == 'CONTAINER':
+							next_level.append(child)
+				level = next_level
+		finally:
+			executor.shutdown()
+		self._logger.info("load: snapshot contains " + str(len(self._stubs)) + " catalog entries.")
+
+	def _get_container_entity(self, stub):
+		entity = self._dremio_env.get_catalog_entity_by_id(stub['id'])
+		if entity is None:
+			self._logger.error("load: cannot retrieve entity for " + self._utils.get_entity_desc(stub))
+		return entity
+
+	# Same contract as Dremio.get_catalog_entity_by_path
+	def get_catalog_entity_by_path(self, path):
+		key = self._get_key(path)
+		with self._lock:
+			if key in self._entities:
+				self._hits += 1
+				return self._entities[key]
+			stub = self._stubs.get(key)
+			if stub is None and key not in self._unknown_keys and self._is_crawled(key):
+				self._hits += 1
+				return None
+			self._misses += 1
+		if stub is not None:
+			entity = self._dremio_env.get_catalog_entity_by_id(stub['id'])
+		else:
+			entity = self._dremio_env.get_catalog_entity_by_path(path)
+		if entity is not None:
+			with self._lock:
+				self._entities[key] = entity
+				self._unknown_keys.discard(key)
+		return entity
+
+	# True if the children of the parent container of key are all in the snapshot
+	def _is_crawled(self, key):
+		parent_key = key.rsplit('/', 1)[0] if '/' in key else ""
+		# Homes of other users are not listed in the catalog
+		if parent_key == "" and key[:1] == '@':
+			return False
+		return parent_key in self._crawled_keys
+
+	# Record the entity returned by Dremio after it has been created, updated or promoted
+	def update(self, entity):
+		path = entity['path'] if 'path' in entity else [entity['name']]
+		key = self._get_key(path)
+		with self._lock:
+			self._entities[key] = entity
+			self._stubs[key] = {'id': entity['id'], 'path': path}
+			self._unknown_keys.discard(key)
+			# A newly created space or folder is empty, so its children are known
+			if entity.get('entityType') in ['space', 'folder'] and 'children' in entity and len(entity['children']) == 0:
+				self._crawled_keys.add(key)
+
+	# Forget the entity after a failed write, the next lookup will retrieve it from Dremio
+	def invalidate(self, path):
+		key = self._get_key(path)
+		with self._lock:
+			self._entities.pop(key, None)
+			if key not in self._stubs:
+				self._unknown_keys.add(key)
+
+	# Forget a deleted entity and everything under it. Deletion results are not reported by the API,
+	# so these paths are looked up with the API again if needed.
+	def remove(self, entity):
+		key = self._get_key(entity['path'] if 'path' in entity else [entity['name']])
+		with self._lock:
+			removed_keys = set([key])
+			if entity.get('entityType') in ['folder', 'space']:
+				removed_keys.update([k for k in self._stubs if k.startswith(key + '/')])
+				removed_keys.update([k for k in self._entities if k.startswith(key + '/')])
+			for removed_key in removed_keys:
+				self._entities.pop(removed_key, None)
+				self._stubs.pop(removed_key, None)
+				self._crawled_keys.discard(removed_key)
+			self._unknown_keys.update(removed_keys)
+
+	def get_stats_desc(self):
+		return "catalog snapshot: " + str(self._hits) + " hit(s), " + str(self._misses) + " miss(es)"
+
+	def _get_key(self, path):
+		path = self._utils.normalize_path(path)
+		if path[:1] == '/':
+			path = path[1:]
+		return path.lower()
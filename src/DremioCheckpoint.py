@@ -0,0 +1,116 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+from DremioClonerLogger import DremioClonerLogger
+import json
+import os
+import threading
+
+
+###
+# Progress journal of a "get" or "put" command, used to resume a run that did not finish.
+# The journal is an append-only JSON Lines file: a header line with the command, then one line for
+# every completed unit of work, {"kind": ..., "key": ..., "data": ...}. Lines are written as soon as the
+# work is completed, so an interrupted run leaves a journal of everything it has done.
+# When resuming, the journal is loaded and extended, otherwise it is started over.
+###
+class DremioCheckpoint:
+
+	# Dremio Cloner Config, Logger
+	_config = None
+	_logger = None
+
+	_filename = None
+	_file = None
+	_lock = None
+	# Data of completed work keyed by (kind, key)
+	_completed = None
+	# (kind, key) of completed work skipped by this run
+	_resumed = None
+
+	def __init__(self, config):
+		self._config = config
+		self._logger = DremioClonerLogger(self._config.max_errors, self._config.logging_verbose)
+		self._filename = self._config.checkpoint_filename
+		self._lock = threading.Lock()
+		self._completed = {}
+		self._resumed = set()
+
+	def open(self):
+		if self._config.checkpoint_resume and os.path.isfile(self._filename):
+			self._load()
+			self._file = open(self._filename, "a", encoding="utf-8", buffering=1)
+		else:
+			if self._config.checkpoint_resume:
+				self._logger.warn("open: checkpoint " + self._filename + " not found, starting from the beginning.")
+			self._file = open(self._filename, "w", encoding="utf-8", buffering=1)
+			self._file.write(json.dumps({"command": self._config.command}) + "\n")
+
+	def _load(self):
+		f = open(self._filename, "r", encoding="utf-8")
+		lines = f.readlines()
+		f.close()
+		header = json.loads(lines[0]) if len(lines) > 0 else {}
+		if header.get('command') != self._config.command:
+			self._logger.fatal("_load: checkpoint " + self._filename + " was not written by command '" + self._config.command + "'.")
+		for i in range(1, len(lines)):
+			try:
+				item = json.loads(lines[i])
+			except json.JSONDecodeError:
+				# The last line may have been cut short when the previous run was interrupted
+				if i == len(lines) - 1:
+					self._logger.warn("_load: ignoring incomplete last line of checkpoint " + self._filename)
+					self._truncate(sum(len(line.encode("utf-8")) for line in lines[:i]))
+					break
+				raise
+			self._completed[(item['kind'], item['key'])] = item.get('data')
+		self._logger.info("_load: resuming with " + str(len(self._completed)) + " completed item(s) from checkpoint " + self._filename)
+
+	def _truncate(self, size):
+		f = open(self._filename, "r+", encoding="utf-8")
+		f.truncate(size)
+		f.close()
+
+	def is_completed(self, kind, key):
+		return (kind, key) in self._completed
+
+	# Returns the data recorded with completed work, None if the work was not completed
+	def get_data(self, kind, key):
+		return self._completed.get((kind, key))
+
+	def complete(self, kind, key, data=None):
+		line = json.dumps({"kind": kind, "key": key, "data": data}) + "\n"
+		with self._lock:
+			self._completed[(kind, key)] = data
+			self._file.write(line)
+
+	def count_resumed(self, kind, key):
+		with self._lock:
+			self._resumed.add((kind, key))
+
+	def get_stats_desc(self):
+		return "checkpoint: " + str(len(self._resumed)) + " completed item(s) skipped, resumed from " + self._filename
+
+	def close(self):
+		if self._file is not None:
+			self._file.close()
+			self._file = None
+
+	# Called when the command has finished, a later run starts from the beginning
+	def remove(self):
+		self.close()
+		if os.path.isfile(self._filename):
+			os.remove(self._filename)
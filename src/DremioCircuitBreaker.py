@@ -0,0 +1,96 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import logging
+import threading
+import time
+
+
+###
+# Per source circuit breaker for the Dremio and DremioCloud API wrappers.
+# A source is closed (calls go through) until a number of consecutive calls time out. It is then open:
+# calls are skipped until the cool-down has elapsed. It is then half-open: a single trial call goes through,
+# the source is closed again if the call succeeds, or open for another cool-down if it times out.
+###
+class DremioCircuitBreaker:
+
+	CLOSED = 'closed'
+	OPEN = 'open'
+	HALF_OPEN = 'half-open'
+
+	_failure_threshold = 1
+	_cool_down = None
+	# Source name -> {'state', 'failures', 'opened_at', 'trial'}
+	_sources = None
+	_lock = None
+
+	# Run metrics
+	_opened = 0
+	_skipped = 0
+	_recovered = 0
+
+	def __init__(self, failure_threshold=1, cool_down=60.0):
+		self._failure_threshold = failure_threshold
+		self._cool_down = cool_down
+		self._sources = {}
+		self._lock = threading.Lock()
+
+	# Returns False if a call to the source must be skipped
+	def allow(self, source_name):
+		with self._lock:
+			source = self._sources.get(source_name)
+			if source is None or source['state'] == self.CLOSED:
+				return True
+			if source['state'] == self.OPEN and time.monotonic() - source['opened_at'] >= self._cool_down:
+				source['state'] = self.HALF_OPEN
+				source['trial'] = False
+			if source['state'] == self.HALF_OPEN and not source['trial']:
+				source['trial'] = True
+				return True
+			self._skipped += 1
+			return False
+
+	def record_success(self, source_name):
+		with self._lock:
+			source = self._sources.get(source_name)
+			if source is None:
+				return
+			if source['state'] != self.CLOSED:
+				self._recovered += 1
+				logging.info("DremioCircuitBreaker: source " + source_name + " is responding again.")
+			del self._sources[source_name]
+
+	def record_failure(self, source_name):
+		with self._lock:
+			source = self._sources.setdefault(source_name, {'state': self.CLOSED, 'failures': 0, 'opened_at': None, 'trial': False})
+			source['failures'] += 1
+			if source['state'] == self.HALF_OPEN or source['failures'] >= self._failure_threshold:
+				if source['state'] == self.CLOSED:
+					self._opened += 1
+				source['state'] = self.OPEN
+				source['opened_at'] = time.monotonic()
+				logging.warning("DremioCircuitBreaker: source " + source_name + " is not responding, skipping its API calls for " + str(self._cool_down) + " seconds.")
+
+	def get_state(self, source_name):
+		with self._lock:
+			source = self._sources.get(source_name)
+			return self.CLOSED if source is None else source['state']
+
+	def get_stats_desc(self):
+		with self._lock:
+			not_closed = [name for name in self._sources if self._sources[name]['state'] != self.CLOSED]
+		return "circuit breaker: " + str(self._opened) + " source(s) opened, " + str(self._recovered) + " recovered, " + \
+			str(self._skipped) + " API call(s) skipped, not responding: " + str(sorted(not_closed))
@@ -46,12 +46,16 @@ class DremioClonerConfig():
 	source_password = None
 	source_filename = None
 	source_directory = None
+	source_streaming = False # decode the source file one entity at a time
 	source_ce = False
 	source_graph_support = False
 	source_rbac = False
 	source_dremio_cloud = False
 	source_dremio_cloud_org_id = None
 	source_dremio_cloud_project_id = None
+	source_rate_limit = 0 # max API calls per second, 0 for no limit
+	source_max_concurrency = 0 # max API calls in flight adjusted to the load of the environment, 0 for no limit
+	source_latency_target_ms = 1000 # API calls answered faster let the number of calls in flight grow
 
 	job_sql = None
 	# Target Dremio Environment definition
@@ -64,15 +68,33 @@ class DremioClonerConfig():
 	target_filename = None
 	target_directory = None
 	target_file_or_dir_overwrite = False
+	target_streaming = False # write entities to the target file as they are read
 	target_type = None
 	target_dremio_cloud = False
 	target_dremio_cloud_org_id = None
 	target_dremio_cloud_project_id = None
+	target_rate_limit = 0
+	target_max_concurrency = 0
+	target_latency_target_ms = 1000
 	container_filename = "___container.json"
 	dremio_conf_filename = "___dremio_cloner_conf.json"
 	# Options
 	max_errors = 9999
 	http_timeout = 10 # seconds
+	http_pool_size = 10 # max pooled keep-alive connections per Dremio environment
+	concurrency = 1 # number of worker threads issuing API calls
+	api_retry_max_attempts = 1 # attempts of an API call failing with a transient error, 1 for no retry
+	api_retry_backoff_ms = 500 # wait before the first retry, doubled for every further retry
+	api_retry_max_backoff_ms = 30000
+	api_retry_jitter = True # wait a random time up to the backoff
+	api_retry_status_codes = [429, 502, 503, 504]
+	file_processes = 0 # number of processes encoding and decoding JSON files of a directory
+	sql_processes = 0 # number of processes parsing VDS SQL in bulk
+	catalog_snapshot = False # answer put existence checks from a snapshot of the target catalog
+	diff_skip_unchanged = False # skip put updates of entities identical to the target
+	baseline_filename = None # previous get JSON file, datasets with an unchanged version are carried forward from it
+	checkpoint_filename = None # progress journal of get and put, used to resume an interrupted run
+	checkpoint_resume = False # set by the --resume command line flag
 	# Logging options
 	logging_level = logging.INFO
 	logging_format = "%(levelname)s:%(asctime)s:%(message)s"
@@ -105,10 +127,13 @@ class DremioClonerConfig():
 	source_ignore_missing_acl_user = False	# Flag to write a Source if an ACL user is missing in the target Dremio environment
 	source_ignore_missing_acl_group = False	# Flag to write a Source if an ACL group is missing in the target Dremio environment
 	source_retry_timedout = False			# Flag to retry Sources that timed out
+	source_circuit_breaker_failures = 1		# Number of consecutive timeouts after which API calls to a Source are skipped
+	source_circuit_breaker_cool_down = 60	# Seconds after which a Source that timed out is tried again
 	folder_process_mode = None				# Flag to process Folder: process, skip, create_only, update_only, create_overwrite, create_overwrite_delete
 	folder_ignore_missing_acl_user = False	# Flag to write a Folder if an ACL user is missing in the target Dremio environment
 	folder_ignore_missing_acl_group = False	# Flag to write a Folder if an ACL group is missing in the target Dremio environment
 	pds_list_useapi = False					# Using API for listing PDS may cause issues when the source is not available at the runtime
+	pds_list_page_size = 100				# INFORMATION_SCHEMA rows retrieved per job result page, up to 500
 	pds_filter = None						# Filter for PDS
 	pds_filter_names = []  					# List of PDSs to process if not empty
 	pds_exclude_filter = None				# Exclusion Filter for PDS
@@ -234,6 +259,8 @@ class DremioClonerConfig():
 				self.target_directory = item['directory']
 			elif 'overwrite' in item:
 				self.target_file_or_dir_overwrite = self._bool(item, 'overwrite')
+			elif 'streaming' in item:
+				self.target_streaming = self._bool(item, 'streaming')
 			elif 'verify_ssl' in item:
 				self.target_verify_ssl = self._bool(item, 'verify_ssl')
 			elif 'is_community_edition' in item:
@@ -246,6 +273,12 @@ class DremioClonerConfig():
 				self.target_dremio_cloud_org_id = item['dremio_cloud_org_id']
 			elif 'dremio_cloud_project_id' in item:
 				self.target_dremio_cloud_project_id = item['dremio_cloud_project_id']
+			elif 'rate_limit' in item:
+				self.target_rate_limit = self._int(item, 'rate_limit')
+			elif 'max_concurrency' in item:
+				self.target_max_concurrency = self._int(item, 'max_concurrency')
+			elif 'latency_target_ms' in item:
+				self.target_latency_target_ms = self._int(item, 'latency_target_ms')
 
 	def _process_source(self, json_conf):
 		for item in json_conf['source']:
@@ -259,6 +292,8 @@ class DremioClonerConfig():
 				self.source_filename = item['filename']
 			elif 'directory' in item:
 				self.source_directory = item['directory']
+			elif 'streaming' in item:
+				self.source_streaming = self._bool(item, 'streaming')
 			elif 'verify_ssl' in item:
 				self.source_verify_ssl = self._bool(item, 'verify_ssl')
 			elif 'is_community_edition' in item:
@@ -275,6 +310,12 @@ class DremioClonerConfig():
 				self.source_dremio_cloud_org_id = item['dremio_cloud_org_id']
 			elif 'dremio_cloud_project_id' in item:
 				self.source_dremio_cloud_project_id = item['dremio_cloud_project_id']
+			elif 'rate_limit' in item:
+				self.source_rate_limit = self._int(item, 'rate_limit')
+			elif 'max_concurrency' in item:
+				self.source_max_concurrency = self._int(item, 'max_concurrency')
+			elif 'latency_target_ms' in item:
+				self.source_latency_target_ms = self._int(item, 'latency_target_ms')
 
 	def _process_options(self, json_conf):
 		for item in json_conf['options']:
@@ -292,6 +333,32 @@ class DremioClonerConfig():
 				self.logging_verbose  = self._bool(item, 'logging.verbose')
 			elif 'http_timeout' in item:
 				self.http_timeout = self._int(item, 'http_timeout')
+			elif 'http_pool_size' in item:
+				self.http_pool_size = self._int(item, 'http_pool_size')
+			elif 'concurrency' in item:
+				self.concurrency = self._int(item, 'concurrency')
+			elif 'api.retry.max_attempts' in item:
+				self.api_retry_max_attempts = self._int(item, 'api.retry.max_attempts')
+			elif 'api.retry.backoff_ms' in item:
+				self.api_retry_backoff_ms = self._int(item, 'api.retry.backoff_ms')
+			elif 'api.retry.max_backoff_ms' in item:
+				self.api_retry_max_backoff_ms = self._int(item, 'api.retry.max_backoff_ms')
+			elif 'api.retry.jitter' in item:
+				self.api_retry_jitter = self._bool(item, 'api.retry.jitter')
+			elif 'api.retry.status_codes' in item:
+				self.api_retry_status_codes = [int(code) for code in (self._str_array(item, 'api.retry.status_codes') or [])]
+			elif 'file.processes' in item:
+				self.file_processes = self._int(item, 'file.processes')
+			elif 'sql.processes' in item:
+				self.sql_processes = self._int(item, 'sql.processes')
+			elif 'diff.skip_unchanged' in item:
+				self.diff_skip_unchanged = self._bool(item, 'diff.skip_unchanged')
+			elif 'baseline.filename' in item:
+				self.baseline_filename = self._str(item, 'baseline.filename')
+			elif 'checkpoint.filename' in item:
+				self.checkpoint_filename = self._str(item, 'checkpoint.filename')
+			elif 'catalog.snapshot' in item:
+				self.catalog_snapshot = self._bool(item, 'catalog.snapshot')
 			elif 'user.process_mode' in item:
 				self.user_process_mode = self._str(item, 'user.process_mode')
 			elif 'group.process_mode' in item:
@@ -353,6 +420,10 @@ class DremioClonerConfig():
 				self.source_ignore_missing_acl_group = self._bool(item, 'source.ignore_missing_acl_group')
 			elif 'source.retry_timedout' in item:
 				self.source_retry_timedout = self._bool(item, 'source.retry_timedout')
+			elif 'source.circuit_breaker.failures' in item:
+				self.source_circuit_breaker_failures = self._int(item, 'source.circuit_breaker.failures')
+			elif 'source.circuit_breaker.cool_down' in item:
+				self.source_circuit_breaker_cool_down = self._int(item, 'source.circuit_breaker.cool_down')
 			elif 'folder.process_mode' in item:
 				self.folder_process_mode = self._str(item, 'folder.process_mode')
 			elif 'folder.ignore_missing_acl_user' in item:
@@ -363,6 +434,8 @@ class DremioClonerConfig():
 				self.pds_process_mode = self._str(item, 'pds.process_mode')
 			elif 'pds.list.useapi' in item:
 				self.pds_list_useapi = self._bool(item, 'pds.list.useapi')
+			elif 'pds.list.page_size' in item:
+				self.pds_list_page_size = self._int(item, 'pds.list.page_size')
 			elif 'pds.filter' in item:
 				self.pds_filter = self._str(item, 'pds.filter')
 				self._pds_filter_re = self._compile_pattern(self.pds_filter)
@@ -468,6 +541,14 @@ class DremioClonerConfig():
 			     	self.vds_process_mode != 'create_only' and self.vds_process_mode != 'create_overwrite' and
 				 	self.vds_process_mode != 'create_overwrite_delete' ))):
 			self._logger.fatal("Invalid configuration for vds.process_mode.")
+		if self.command == self.CMD_GET and self.target_streaming and self.target_filename is None:
+			self._logger.fatal("Invalid configuration for 'streaming', a target filename must be defined.")
+		if self.checkpoint_filename is not None and self.command != self.CMD_GET and self.command != self.CMD_PUT:
+			self._logger.fatal("Invalid configuration for checkpoint.filename, only supported by commands 'get' and 'put'.")
+		if self.api_retry_max_attempts < 1:
+			self._logger.fatal("Invalid configuration for api.retry.max_attempts, must be at least 1.")
+		if self.pds_list_page_size < 1 or self.pds_list_page_size > 500:
+			self._logger.fatal("Invalid configuration for pds.list.page_size, must be between 1 and 500.")
 		# Make sure we do not overwrite JSON environment file
 		if (self.command == self.CMD_GET and self.target_filename is not None and not self.target_file_or_dir_overwrite and os.path.isfile(self.target_filename)):
 			self._logger.fatal("File " + str(self.target_filename) + " already exists. Cannot overwrite.")
@@ -17,6 +17,7 @@
 import fnmatch, re
 from DremioClonerUtils import DremioClonerUtils
 from DremioClonerLogger import DremioClonerLogger
+from DremioFilterPlan import DremioFilterPlan, get_path_prefixes
 
 class DremioClonerFilter():
 
@@ -24,10 +25,20 @@ class DremioClonerFilter():
 	_utils = None
 	_logger = None
 
+	# Filter path lists of the configuration, compiled once
+	_space_folder_filter_plan = None
+	_space_folder_exclude_filter_plan = None
+	_source_folder_filter_plan = None
+	_vds_exclude_filter_plan = None
+
 	def __init__(self, config):
 		self._config = config
 		self._logger = DremioClonerLogger(self._config.max_errors, self._config.logging_verbose)
 		self._utils = DremioClonerUtils(config)
+		self._space_folder_filter_plan = DremioFilterPlan(self._config.space_folder_filter_paths)
+		self._space_folder_exclude_filter_plan = DremioFilterPlan(self._config.space_folder_exclude_filter_paths)
+		self._source_folder_filter_plan = DremioFilterPlan(self._config.source_folder_filter_paths)
+		self._vds_exclude_filter_plan = DremioFilterPlan(self._config.vds_exclude_filter_paths)
 
 	def is_pds_in_scope(self):
 		return self._config._source_filter_re is not None and \
@@ -54,38 +65,17 @@ class DremioClonerFilter():
 		return False
 
 	def _match_listed_space_folder_filter_paths(self, container):
-		if self._config.space_folder_filter_paths != []:
+		if not self._space_folder_filter_plan.is_empty():
 			if 'path' not in container:
 				return False
-			path = container['path']
-			folder_matched = False
-			for space_folder_filter in self._config.space_folder_filter_paths:
-				if not folder_matched:
-					space_folder_filter_re = self._config._compile_pattern(space_folder_filter)
-					for i in range(len(path)):
-						if space_folder_filter_re.match(self._utils.normalize_path(path[1:len(path) - i])) is not None:
-							folder_matched = True
-							break
-			if not folder_matched:
-				return False
+			return self._space_folder_filter_plan.match_prefix(container['path'][1:])
 		return True
 
 	def _match_listed_space_folder_exclude_filter_paths(self, container):
-		if self._config.space_folder_exclude_filter_paths != []:
+		if not self._space_folder_exclude_filter_plan.is_empty():
 			if 'path' not in container:
 				return False
-			path = container['path']
-			folder_matched = False
-			for space_folder_exclude_filter in self._config.space_folder_exclude_filter_paths:
-				if not folder_matched:
-					space_folder_filter_re = self._config._compile_pattern(space_folder_exclude_filter)
-					for i in range(len(path)):
-						if space_folder_filter_re.match(self._utils.normalize_path(path[1:len(path) - i])) is not None:
-							folder_matched = True
-							break
-			if not folder_matched:
-				return False
-			return True
+			return self._space_folder_exclude_filter_plan.match_prefix(container['path'][1:])
 		else:
 			return False
 
@@ -103,6 +93,27 @@ class DremioClonerFilter():
 			self._logger.debug("match_space_folder_filter: skipping SPACE FOLDER " + container['path'][0] if 'path' in container else container['name'] + " as per job configuration")
 		return False
 
+	# False if neither the folder nor any folder or VDS below it can match the space folder and VDS filters.
+	# Only filters that hold for a whole subtree are evaluated: space names and patterns, folder exclusions
+	# and folder filter paths that cannot be reached from the folder.
+	def match_space_folder_subtree_filter(self, container):
+		if not self._match_listed_space_names(container):
+			return False
+		if 'path' not in container:
+			return True
+		path = container['path']
+		if not self._space_folder_filter_plan.is_empty() and not self._space_folder_filter_plan.may_match_subtree(path[1:]):
+			return False
+		if self._match_listed_space_folder_exclude_filter_paths(container):
+			return False
+		if self._config._space_filter_re is None or self._config._space_filter_re.match(path[0]) is None:
+			return False
+		if self._config._space_exclude_filter_re is not None and self._config._space_exclude_filter_re.match(path[0]) is not None:
+			return False
+		if self._config._space_folder_exclude_filter_re is not None and self._match_any(self._config._space_folder_exclude_filter_re, get_path_prefixes(path[1:])):
+			return False
+		return True
+
 	def match_space_folder_cascade_acl_origin_filter(self, container):
 		if self._config.space_folder_cascade_acl_origin_filter is None:
 			return False
@@ -130,26 +141,17 @@ class DremioClonerFilter():
 		return False
 
 	def _match_listed_source_folder_paths(self, container):
-		if self._config.source_folder_filter_paths != []:
+		if not self._source_folder_filter_plan.is_empty():
 			if 'path' not in container:
 				return False
 			path = container['path']
-			folder_matched = False
-			for source_folder_filter in self._config.source_folder_filter_paths:
-				if not folder_matched:
-					source_folder_filter_re = self._config._compile_pattern(source_folder_filter)
-					for i in range(len(path[1:])):
-						normalized_path = self._utils.normalize_path(path[1:len(path) - i])
-						if source_folder_filter_re.match(normalized_path) is not None:
-							folder_matched = True
-							break
-						# check if the full normalized path is a substring of the source_folder_filter (assumes no wildcards)
-						# only really applicable when pds.list.useapi is True (which should be never due to inefficiencies) and hence we are traversing a folder structure
-						if i == 0 and source_folder_filter.find(normalized_path) >= 0:
-							folder_matched = True
-							break
-			if not folder_matched:
+			if len(path) < 2:
 				return False
+			if self._source_folder_filter_plan.match_prefix(path[1:], include_empty=False):
+				return True
+			# check if the full normalized path is a substring of the source_folder_filter (assumes no wildcards)
+			# only really applicable when pds.list.useapi is True (which should be never due to inefficiencies) and hence we are traversing a folder structure
+			return self._source_folder_filter_plan.is_part_of_filter(self._utils.normalize_path(path[1:]))
 		return True
 
 	def match_source_folder_filter(self, container, loginfo = True):
@@ -183,15 +185,22 @@ class DremioClonerFilter():
 		return True
 
 	def _match_listed_vds_exclude_filter_paths(self, vds):
-		if self._config.vds_exclude_filter_paths != [] and 'path' in vds:
-			path = vds['path']
-			for vds_exclude_filter in self._config.vds_exclude_filter_paths:
-				vds_exclude_filter_re = self._config._compile_pattern(vds_exclude_filter)
-				if vds_exclude_filter_re.match(self._utils.normalize_path(path[1:len(path)])):
-					return True
+		if not self._vds_exclude_filter_plan.is_empty() and 'path' in vds:
+			return self._vds_exclude_filter_plan.match(vds['path'][1:])
 		return False
 
 	def match_vds_filter(self, vds, tags=None, loginfo = True):
+		if self.match_vds_path_filter(vds, loginfo=False):
+			if not self.is_vds_tag_filter_set():
+				return True
+			elif tags is not None and self._match_tag(tags):
+				return True
+		if loginfo:
+			self._logger.debug("match_vds_filter: skipping VDS " + vds['path'][-1] if 'path' in vds else vds['name'] + " as per job configuration")
+		return False
+
+	# Matches all VDS filters but vds.filter.tag, the VDS tags are not needed
+	def match_vds_path_filter(self, vds, loginfo = True):
 		if not self._match_listed_space_names(vds):
 			return False
 		# Handle folders while avoiding case of VDS located directly in space
@@ -207,14 +216,14 @@ class DremioClonerFilter():
 		if self._match_listed_vds_exclude_filter_paths(vds):
 			return False
 		if self._match_path(self._config._space_filter_re, self._config._space_exclude_filter_re, self._config._space_folder_filter_re, self._config._space_folder_exclude_filter_re, self._config._vds_filter_re, self._config._vds_exclude_filter_re, vds):
-			if self._config.vds_filter_tag is None or self._config.vds_filter_tag == "*":
-				return True
-			elif tags is not None and self._match_tag(tags):
-				return True
+			return True
 		if loginfo:
-			self._logger.debug("match_vds_filter: skipping VDS " + vds['path'][-1] if 'path' in vds else vds['name'] + " as per job configuration")
+			self._logger.debug("match_vds_path_filter: skipping VDS " + vds['path'][-1] if 'path' in vds else vds['name'] + " as per job configuration")
 		return False
 
+	def is_vds_tag_filter_set(self):
+		return self._config.vds_filter_tag is not None and self._config.vds_filter_tag != "*"
+
 	def _match_tag(self, tags):
 		if 'tags' not in tags:
 			return False
@@ -249,23 +258,19 @@ class DremioClonerFilter():
 		if folder_re is None:
 			return False
 		else:
-			folder_matched = False
-			for i in range(len(hierarchy_path)):
-				if folder_re.match(self._utils.normalize_path(hierarchy_path[1:len(hierarchy_path) - i])) is not None:
-					folder_matched = True
-					break
-			if not folder_matched:
+			prefixes = get_path_prefixes(hierarchy_path[1:])
+			if not self._match_any(folder_re, prefixes):
+				return False
+			if folder_exclusion_re is not None and self._match_any(folder_exclusion_re, prefixes):
 				return False
-			if folder_exclusion_re is not None:
-				folder_exclusion_matched = False
-				for i in range(len(hierarchy_path)):
-					if folder_exclusion_re.match(self._utils.normalize_path(hierarchy_path[1:len(hierarchy_path) - i])) is not None:
-						folder_exclusion_matched = True
-						break
-				if folder_exclusion_matched:
-					return False
 		return True
 
+	def _match_any(self, regex, paths):
+		for path in paths:
+			if regex.match(path) is not None:
+				return True
+		return False
+
 	def _match_path(self, root_re, root_exclusion_re, folder_re, folder_exclusion_re, object_re, object_exclusion_re, entity):
 		# If inclusion filter is not specified, nothing to process
 		if root_re is None:
@@ -312,21 +317,11 @@ class DremioClonerFilter():
 				if entity.get('type') == 'DATASET':
 					# Do not include dataset name in folder filtering logic
 					path = path[:-1]
-				if folder_re is not None:  # Avoids potential NoneType Error
-					folder_matched = False
-					for i in range(len(path)):
-						if folder_re.match(self._utils.normalize_path(path[1:len(path) - i])) is not None:
-							folder_matched = True
-							break
-					if not folder_matched:
-						return False
-				if folder_exclusion_re is not None:
-					folder_exclusion_matched = False
-					for i in range(len(path)):
-						if folder_exclusion_re.match(self._utils.normalize_path(path[1:len(path) - i])) is not None:
-							folder_exclusion_matched = True
-							break
-					if folder_exclusion_matched:
-						return False
+				# Folder prefixes are built once for both patterns, a dataset without path has none
+				prefixes = get_path_prefixes(path[1:]) if len(path) > 0 else []
+				if folder_re is not None and not self._match_any(folder_re, prefixes):  # Avoids potential NoneType Error
+					return False
+				if folder_exclusion_re is not None and self._match_any(folder_exclusion_re, prefixes):
+					return False
 		return True
 
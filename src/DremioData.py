@@ -15,26 +15,146 @@
 ########
 
 
+###
+# Data read from or written to a Dremio environment, one DremioDataList per section.
+# Every instance has its own lists. A list assigned to a section is copied into a DremioDataList.
+###
 class DremioData():
 
-	containers = []
-	homes = []
-	sources = []
-	spaces = []
-	folders = []
-	pds_list = []
-	vds_list = []
-	reflections = []
-	queues = []
-	rules = []
-	tags = []
-	wikis = []
-	votes = []
-	referenced_users = []
-	referenced_groups = []
-	referenced_roles = []
-	files = []
-	vds_parents = []
-	dremio_get_config = []
-
-	pds_error_list = []
+	_SECTIONS = ['containers', 'homes', 'sources', 'spaces', 'folders', 'pds_list', 'vds_list', 'reflections',
+				 'queues', 'rules', 'tags', 'wikis', 'votes', 'referenced_users', 'referenced_groups', 'referenced_roles',
+				 'files', 'vds_parents', 'catalog_versions', 'dremio_get_config', 'pds_error_list']
+
+	containers = None
+	homes = None
+	sources = None
+	spaces = None
+	folders = None
+	pds_list = None
+	vds_list = None
+	reflections = None
+	queues = None
+	rules = None
+	tags = None
+	wikis = None
+	votes = None
+	referenced_users = None
+	referenced_groups = None
+	referenced_roles = None
+	files = None
+	vds_parents = None
+	# Versions (tag) of datasets read from the catalog, used as baseline by an incremental get
+	catalog_versions = None
+	dremio_get_config = None
+
+	pds_error_list = None
+
+	def __init__(self):
+		for section in self._SECTIONS:
+			setattr(self, section, [])
+
+	def __setattr__(self, name, value):
+		if name in self._SECTIONS and not isinstance(value, DremioDataList):
+			value = DremioDataList(value)
+		object.__setattr__(self, name, value)
+
+
+###
+# List of entities indexed by id and by normalized path ("/" joined path) for lookups and membership tests
+# in constant time. Appended entities are indexed as they are added, any other change to the list rebuilds
+# the index on the next lookup. An entity whose id or path is changed in place must be followed by reindex().
+###
+class DremioDataList(list):
+
+	# Id or normalized path -> entities with that id or path, in list order
+	_by_id = None
+	_by_path = None
+	_stale = False
+
+	def __init__(self, entities=()):
+		list.__init__(self, entities)
+		self.reindex()
+
+	def reindex(self):
+		self._by_id = {}
+		self._by_path = {}
+		for entity in self:
+			self._index(entity)
+		self._stale = False
+
+	def _index(self, entity):
+		if not isinstance(entity, dict):
+			return
+		if 'id' in entity and isinstance(entity['id'], str):
+			self._by_id.setdefault(entity['id'], []).append(entity)
+		path = self._get_path_key(entity.get('path'))
+		if path is not None:
+			self._by_path.setdefault(path, []).append(entity)
+
+	def _get_path_key(self, path):
+		if isinstance(path, list):
+			return "/".join(str(item) for item in path)
+		if isinstance(path, str):
+			return path
+		return None
+
+	# First entity with the id, None if there is none
+	def get_by_id(self, entity_id):
+		if self._stale:
+			self.reindex()
+		entities = self._by_id.get(entity_id)
+		return entities[0] if entities else None
+
+	# First entity with the path, given as a list or a normalized path. None if there is none.
+	def get_by_path(self, path):
+		if self._stale:
+			self.reindex()
+		entities = self._by_path.get(self._get_path_key(path))
+		return entities[0] if entities else None
+
+	# Only entities with the same id, or the same path for entities without id, can be equal to an entity
+	def __contains__(self, entity):
+		if not isinstance(entity, dict):
+			return list.__contains__(self, entity)
+		if self._stale:
+			self.reindex()
+		if 'id' in entity and isinstance(entity['id'], str):
+			return entity in self._by_id.get(entity['id'], [])
+		path = self._get_path_key(entity.get('path'))
+		if path is not None:
+			return entity in self._by_path.get(path, [])
+		return list.__contains__(self, entity)
+
+	def append(self, entity):
+		list.append(self, entity)
+		if not self._stale:
+			self._index(entity)
+
+	def extend(self, entities):
+		for entity in entities:
+			self.append(entity)
+
+	def __iadd__(self, entities):
+		self.extend(entities)
+		return self
+
+	def _invalidate(method):
+		def invalidating(self, *args, **kwargs):
+			self._stale = True
+			return method(self, *args, **kwargs)
+		return invalidating
+
+	insert = _invalidate(list.insert)
+	remove = _invalidate(list.remove)
+	pop = _invalidate(list.pop)
+	clear = _invalidate(list.clear)
+	sort = _invalidate(list.sort)
+	reverse = _invalidate(list.reverse)
+	__setitem__ = _invalidate(list.__setitem__)
+	__delitem__ = _invalidate(list.__delitem__)
+	__imul__ = _invalidate(list.__imul__)
+	del _invalidate
+
+	# Copies and pickles are rebuilt from the entities, with a new index
+	def __reduce_ex__(self, protocol):
+		return (self.__class__, (list(self),))
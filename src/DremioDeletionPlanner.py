@@ -0,0 +1,111 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+from DremioDependencyGraph import DremioDependencyGraph
+from DremioClonerUtils import DremioClonerUtils
+from DremioClonerLogger import DremioClonerLogger
+from concurrent.futures import ThreadPoolExecutor
+
+
+###
+# Plans the deletions of "create_overwrite_delete" process modes: target objects that are not in the source.
+# Source objects are hashed by path (and name for reflections), so a plan is computed in linear time.
+# A plan is a list of waves, objects of a wave do not depend on each other and are deleted concurrently
+# when concurrency is greater than 1, waves are deleted one after another:
+# - reflections are deleted in a single wave,
+# - VDSs are deleted dependents first, in reverse order of their hierarchy levels,
+# - folders are deleted deepest first, so that subfolders are deleted before their parent folder.
+###
+class DremioDeletionPlanner:
+
+	# Dremio Cloner Config, Utils, ...
+	_config = None
+	_utils = None
+	_logger = None
+
+	def __init__(self, config):
+		self._config = config
+		self._utils = DremioClonerUtils(config)
+		self._logger = DremioClonerLogger(self._config.max_errors, self._config.logging_verbose)
+
+	def plan_reflections(self, target_reflections, source_reflections):
+		source_keys = set([self._get_reflection_key(reflection) for reflection in source_reflections])
+		deletable_reflections = self._get_unmatched(target_reflections, source_keys, self._get_reflection_key)
+		return [deletable_reflections] if deletable_reflections else []
+
+	# get_dependency_paths: function returning paths a target VDS depends on, relative to its SQL context
+	def plan_vds(self, target_vds_list, source_vds_list, get_dependency_paths):
+		source_keys = set([self._get_path_key(vds) for vds in source_vds_list])
+		deletable_vds_list = self._get_unmatched(target_vds_list, source_keys, self._get_path_key)
+		if not deletable_vds_list:
+			return []
+		# Dependencies outside of the deleted VDSs are kept, they do not constrain the order
+		graph = DremioDependencyGraph(deletable_vds_list, self._config, get_dependency_paths, lambda path: True, report_unordered=False)
+		for vds in graph.get_cycles():
+			self._logger.warn("plan_vds: VDS '" + self._utils.normalize_path(vds['path']) + "' is part of a dependency cycle. Will delete it without ordering.")
+		if len(graph.get_unordered()) > len(graph.get_cycles()):
+			self._logger.warn("plan_vds: " + str(len(graph.get_unordered()) - len(graph.get_cycles())) + " VDS(s) depend on a dependency cycle or exceed vds.max_hierarchy_depth. Will delete them without ordering.")
+		# VDSs on a dependency cycle, or depending on one, are deleted first, one at a time
+		waves = [[vds] for vds in graph.get_unordered()]
+		waves.extend(reversed(graph.get_levels()))
+		return waves
+
+	def plan_folders(self, target_folders, source_folders):
+		source_keys = set([self._get_path_key(folder) for folder in source_folders])
+		deletable_folders = self._get_unmatched(target_folders, source_keys, self._get_path_key)
+		folders_by_depth = {}
+		for folder in deletable_folders:
+			folders_by_depth.setdefault(len(folder['path']), []).append(folder)
+		return [folders_by_depth[depth] for depth in sorted(folders_by_depth, reverse=True)]
+
+	# Target objects not matching a source key, each listed once
+	def _get_unmatched(self, target_objects, source_keys, get_key):
+		unmatched = []
+		unmatched_keys = set()
+		for target_object in target_objects:
+			if target_object is None:
+				continue
+			key = get_key(target_object)
+			if key not in source_keys and key not in unmatched_keys:
+				unmatched_keys.add(key)
+				unmatched.append(target_object)
+		return unmatched
+
+	def _get_path_key(self, entity):
+		return tuple(entity['path'])
+
+	def _get_reflection_key(self, reflection):
+		return (tuple(reflection['path']), reflection['name'])
+
+	# Calls delete for every object of the plan, a wave after another
+	def execute(self, waves, delete):
+		if self._config.concurrency <= 1:
+			for wave in waves:
+				for item in wave:
+					delete(item)
+			return
+		executor = ThreadPoolExecutor(max_workers=self._config.concurrency)
+		try:
+			for wave in waves:
+				futures = [executor.submit(delete, item) for item in wave]
+				for future in futures:
+					# Propagate errors such as reaching max_errors
+					future.result()
+		finally:
+			executor.shutdown(wait=True, cancel_futures=True)
+
+	def get_plan_desc(self, waves):
+		return str(sum([len(wave) for wave in waves])) + " deletion(s) in " + str(len(waves)) + " wave(s)"
@@ -0,0 +1,172 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+from DremioClonerUtils import DremioClonerUtils
+from DremioClonerLogger import DremioClonerLogger
+
+
+###
+# Dependency graph of a VDS list, used to create every VDS after the VDSs it depends on.
+# The graph is built once using an index of VDS paths, and hierarchy levels are computed with
+# Kahn's algorithm in linear time. A dependency that is not in the VDS list must be an existing
+# dataset, otherwise the VDS is reported as unresolved. VDSs that cannot be leveled, because they
+# are part of a dependency cycle, depend on an unresolved or cyclic VDS, or exceed
+# vds.max_hierarchy_depth, are reported as unordered.
+# Warnings about unordered VDSs are logged for the creation of VDSs, callers ordering VDSs for another
+# purpose turn them off and report get_cycles() and get_unordered() themselves.
+###
+class DremioDependencyGraph:
+
+	# Dremio Cloner Config, Utils, ...
+	_config = None
+	_utils = None
+	_logger = None
+
+	# Graph nodes are positions in _vds_list
+	_vds_list = None
+	# Positions of the VDSs each VDS depends on, and of the VDSs depending on each VDS
+	_dependencies = None
+	_dependents = None
+	_unresolved_positions = None
+	# Log warnings about VDSs that cannot be ordered
+	_report_unordered = True
+
+	# Results
+	_levels = None
+	# Hierarchy level of each leveled position
+	_level_of = None
+	_unresolved = None
+	_unordered = None
+	_cycles = None
+
+	# vds_list: VDS entities to order
+	# get_dependency_paths: function returning paths a VDS depends on, relative to its SQL context
+	# is_existing_dataset: function telling whether a normalized path that is not in vds_list is an existing dataset
+	def __init__(self, vds_list, config, get_dependency_paths, is_existing_dataset, report_unordered=True):
+		self._config = config
+		self._report_unordered = report_unordered
+		self._utils = DremioClonerUtils(config)
+		self._logger = DremioClonerLogger(self._config.max_errors, self._config.logging_verbose)
+		self._vds_list = list(vds_list)
+		self._build(get_dependency_paths, is_existing_dataset)
+		self._compute_levels()
+
+	def _build(self, get_dependency_paths, is_existing_dataset):
+		index = {}
+		for i, vds in enumerate(self._vds_list):
+			index[self._utils.normalize_path(vds['path'])] = i
+		# External datasets are checked once per path
+		existing_datasets = {}
+		self._dependencies = [set() for vds in self._vds_list]
+		self._dependents = [[] for vds in self._vds_list]
+		unresolved = set()
+		for i, vds in enumerate(self._vds_list):
+			sql_context = self._utils.get_sql_context(vds)
+			for path in get_dependency_paths(vds):
+				path = self._utils.get_absolute_path(path, sql_context)
+				if path in index:
+					self._dependencies[i].add(index[path])
+					continue
+				if path not in existing_datasets:
+					existing_datasets[path] = is_existing_dataset(path)
+				if not existing_datasets[path]:
+					if self._report_unordered:
+						self._logger.warn("_build: giving up on ordering VDS '" + self._utils.normalize_path(vds['path']) + "'. Could not resolve dependency '" + path + "' Will try to process without ordering.")
+					unresolved.add(i)
+					break
+		for i, dependencies in enumerate(self._dependencies):
+			for dependency in dependencies:
+				self._dependents[dependency].append(i)
+		self._unresolved = [self._vds_list[i] for i in sorted(unresolved)]
+		self._unresolved_positions = unresolved
+
+	def _compute_levels(self):
+		in_degree = [len(dependencies) for dependencies in self._dependencies]
+		level = [i for i in range(len(self._vds_list)) if in_degree[i] == 0 and i not in self._unresolved_positions]
+		self._level_of = {}
+		self._levels = []
+		while len(level) > 0 and len(self._levels) < self._config.vds_max_hierarchy_depth:
+			for i in level:
+				self._level_of[i] = len(self._levels)
+			self._levels.append([self._vds_list[i] for i in level])
+			next_level = []
+			for i in level:
+				for dependent in self._dependents[i]:
+					in_degree[dependent] -= 1
+					if in_degree[dependent] == 0 and dependent not in self._unresolved_positions:
+						next_level.append(dependent)
+			level = sorted(next_level)
+		unordered = [i for i in range(len(self._vds_list)) if i not in self._level_of and i not in self._unresolved_positions]
+		self._unordered = [self._vds_list[i] for i in unordered]
+		self._cycles = [self._vds_list[i] for i in self._get_cycles(set(unordered))]
+		if len(level) > 0 and self._report_unordered:
+			self._logger.warn("_compute_levels: VDS hierarchy exceeds vds.max_hierarchy_depth of " + str(self._config.vds_max_hierarchy_depth) + ". Will try to process remaining VDSs without ordering.")
+		if self._report_unordered:
+			for vds in self._cycles:
+				self._logger.warn("_compute_levels: VDS '" + self._utils.normalize_path(vds['path']) + "' is part of a dependency cycle. Will try to process without ordering.")
+		self._logger.debug("_compute_levels: " + str(len(self._levels)) + " hierarchy level(s), " + str(len(self._unresolved)) + " unresolved VDS(s), " + str(len(self._unordered)) + " unordered VDS(s).")
+
+	# Nodes left after repeatedly removing nodes without dependents are on a cycle (or between cycles).
+	# Everything else in unordered only depends on a cycle, an unresolved VDS, or is too deep.
+	def _get_cycles(self, unordered):
+		out_degree = {}
+		for i in unordered:
+			out_degree[i] = len([dependent for dependent in self._dependents[i] if dependent in unordered])
+		trimmed = [i for i in unordered if out_degree[i] == 0]
+		remaining = set(unordered)
+		while len(trimmed) > 0:
+			i = trimmed.pop()
+			remaining.discard(i)
+			for dependency in self._dependencies[i]:
+				if dependency in remaining:
+					out_degree[dependency] -= 1
+					if out_degree[dependency] == 0:
+						trimmed.append(dependency)
+		return sorted([i for i in remaining if self._is_on_cycle(i, remaining)])
+
+	def _is_on_cycle(self, i, remaining):
+		return any(dependency in remaining for dependency in self._dependencies[i])
+
+	# List of hierarchy levels, each level is a list of VDSs depending only on VDSs in lower levels
+	def get_levels(self):
+		return self._levels
+
+	# VDSs with a dependency that is neither in the VDS list nor an existing dataset
+	def get_unresolved(self):
+		return self._unresolved
+
+	# VDSs that could not be placed into a hierarchy level
+	def get_unordered(self):
+		return self._unordered
+
+	# Unordered VDSs that are part of a dependency cycle
+	def get_cycles(self):
+		return self._cycles
+
+	# Positions of leveled VDSs, in level order. Used by schedulers that start writing a VDS as soon as
+	# its dependencies are written rather than waiting for the whole previous level.
+	def get_leveled_positions(self):
+		return sorted(self._level_of, key=lambda i: (self._level_of[i], i))
+
+	def get_vds(self, position):
+		return self._vds_list[position]
+
+	# Dependencies of a leveled VDS are always leveled
+	def get_dependency_count(self, position):
+		return len(self._dependencies[position])
+
+	def get_leveled_dependents(self, position):
+		return [dependent for dependent in self._dependents[position] if dependent in self._level_of]
@@ -37,11 +37,15 @@ class DremioDescribeJob:
 	_vds_list = []
 	_final_sql = ""
 
+	# Tables referenced by SQL, each SQL is parsed once
+	_sql_extractor = None
+
 	def __init__(self, source_dremio, config):
 		self._config = config
 		self._dremio_env = source_dremio
 		self._logger = DremioClonerLogger(self._config.max_errors, self._config.logging_verbose)
 		self._utils = DremioClonerUtils(config)
+		self._sql_extractor = parse_sql.SqlTableExtractor()
 
 	def describe_job_sql_dependencies(self):
 		sql = self._config.job_sql
@@ -56,7 +60,7 @@ class DremioDescribeJob:
 			schema = self._utils.normalize_path(sql_context) + "/"
 		else:
 			schema = ""
-		paths = parse_sql.tables_in_query(sql)
+		paths = self._sql_extractor.tables_in_query(sql)
 		# Collect all PDS and VDS with the entire dependency hierarchy
 		for path in paths:
 			self._discover_dependencies(schema + path)
@@ -81,7 +85,7 @@ class DremioDescribeJob:
 		else:
 			self._logger.fatal("_discover_dependencies: Could not resolve dependency: " + path)
 		# Process recursive dependencies
-		sql_dependency_paths = parse_sql.tables_in_query(dataset['sql'])
+		sql_dependency_paths = self._sql_extractor.tables_in_query(dataset['sql'])
 		for dataset_dependency_path in sql_dependency_paths:
 			sql_context = self._utils.get_sql_context(dataset)
 			self._discover_dependencies(self._utils.get_absolute_path(dataset_dependency_path, sql_context))
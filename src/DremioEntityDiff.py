@@ -0,0 +1,87 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import hashlib
+import json
+import threading
+
+
+###
+# Compares an entity about to be written with the entity existing in the target environment, and counts
+# created, updated and unchanged entities for DremioWriter.
+# Both entities are normalized to the attributes of the entity being written, without attributes assigned
+# by Dremio, and hashed. The ACL is compared without its version, with a missing ACL being an empty ACL and
+# ACL entries in any order.
+###
+class DremioEntityDiff:
+
+	# Attributes assigned by Dremio, they are never written
+	_IGNORED_ATTRIBUTES = ['id', 'tag', 'createdAt', 'children', 'fields']
+
+	_created = 0
+	_updated = 0
+	_unchanged = 0
+	_lock = None
+
+	def __init__(self):
+		self._lock = threading.Lock()
+
+	# entity: entity to write, with ACL already mapped to the target environment
+	# existing_entity: entity retrieved from the target environment
+	def is_unchanged(self, entity, existing_entity):
+		return self.get_hash(entity, entity) == self.get_hash(existing_entity, entity)
+
+	# Hash of entity normalized to the attributes of reference_entity
+	def get_hash(self, entity, reference_entity):
+		normalized_entity = {}
+		for attribute in reference_entity:
+			if attribute not in self._IGNORED_ATTRIBUTES and attribute != 'accessControlList':
+				normalized_entity[attribute] = entity.get(attribute)
+		if not self._is_home(reference_entity):
+			normalized_entity['accessControlList'] = self._normalize_acl(entity.get('accessControlList'))
+		return hashlib.sha256(json.dumps(normalized_entity, sort_keys=True).encode('utf-8')).hexdigest()
+
+	def _normalize_acl(self, acl):
+		normalized_acl = {}
+		if acl is None:
+			return normalized_acl
+		for principal_type in acl:
+			if principal_type == 'version' or not acl[principal_type]:
+				continue
+			entries = []
+			for entry in acl[principal_type]:
+				entries.append({'id': entry.get('id'), 'permissions': sorted(entry.get('permissions', []))})
+			normalized_acl[principal_type] = sorted(entries, key=lambda entry: json.dumps(entry, sort_keys=True))
+		return normalized_acl
+
+	# ACL is not written for homes
+	def _is_home(self, entity):
+		return ('path' in entity and entity['path'][0][:1] == '@') or ('name' in entity and entity['name'][:1] == '@')
+
+	def count_created(self):
+		with self._lock:
+			self._created += 1
+
+	def count_updated(self):
+		with self._lock:
+			self._updated += 1
+
+	def count_unchanged(self):
+		with self._lock:
+			self._unchanged += 1
+
+	def get_stats_desc(self):
+		return "entities: " + str(self._created) + " created, " + str(self._updated) + " updated, " + str(self._unchanged) + " unchanged"
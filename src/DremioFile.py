@@ -17,17 +17,40 @@
 from DremioData import DremioData
 from DremioClonerConfig import DremioClonerConfig
 from DremioClonerUtils import DremioClonerUtils
+from DremioJsonParser import DremioJsonParser
 from datetime import datetime
 import json
 import logging
 import os, errno
+import textwrap
 from shutil import rmtree
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+
+# Used by the thread and process pools, so they are defined at module level.
+# Workers open the files themselves, so file contents are never collected in the calling process.
+def _read_json_file(filepath):
+	f = open(filepath, "r", encoding="utf-8")
+	data = json.load(f)
+	f.close()
+	return data
+
+def _write_json_file(filepath, object):
+	f = open(filepath, "w", encoding="utf-8")
+	json.dump(object, f, indent=4, sort_keys=True)
+	f.close()
 
 class DremioFile():
 
 	_config = None
 	_utils = None
 
+	# Sections of a JSON environment file only saved when they are not empty
+	OPTIONAL_JSON_SECTIONS = ['vds_parents', 'catalog_versions']
+
+	# Files of a directory export keyed by file path, written at once when all directories are created
+	_json_files = None
+
 	def __init__(self, config):
 		self._config = config
 		self._utils = DremioClonerUtils(config)
@@ -50,6 +73,53 @@ class DremioFile():
 			raise Exception('Source filename or directory must be specified.')
 
 	def save_dremio_environment_as_json_file(self, dremio_data):
+		f = self.open_json_file()
+		for section, attribute in self.get_json_sections():
+			entities = getattr(dremio_data, attribute)
+			if section not in self.OPTIONAL_JSON_SECTIONS or entities:
+				self.write_json_section(f, section, entities)
+		self.close_json_file(f)
+
+	# Sections of a JSON environment file in the order they are saved, as (section name, DremioData attribute).
+	# Sections in OPTIONAL_JSON_SECTIONS are only saved when they are not empty.
+	def get_json_sections(self):
+		sections = [('containers', 'containers')]
+		if self._config.home_process_mode == 'process':
+			sections.append(('homes', 'homes'))
+		if self._config.source_process_mode == 'process':
+			sections.append(('sources', 'sources'))
+		if self._config.space_process_mode == 'process':
+			sections.append(('spaces', 'spaces'))
+		if self._config.folder_process_mode == 'process':
+			sections.append(('folders', 'folders'))
+		if self._config.pds_process_mode == 'process':
+			sections.append(('pds', 'pds_list'))
+		if self._config.vds_process_mode == 'process':
+			sections.append(('vds', 'vds_list'))
+		sections.append(('files', 'files'))
+		if self._config.reflection_process_mode == 'process':
+			sections.append(('reflections', 'reflections'))
+		if self._config.user_process_mode == 'process':
+			sections.append(('referenced_users', 'referenced_users'))
+		if self._config.group_process_mode == 'process':
+			sections.append(('referenced_groups', 'referenced_groups'))
+			sections.append(('referenced_roles', 'referenced_roles'))
+		if self._config.wlm_queue_process_mode == 'process':
+			sections.append(('queues', 'queues'))
+		if self._config.wlm_rule_process_mode == 'process':
+			sections.append(('rules', 'rules'))
+		if self._config.tag_process_mode == 'process':
+			sections.append(('tags', 'tags'))
+		if self._config.wiki_process_mode == 'process':
+			sections.append(('wikis', 'wikis'))
+		if self._config.vote_process_mode == 'process':
+			sections.append(('votes', 'votes'))
+		sections.append(('vds_parents', 'vds_parents'))
+		sections.append(('catalog_versions', 'catalog_versions'))
+		return sections
+
+	# Creates the JSON environment file and writes the environment and configuration sections
+	def open_json_file(self):
 		filename = self._config.target_filename
 		if os.path.isfile(filename):
 			os.remove(filename)
@@ -65,63 +135,27 @@ class DremioFile():
 						break
 		f.write(',\n')
 		json.dump({'dremio_get_config':self._config.cloner_conf_json}, f, indent=4, sort_keys=True)
-		f.write(',\n')
-		json.dump({'containers':dremio_data.containers}, f, indent=4, sort_keys=True)
-		if self._config.home_process_mode == 'process':
-			f.write(',\n')
-			json.dump({'homes':dremio_data.homes}, f, indent=4, sort_keys=True)
-		if self._config.source_process_mode == 'process':
-			f.write(',\n')
-			json.dump({'sources':dremio_data.sources}, f, indent=4, sort_keys=True)
-		if self._config.space_process_mode == 'process':
-			f.write(',\n')
-			json.dump({'spaces':dremio_data.spaces}, f, indent=4, sort_keys=True)
-		if self._config.folder_process_mode == 'process':
-			f.write(',\n')
-			json.dump({'folders':dremio_data.folders}, f, indent=4, sort_keys=True)
-		if self._config.pds_process_mode == 'process':
-			f.write(',\n')
-			json.dump({'pds':dremio_data.pds_list}, f, indent=4, sort_keys=True)
-		if self._config.vds_process_mode == 'process':
-			f.write(',\n')
-			json.dump({'vds':dremio_data.vds_list}, f, indent=4, sort_keys=True)
-		f.write(',\n')
-		json.dump({'files':dremio_data.files}, f, indent=4, sort_keys=True)
-		if self._config.reflection_process_mode == 'process':
-			f.write(',\n')
-			json.dump({'reflections':dremio_data.reflections}, f, indent=4, sort_keys=True)
-		if self._config.user_process_mode == 'process':
-			f.write(',\n')
-			json.dump({'referenced_users':dremio_data.referenced_users}, f, indent=4, sort_keys=True)
-		if self._config.group_process_mode == 'process':
-			f.write(',\n')
-			json.dump({'referenced_groups':dremio_data.referenced_groups}, f, indent=4, sort_keys=True)
-			f.write(',\n')
-			json.dump({'referenced_roles': dremio_data.referenced_roles}, f, indent=4, sort_keys=True)
-		if self._config.wlm_queue_process_mode == 'process':
-			f.write(',\n')
-			json.dump({'queues':dremio_data.queues}, f, indent=4, sort_keys=True)
-		if self._config.wlm_rule_process_mode == 'process':
-			f.write(',\n')
-			json.dump({'rules':dremio_data.rules}, f, indent=4, sort_keys=True)
-		if self._config.tag_process_mode == 'process':
-			f.write(',\n')
-			json.dump({'tags':dremio_data.tags}, f, indent=4, sort_keys=True)
-		if self._config.wiki_process_mode == 'process':
-			f.write(',\n')
-			json.dump({'wikis':dremio_data.wikis}, f, indent=4, sort_keys=True)
-		if self._config.vote_process_mode == 'process':
-			f.write(',\n')
-			json.dump({'votes':dremio_data.votes}, f, indent=4, sort_keys=True)
-		if dremio_data.vds_parents:
-			f.write(',\n')
-			json.dump({'vds_parents':dremio_data.vds_parents}, f, indent=4, sort_keys=True)
+		return f
+
+	# Writes a section one entity at a time, the output is identical to json.dump({section: list(entities)}, f, indent=4, sort_keys=True)
+	def write_json_section(self, f, section, entities):
+		f.write(',\n{\n    ' + json.dumps(section) + ': [')
+		separator = '\n'
+		for entity in entities:
+			f.write(separator + textwrap.indent(json.dumps(entity, indent=4, sort_keys=True), ' ' * 8))
+			separator = ',\n'
+		f.write('\n    ]\n}' if separator == ',\n' else ']\n}')
+
+	def close_json_file(self, f):
 		f.write(' ] }')
 		f.close()
 
 	def read_dremio_environment_from_json_file(self, filename):
 		f = open(filename, "r", encoding="utf-8")
-		data = json.load(f)['data']
+		if self._config.source_streaming:
+			data = self._read_json_stream(f)
+		else:
+			data = json.load(f)['data']
 		f.close()
 		dremio_data = DremioData()
 		for item in data:
@@ -163,12 +197,25 @@ class DremioFile():
 				dremio_data.votes = item['votes']
 			elif ('vds_parents' in item):
 				dremio_data.vds_parents = item['vds_parents']
+			elif ('catalog_versions' in item):
+				dremio_data.catalog_versions = item['catalog_versions']
 			elif ('dremio_get_config' in item):
 				dremio_data.dremio_get_config = item['dremio_get_config']
 			else:
 				logging.warn("read_dremio_environment: unexpected data in the source file " + str(item))
 		return dremio_data
 
+	# Same data items as json.load(f)['data'], decoded one entity at a time
+	def _read_json_stream(self, f):
+		data = []
+		sections = {}
+		for section, entity in DremioJsonParser(f).iter_sections():
+			if section not in sections:
+				sections[section] = []
+				data.append({section: sections[section]})
+			sections[section].append(entity)
+		return data
+
 
 	def save_dremio_environment_as_directory(self, dremio_data):
 		target_directory = self._config.target_directory
@@ -204,6 +251,7 @@ class DremioFile():
 				os.makedirs(os.path.join(target_directory, 'vds_parents').encode(encoding='utf-8', errors='strict'))
 		except OSError as e:
 			raise Exception("Error processing directory structure. OS Error: " + e.strerror)
+		self._json_files = {}
 		try:
 			# Save configuration
 			# Remove password if present
@@ -271,6 +319,7 @@ class DremioFile():
 					self._write_vote_json_file(os.path.join(target_directory, "votes"), vote)
 			for vds_parent in dremio_data.vds_parents:
 				self._write_object_json_file(os.path.join(target_directory, "vds_parents"), vds_parent)
+			self._write_json_files()
 		except OSError as e:
 			raise Exception("Error writing file. OS Error: " + e.strerror)
 
@@ -300,61 +349,83 @@ class DremioFile():
 
 
 	def _collect_directory(self, directory, container_list, folder_list, object_list):
+		filepaths = []
+		object_lists = []
 		for (dirpath, dirnames, filenames) in os.walk(directory):
 			for filename in filenames:
-				f = open(os.path.join(dirpath, filename), "r", encoding="utf-8")
-				data = json.load(f)
-				f.close()
 				if self._config.container_filename == filename:
 					# First level of dirpath is a container if container_list passed
 					if container_list is None or ('/' in dirpath[len(directory)+1:] or '\\' in dirpath[len(directory)+1:]):
 						if folder_list is not None:
-							folder_list.append(data)
+							filepaths.append(os.path.join(dirpath, filename))
+							object_lists.append(folder_list)
 					else:
-						container_list.append(data)
+						filepaths.append(os.path.join(dirpath, filename))
+						object_lists.append(container_list)
 				else:
-					object_list.append(data)
+					filepaths.append(os.path.join(dirpath, filename))
+					object_lists.append(object_list)
+		# Files are read in parallel, objects are collected in the order they are walked
+		for data, data_list in zip(self._read_json_files(filepaths), object_lists):
+			data_list.append(data)
+
+	def _read_json_files(self, filepaths):
+		if self._config.file_processes > 0:
+			with ProcessPoolExecutor(max_workers=self._config.file_processes) as executor:
+				return list(executor.map(_read_json_file, filepaths, chunksize=self._get_chunksize(len(filepaths))))
+		if self._config.concurrency > 1:
+			with ThreadPoolExecutor(max_workers=self._config.concurrency) as executor:
+				return list(executor.map(_read_json_file, filepaths))
+		return [_read_json_file(filepath) for filepath in filepaths]
+
+	# Writes files collected by the _write_*_json_file methods. A file path that was collected more than once
+	# holds the last object, as if files were written one after another.
+	def _write_json_files(self):
+		filepaths = list(self._json_files)
+		objects = [self._json_files[filepath] for filepath in filepaths]
+		self._json_files = None
+		if self._config.file_processes > 0:
+			with ProcessPoolExecutor(max_workers=self._config.file_processes) as executor:
+				list(executor.map(_write_json_file, filepaths, objects, chunksize=self._get_chunksize(len(objects))))
+		elif self._config.concurrency > 1:
+			with ThreadPoolExecutor(max_workers=self._config.concurrency) as executor:
+				list(executor.map(_write_json_file, filepaths, objects))
+		else:
+			for filepath, object in zip(filepaths, objects):
+				_write_json_file(filepath, object)
+
+	# Several objects per task keep the process pool overhead low
+	def _get_chunksize(self, count):
+		return max(1, count // (self._config.file_processes * 4))
 
 	def _write_container_json_file(self, root_dir, container):
 		filepath = os.path.join(root_dir, container['name'], self._config.container_filename).encode(encoding='utf-8', errors='strict')
-		f = open(filepath, "w", encoding="utf-8")
-		json.dump(container, f, indent=4, sort_keys=True)
-		f.close()
+		self._json_files[filepath] = container
 
 
 	def _write_wiki_json_file(self, root_dir, wiki):
 		filepath = os.path.join(root_dir, wiki['entity_id'] + ".json").encode(encoding='utf-8', errors='strict')
-		f = open(filepath, "w", encoding="utf-8")
-		json.dump(wiki, f, indent=4, sort_keys=True)
-		f.close()
+		self._json_files[filepath] = wiki
 
 
 	def _write_tag_json_file(self, root_dir, wiki):
 		filepath = os.path.join(root_dir, wiki['entity_id'] + ".json").encode(encoding='utf-8', errors='strict')
-		f = open(filepath, "w", encoding="utf-8")
-		json.dump(wiki, f, indent=4, sort_keys=True)
-		f.close()
+		self._json_files[filepath] = wiki
 
 
 	def _write_object_json_file(self, root_dir, object):
 		filepath = os.path.join(root_dir, object['id'] + ".json").encode(encoding='utf-8', errors='strict')
-		f = open(filepath, "w", encoding="utf-8")
-		json.dump(object, f, indent=4, sort_keys=True)
-		f.close()
+		self._json_files[filepath] = object
 
 
 	def _write_vote_json_file(self, root_dir, object):
 		filepath = os.path.join(root_dir, object['datasetId'] + ".json").encode(encoding='utf-8', errors='strict')
-		f = open(filepath, "w", encoding="utf-8")
-		json.dump(object, f, indent=4, sort_keys=True)
-		f.close()
+		self._json_files[filepath] = object
 
 
 	def _write_folder_json_file(self, root_dir, folder):
 		filepath = os.path.join(root_dir, self._get_fs_path(folder['path']), self._config.container_filename).encode(encoding='utf-8',errors='strict')
-		f = open(filepath, "w", encoding="utf-8")
-		json.dump(folder, f, indent=4, sort_keys=True)
-		f.close()
+		self._json_files[filepath] = folder
 
 
 	def _write_entity_json_file(self, root_dir, entity):
@@ -372,9 +443,7 @@ class DremioFile():
 			filepath = os.path.join(filepath, self._replace_special_characters(item))
 		# write entity into json file
 		filepath = (filepath  + ".json").encode(encoding='utf-8', errors='strict')
-		f = open(filepath, "w", encoding="utf-8")
-		json.dump(entity, f, indent=4, sort_keys=True)
-		f.close()
+		self._json_files[filepath] = entity
 
 
 	def _replace_special_characters(self, fs_item):
@@ -0,0 +1,85 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+from DremioFile import DremioFile
+from DremioClonerLogger import DremioClonerLogger
+from shutil import rmtree
+import json
+import os
+
+
+###
+# Incremental writer of a JSON environment file for the "get" command.
+# DremioReader adds entities as they are read. Every section is spooled to its own JSON Lines file
+# in the <filename>.parts directory, one entity per line, so entities do not have to be kept in memory.
+# When the crawl is finished, the parts are assembled into the JSON environment file, which is identical
+# to the file saved by DremioFile, and the parts directory is removed. If the run does not finish,
+# the entities read so far remain available in the parts directory.
+###
+class DremioFileStream:
+
+	# Dremio Cloner Config, Logger, ...
+	_config = None
+	_logger = None
+	_file = None
+
+	_parts_directory = None
+	# Open part file and number of entities for each section
+	_parts = None
+	_counts = None
+
+	def __init__(self, config):
+		self._config = config
+		self._logger = DremioClonerLogger(self._config.max_errors, self._config.logging_verbose)
+		self._file = DremioFile(config)
+		self._parts_directory = self._config.target_filename + ".parts"
+		self._parts = {}
+		self._counts = {}
+
+	def open(self):
+		if os.path.isdir(self._parts_directory):
+			rmtree(self._parts_directory)
+		os.makedirs(self._parts_directory)
+
+	def add(self, section, entity):
+		if section not in self._parts:
+			# Line buffered, every entity is on disk as soon as it is added
+			self._parts[section] = open(self._get_part_filename(section), "w", encoding="utf-8", buffering=1)
+			self._counts[section] = 0
+		self._parts[section].write(json.dumps(entity) + "\n")
+		self._counts[section] += 1
+
+	def close(self):
+		for part in self._parts.values():
+			part.close()
+		f = self._file.open_json_file()
+		for section, attribute in self._file.get_json_sections():
+			if section not in self._file.OPTIONAL_JSON_SECTIONS or self._counts.get(section, 0) > 0:
+				self._file.write_json_section(f, section, self._read_part(section))
+		self._file.close_json_file(f)
+		rmtree(self._parts_directory)
+		self._logger.info("close: saved " + str(sum(self._counts.values())) + " entities to " + self._config.target_filename)
+
+	def _read_part(self, section):
+		if section not in self._counts:
+			return
+		part = open(self._get_part_filename(section), "r", encoding="utf-8")
+		for line in part:
+			yield json.loads(line)
+		part.close()
+
+	def _get_part_filename(self, section):
+		return os.path.join(self._parts_directory, section + ".jsonl")
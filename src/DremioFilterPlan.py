@@ -0,0 +1,120 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import fnmatch, re
+
+
+###
+# A list of path filters, such as space.folder.filter.paths, compiled once for DremioClonerFilter.
+# Filters without wildcards are kept in a prefix trie of path elements, so that all prefixes of a path are
+# matched in one walk down the trie. Filters with wildcards are compiled into a single regex alternation.
+# Paths are matched as "/" joined strings, like fnmatch patterns compiled by DremioClonerConfig.
+###
+class DremioFilterPlan:
+
+	_filters = None
+	# Trie nodes are {'terminal': bool, 'children': {path element: node}}
+	_trie = None
+	_literals = None
+	_regex = None
+	# Filters joined with a character that cannot be part of a path, for substring lookups
+	_joined_filters = None
+
+	def __init__(self, filters):
+		self._filters = list(filters)
+		self._trie = {'terminal': False, 'children': {}}
+		self._literals = set()
+		patterns = []
+		for path_filter in self._filters:
+			if any(c in path_filter for c in '*?['):
+				patterns.append(fnmatch.translate(path_filter))
+			else:
+				self._literals.add(path_filter)
+				self._add_literal(path_filter)
+		self._regex = re.compile("|".join(patterns)) if patterns else None
+		self._joined_filters = "\0".join(self._filters)
+
+	def _add_literal(self, path_filter):
+		node = self._trie
+		for element in (path_filter.split('/') if path_filter != "" else []):
+			node = node['children'].setdefault(element, {'terminal': False, 'children': {}})
+		node['terminal'] = True
+
+	def is_empty(self):
+		return len(self._filters) == 0
+
+	# True if a filter matches the path elements
+	def match(self, elements):
+		path = "/".join(elements)
+		return path in self._literals or (self._regex is not None and self._regex.match(path) is not None)
+
+	# True if a filter matches the path elements or one of their prefixes. The empty prefix is matched when include_empty.
+	def match_prefix(self, elements, include_empty=True):
+		if self._literals:
+			if any('/' in element for element in elements):
+				# Elements containing "/" cannot be matched element by element
+				if any(prefix in self._literals for prefix in get_path_prefixes(elements, include_empty)):
+					return True
+			elif self._match_trie(elements, include_empty):
+				return True
+		if self._regex is not None:
+			for prefix in get_path_prefixes(elements, include_empty):
+				if self._regex.match(prefix) is not None:
+					return True
+		return False
+
+	def _match_trie(self, elements, include_empty):
+		node = self._trie
+		if include_empty and node['terminal']:
+			return True
+		for element in elements:
+			node = node['children'].get(element)
+			if node is None:
+				return False
+			if node['terminal']:
+				return True
+		return False
+
+	# False if no filter can match the path elements, one of their prefixes or a path below them.
+	# Filters with wildcards may match any path.
+	def may_match_subtree(self, elements):
+		if self._regex is not None or any('/' in element for element in elements):
+			return True
+		node = self._trie
+		for element in elements:
+			if node['terminal']:
+				return True
+			node = node['children'].get(element)
+			if node is None:
+				return False
+		return True
+
+	# True if the normalized path is a substring of a filter
+	def is_part_of_filter(self, normalized_path):
+		return normalized_path in self._joined_filters
+
+
+# "/" joined prefixes of path elements, from the longest
+def get_path_prefixes(elements, include_empty=True):
+	prefixes = []
+	prefix = None
+	for element in elements:
+		prefix = element if prefix is None else prefix + "/" + element
+		prefixes.append(prefix)
+	prefixes.reverse()
+	if include_empty:
+		prefixes.append("")
+	return prefixes
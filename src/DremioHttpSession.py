@@ -0,0 +1,94 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import logging
+import requests
+import time
+from requests.adapters import HTTPAdapter
+
+
+###
+# HTTP transport shared by the Dremio and DremioCloud API wrappers.
+# Keeps a pooled requests.Session so TCP connections and TLS sessions are reused
+# across API calls instead of being re-established for every request.
+# Requests are optionally throttled by a DremioRateLimiter and retried as per a DremioRetryPolicy.
+###
+class DremioHttpSession:
+
+	# Number of per-host connection pools kept by the adapter. API wrappers talk to one or two hosts.
+	_pool_connections = 4
+
+	_session = None
+	_api_timeout = None
+	_verify_ssl = None
+	_rate_limiter = None
+	_retry_policy = None
+
+	# Responses telling that the Dremio environment is overloaded
+	_OVERLOADED_STATUS_CODES = [429, 503]
+
+	def __init__(self, api_timeout=10, verify_ssl=True, pool_size=10, rate_limiter=None, retry_policy=None):
+		self._api_timeout = api_timeout
+		self._verify_ssl = verify_ssl
+		self._rate_limiter = rate_limiter
+		self._retry_policy = retry_policy
+		self._session = requests.Session()
+		# Do not let urllib3 retry on its own, failed calls are retried as per the retry policy
+		adapter = HTTPAdapter(pool_connections=self._pool_connections, pool_maxsize=pool_size, max_retries=0)
+		self._session.mount("http://", adapter)
+		self._session.mount("https://", adapter)
+		self._session.headers.update({"Connection": "keep-alive"})
+
+	def request(self, method, url, **kwargs):
+		if 'timeout' not in kwargs:
+			kwargs['timeout'] = self._api_timeout
+		if 'verify' not in kwargs:
+			kwargs['verify'] = self._verify_ssl
+		if self._retry_policy is None:
+			return self._send(method, url, **kwargs)
+		attempt = 1
+		while True:
+			try:
+				response = self._send(method, url, **kwargs)
+			except requests.exceptions.RequestException as e:
+				if not self._retry_policy.is_retryable_error(method, e, attempt):
+					raise
+				delay = self._retry_policy.get_delay(attempt)
+				logging.info("DremioHttpSession: " + method + " <" + url + "> failed with " + type(e).__name__ + ", retrying in " + str(round(delay, 2)) + " seconds.")
+			else:
+				if not self._retry_policy.is_retryable_response(method, response, attempt):
+					return response
+				delay = self._retry_policy.get_delay(attempt, response)
+				logging.info("DremioHttpSession: " + method + " <" + url + "> received HTTP Response Code " + str(response.status_code) + ", retrying in " + str(round(delay, 2)) + " seconds.")
+				response.close()
+			time.sleep(delay)
+			attempt += 1
+
+	def _send(self, method, url, **kwargs):
+		if self._rate_limiter is None:
+			return self._session.request(method, url, **kwargs)
+		start = self._rate_limiter.acquire()
+		# Timeouts and connection errors count as overloaded
+		overloaded = True
+		try:
+			response = self._session.request(method, url, **kwargs)
+			overloaded = response.status_code in self._OVERLOADED_STATUS_CODES
+			return response
+		finally:
+			self._rate_limiter.release(start, overloaded)
+
+	def close(self):
+		self._session.close()
@@ -0,0 +1,147 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import json
+import sys
+
+
+###
+# Incremental parser of a JSON environment file: { "data": [ { "section": [ entity, ... ] }, ... ] }
+# The file is read in chunks and every entity is decoded on its own, so neither the file content
+# nor the decoded document as a whole has to be kept in memory. Entities are yielded one at a time
+# as (section name, entity). A section whose value is not a list is yielded as a single item.
+###
+class DremioJsonParser:
+
+	_CHUNK_SIZE = 1024 * 1024
+	# Characters that can follow a complete value
+	_VALUE_TERMINATORS = ' \t\n\r,:]}'
+
+	_file = None
+	_decoder = None
+	_buffer = ""
+	_pos = 0
+	_eof = False
+
+	def __init__(self, f):
+		self._file = f
+		self._decoder = json.JSONDecoder(object_pairs_hook=self._intern_keys)
+		self._buffer = ""
+		self._pos = 0
+		self._eof = False
+
+	def iter_sections(self):
+		self._expect('{')
+		if self._peek() != '}':
+			while True:
+				key = self._decode_value()
+				self._expect(':')
+				if key == 'data':
+					for item in self._iter_data():
+						yield item
+				else:
+					self._decode_value()
+				if self._next_separator('}'):
+					break
+		self._expect('}')
+
+	def _iter_data(self):
+		self._expect('[')
+		if self._peek() == ']':
+			self._expect(']')
+			return
+		while True:
+			self._expect('{')
+			if self._peek() != '}':
+				while True:
+					section = self._decode_value()
+					self._expect(':')
+					if self._peek() == '[':
+						for entity in self._iter_list():
+							yield section, entity
+					else:
+						yield section, self._decode_value()
+					if self._next_separator('}'):
+						break
+			self._expect('}')
+			if self._next_separator(']'):
+				break
+		self._expect(']')
+
+	def _iter_list(self):
+		self._expect('[')
+		if self._peek() == ']':
+			self._expect(']')
+			return
+		while True:
+			yield self._decode_value()
+			if self._next_separator(']'):
+				break
+		self._expect(']')
+
+	# Consumes a comma and returns False, or returns True if the next character is the closing character
+	def _next_separator(self, closing):
+		if self._peek() == ',':
+			self._pos += 1
+			return False
+		if self._peek() != closing:
+			self._raise("expected ',' or '" + closing + "'")
+		return True
+
+	def _decode_value(self):
+		self._peek()
+		while True:
+			try:
+				value, end = self._decoder.raw_decode(self._buffer, self._pos)
+				# A number cut by the end of a chunk is decoded as a shorter number ("2." as 2),
+				# the value is complete only if it is followed by a terminator already in the buffer
+				if (end < len(self._buffer) and self._buffer[end] in self._VALUE_TERMINATORS) or self._eof:
+					self._pos = end
+					return value
+			except json.JSONDecodeError:
+				if self._eof:
+					raise
+			self._read(max(self._CHUNK_SIZE, len(self._buffer)))
+
+	def _expect(self, char):
+		if self._peek() != char:
+			self._raise("expected '" + char + "'")
+		self._pos += 1
+
+	# Returns the next non-whitespace character without consuming it, or None at the end of the file
+	def _peek(self):
+		while True:
+			while self._pos < len(self._buffer) and self._buffer[self._pos] in ' \t\n\r':
+				self._pos += 1
+			if self._pos < len(self._buffer):
+				return self._buffer[self._pos]
+			if self._eof:
+				return None
+			self._read(self._CHUNK_SIZE)
+
+	def _read(self, size):
+		chunk = self._file.read(size)
+		if chunk == "":
+			self._eof = True
+		self._buffer = self._buffer[self._pos:] + chunk
+		self._pos = 0
+
+	# Keys are shared by all entities, as json.load does within a single document
+	def _intern_keys(self, pairs):
+		return {sys.intern(key): value for key, value in pairs}
+
+	def _raise(self, message):
+		raise json.JSONDecodeError("DremioJsonParser: " + message, self._buffer, self._pos)
@@ -0,0 +1,158 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import threading
+
+
+###
+# Recovers catalog paths from dot separated names such as INFORMATION_SCHEMA schemas, where abc/ab.c/abc
+# is reported as abc.ab.c.abc. Segments are joined one at a time, and the catalog is probed for every prefix:
+# if an entity exists, the next segment starts a new path element ('/'), otherwise the segment was part of a
+# name containing a dot ('.'). Probe results are kept in a prefix trie, so names sharing a prefix with
+# an already normalized name only probe their new segments.
+# Elements enclosed in double quotes, and paths inserted as known, are recorded without probing.
+# A segment may be recorded with both separators, as abc/ab and abc/ab.c may both exist. A segment recorded
+# as part of a name only tells that the name exists, so an unquoted segment follows it only once probed.
+# Catalog paths are case insensitive, so are the segments of the trie.
+###
+class DremioPathTrie:
+
+	# Function telling whether a catalog entity exists for a '/' separated path
+	_exists = None
+	# Trie nodes are {'probed': bool, 'children': {(lower case segment, '/' or '.'): node}}, probed telling
+	# that the catalog was probed for the segment, and the other separator ruled out
+	_root = None
+	_lock = None
+
+	_probes = 0
+
+	def __init__(self, exists):
+		self._exists = exists
+		self._root = {'probed': True, 'children': {}}
+		self._lock = threading.Lock()
+
+	# Records a path known to exist in the catalog, given as a list of elements
+	def insert(self, path):
+		self.normalize_elements([(element, True) for element in path])
+
+	# Returns the number of leading segments found in the trie and their normalized path, without probing
+	def longest_prefix(self, segments):
+		count, normalized_path, node = self._walk([(segment, None) for segment in segments])
+		return count, normalized_path
+
+	# Returns the normalized path of the segments, followed by the separator found for the last segment
+	def normalize(self, segments):
+		return self._normalize([(segment, None) for segment in segments])
+
+	# Returns the normalized path of a dot separated name, see split_name
+	def normalize_name(self, name):
+		return self.normalize_elements(split_name(name))
+
+	# Returns the normalized path of (element, quoted) pairs. A quoted element is a single path element
+	# that may contain dots, the segments of an unquoted element are probed.
+	def normalize_elements(self, elements):
+		tokens = []
+		for element, quoted in elements:
+			if quoted:
+				segments = element.split('.')
+				tokens.extend([(segment, '.') for segment in segments[:-1]])
+				tokens.append((segments[-1], '/'))
+			else:
+				tokens.extend([(segment, None) for segment in element.split('.')])
+		return self._normalize(tokens)
+
+	# tokens: (segment, separator), the separator is None if it is not known and the catalog has to be probed
+	def _normalize(self, tokens):
+		node = self._root
+		normalized_path = ""
+		for segment, separator in tokens:
+			with self._lock:
+				child, child_separator = self._get_child(node, segment, separator)
+			if child is None:
+				probed = separator is None
+				if probed:
+					separator = '/' if self._exists(normalized_path + segment) else '.'
+					with self._lock:
+						self._probes += 1
+				with self._lock:
+					child = node['children'].setdefault((segment.lower(), separator), {'probed': probed, 'children': {}})
+					child['probed'] = child['probed'] or probed
+				child_separator = separator
+			normalized_path = normalized_path + segment + child_separator
+			node = child
+		return normalized_path
+
+	def _walk(self, tokens):
+		node = self._root
+		normalized_path = ""
+		count = 0
+		with self._lock:
+			for segment, separator in tokens:
+				child, separator = self._get_child(node, segment, separator)
+				if child is None:
+					break
+				normalized_path = normalized_path + segment + separator
+				node = child
+				count += 1
+		return count, normalized_path, node
+
+	# Returns the child of a segment and its separator, (None, None) if the catalog has to be probed
+	def _get_child(self, node, segment, separator):
+		if separator is not None:
+			return node['children'].get((segment.lower(), separator)), separator
+		child = node['children'].get((segment.lower(), '/'))
+		if child is not None:
+			return child, '/'
+		child = node['children'].get((segment.lower(), '.'))
+		if child is not None and child['probed']:
+			return child, '.'
+		return None, None
+
+	def get_probes(self):
+		return self._probes
+
+
+# Splits a dot separated name into (element, quoted) pairs. Elements containing dots may be enclosed
+# in double quotes, a double quote within a quoted element is doubled: abc."ab.c"."x""y" is
+# [('abc', False), ('ab.c', True), ('x"y', True)].
+def split_name(name):
+	elements = []
+	element = ""
+	quoted = False
+	in_quotes = False
+	i = 0
+	while i < len(name):
+		char = name[i]
+		if in_quotes:
+			if char == '"' and name[i + 1:i + 2] == '"':
+				element = element + '"'
+				i += 1
+			elif char == '"':
+				in_quotes = False
+			else:
+				element = element + char
+		elif char == '"' and element == "" and not quoted:
+			in_quotes = True
+			quoted = True
+		elif char == '.':
+			elements.append((element, quoted))
+			element = ""
+			quoted = False
+		else:
+			element = element + char
+		i += 1
+	elements.append((element, quoted))
+	return elements
@@ -0,0 +1,101 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import threading
+
+
+###
+# Cache of users, groups and roles of a single Dremio environment.
+# Each principal is requested from Dremio once per run, by id or by name, and principals that
+# do not exist are cached as None. Failed requests are not cached, so that a transient failure
+# does not make a principal unresolvable for the rest of the run. Safe to share between threads.
+###
+class DremioPrincipalCache:
+
+	# Dremio object pointing to the environment the principals belong to
+	_dremio_env = None
+
+	# Principals keyed by (principal type, 'id' or 'name', id or name)
+	_principals = None
+	# Guards _principals and _key_locks. A per-key lock makes concurrent lookups of the same principal wait for one request.
+	_lock = None
+	_key_locks = None
+
+	# Returned by Dremio for principals that do not exist, rather than None for failed requests
+	_NOT_FOUND = object()
+
+	_hits = 0
+	_misses = 0
+
+	def __init__(self, dremio_env):
+		self._dremio_env = dremio_env
+		self._principals = {}
+		self._lock = threading.Lock()
+		self._key_locks = {}
+
+	def get_user(self, user_id):
+		return self._get(('user', 'id', user_id), self._dremio_env.get_user)
+
+	def get_user_by_name(self, username):
+		return self._get(('user', 'name', username), self._dremio_env.get_user_by_name)
+
+	def get_group(self, group_id):
+		return self._get(('group', 'id', group_id), self._dremio_env.get_group)
+
+	def get_group_by_name(self, groupname):
+		return self._get(('group', 'name', groupname), self._dremio_env.get_group_by_name)
+
+	def get_role(self, role_id):
+		return self._get(('role', 'id', role_id), self._dremio_env.get_role)
+
+	def get_role_by_name(self, rolename):
+		return self._get(('role', 'name', rolename), self._dremio_env.get_role_by_name)
+
+	def get_hits(self):
+		return self._hits
+
+	def get_misses(self):
+		return self._misses
+
+	def get_stats_desc(self):
+		return "principal cache: " + str(self._hits) + " hit(s), " + str(self._misses) + " miss(es)"
+
+	def _get(self, key, request_function):
+		with self._lock:
+			if key in self._principals:
+				self._hits += 1
+				return self._principals[key]
+			key_lock = self._key_locks.setdefault(key, threading.Lock())
+		with key_lock:
+			with self._lock:
+				if key in self._principals:
+					self._hits += 1
+					return self._principals[key]
+				self._misses += 1
+			principal = request_function(key[2], not_found=self._NOT_FOUND)
+			not_found = principal is self._NOT_FOUND
+			if not_found:
+				principal = None
+			with self._lock:
+				# Failed requests are retried by the next lookup
+				if principal is not None or not_found:
+					self._principals[key] = principal
+				# A principal fetched by id is also known by its name and vice versa
+				if principal is not None and 'id' in principal and 'name' in principal:
+					self._principals.setdefault((key[0], 'id', principal['id']), principal)
+					self._principals.setdefault((key[0], 'name', principal['name']), principal)
+				self._key_locks.pop(key, None)
+			return principal
@@ -0,0 +1,101 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import logging
+import threading
+import time
+
+
+###
+# Throttles the API calls issued to a Dremio environment by DremioHttpSession.
+# A token bucket caps the request rate, allowing bursts of up to one second of requests.
+# An AIMD controller caps the number of requests in flight: the limit grows by one request per window of
+# responses received within the latency target, and is halved when the environment is overloaded
+# (HTTP 429 or 503, timeout or connection error), at most once per window of requests in flight.
+# Either control is disabled when its limit is 0.
+###
+class DremioRateLimiter:
+
+	# Requests per second, 0 for no rate limit
+	_rate = 0
+	_tokens = 0
+	_last_refill = None
+
+	# Maximum and current limit of requests in flight, 0 for no concurrency control
+	_max_concurrency = 0
+	_window = 1.0
+	_in_flight = 0
+	# Responses slower than the target do not grow the window
+	_latency_target = None
+	# Requests started before the last decrease do not decrease the window again
+	_last_decrease = None
+
+	_lock = None
+	_condition = None
+
+	_overloaded = 0
+
+	def __init__(self, rate=0, max_concurrency=0, latency_target=1.0):
+		self._rate = rate
+		self._tokens = rate
+		self._last_refill = time.monotonic()
+		self._max_concurrency = max_concurrency
+		self._window = 1.0
+		self._in_flight = 0
+		self._latency_target = latency_target
+		self._last_decrease = time.monotonic()
+		self._lock = threading.Lock()
+		self._condition = threading.Condition(self._lock)
+
+	# Blocks until the request may be sent, returns the start time to be passed to release
+	def acquire(self):
+		if self._rate > 0:
+			with self._lock:
+				now = time.monotonic()
+				self._tokens = min(self._rate, self._tokens + (now - self._last_refill) * self._rate)
+				self._last_refill = now
+				# Reserve a token, a negative balance is the time to wait for it
+				self._tokens -= 1
+				delay = -self._tokens / self._rate if self._tokens < 0 else 0
+			if delay > 0:
+				time.sleep(delay)
+		if self._max_concurrency > 0:
+			with self._condition:
+				while self._in_flight >= int(self._window):
+					self._condition.wait()
+				self._in_flight += 1
+		return time.monotonic()
+
+	def release(self, start, overloaded):
+		if self._max_concurrency <= 0:
+			if overloaded:
+				with self._lock:
+					self._overloaded += 1
+			return
+		with self._condition:
+			self._in_flight -= 1
+			if overloaded:
+				self._overloaded += 1
+				if start >= self._last_decrease:
+					self._window = max(1.0, self._window / 2)
+					self._last_decrease = time.monotonic()
+					logging.info("DremioRateLimiter: environment overloaded, reduced requests in flight to " + str(int(self._window)))
+			elif time.monotonic() - start <= self._latency_target and self._window < self._max_concurrency:
+				self._window = min(float(self._max_concurrency), self._window + 1.0 / self._window)
+			self._condition.notify_all()
+
+	def get_stats_desc(self):
+		return "rate limiter: " + str(self._overloaded) + " overloaded response(s), " + str(int(self._window)) + " request(s) in flight allowed"
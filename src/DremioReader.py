@@ -20,8 +20,12 @@ from DremioClonerConfig import DremioClonerConfig
 from DremioClonerUtils import DremioClonerUtils
 from DremioClonerLogger import DremioClonerLogger
 from DremioClonerFilter import DremioClonerFilter
+from DremioTraversalPlanner import DremioTraversalPlanner
+from DremioPrincipalCache import DremioPrincipalCache
+from DremioFile import DremioFile
 import parse_sql
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 
 class DremioReader:
@@ -31,35 +35,101 @@ class DremioReader:
 	_utils = None
 	_logger = None
 	_filter = None
+	# Prunes children out of the filters before their definitions are requested
+	_traversal_planner = None
 
 	# Dremio object pointing to the source Dremio environment
 	_dremio_env = None
 
 	# DremioData object containing data from Dremio source environment 
-	_d = DremioData()
+	_d = None
 
 	# Current top-level hierarchy context: Home, Space, Source
 	_top_level_hierarchy_context = None
 
-	def __init__(self, source_dremio, config):
+	# Thread pool used to fan out catalog requests when concurrency is greater than 1
+	_executor = None
+	# Catalog responses fetched ahead of the crawl, keyed by (response type, entity id)
+	_prefetched = None
+
+	# Users, groups and roles of the source environment, possibly shared with other commands
+	_principal_cache = None
+	# (principal type, id) of the principals already added to the referenced users, groups and roles
+	_referenced_principal_ids = None
+
+	# DremioFileStream receiving entities as they are read, None when DremioData is saved at the end of the run
+	_file_stream = None
+	# Sections kept in DremioData when streaming, as they are used later in the crawl
+	_retained_sections = None
+	# Ids of read VDSs, names of read folders and (section, entity id) of read wikis and tags
+	_vds_ids = None
+	_folder_names = None
+	_collaboration_ids = None
+
+	# Previous get used by an incremental get: dataset versions, datasets, wikis and tags keyed by entity id.
+	# Wikis and tags are None if they were not processed by the previous get.
+	_baseline_versions = None
+	_baseline_datasets = None
+	_baseline_wikis = None
+	_baseline_tags = None
+	# Ids of datasets carried forward from the baseline
+	_carried_forward_ids = None
+
+	# DremioCheckpoint recording read datasets, None if not configured
+	_checkpoint = None
+
+	# Tables referenced by VDS SQL, each SQL is parsed once
+	_sql_extractor = None
+
+	def __init__(self, source_dremio, config, principal_cache=None, file_stream=None, checkpoint=None):
 		self._config = config
 		self._dremio_env = source_dremio
+		self._d = DremioData()
 		self._logger = DremioClonerLogger(self._config.max_errors, self._config.logging_verbose)
 		self._utils = DremioClonerUtils(config)
 		self._filter = DremioClonerFilter(config)
+		self._traversal_planner = DremioTraversalPlanner(config, self._filter)
+		self._prefetched = {}
+		self._principal_cache = principal_cache if principal_cache is not None else DremioPrincipalCache(source_dremio)
+		self._referenced_principal_ids = set()
+		self._file_stream = file_stream
+		self._retained_sections = set(['sources'])
+		if self._config.vds_dependencies_process_mode == 'get':
+			self._retained_sections.update(['pds', 'vds'])
+		self._vds_ids = set()
+		self._folder_names = set()
+		self._collaboration_ids = set()
+		self._carried_forward_ids = set()
+		self._checkpoint = checkpoint
+		self._sql_extractor = parse_sql.SqlTableExtractor(processes=self._config.sql_processes)
 
 	# Read all data from the source Dremio environemnt
 	# Return DremioData
 	def read_dremio_environment(self):
-		self._read_catalog()
-		if not self._config.pds_list_useapi and self._filter.is_pds_in_scope():
-			self._read_all_pds()
-		self._read_reflections()
-		self._read_rules()
-		self._read_queues()
-		self._read_votes()
-		# Make sure that all VDS dependencies included as per configuration
-		self._process_vds_dependencies()
+		self._load_baseline()
+		if self._config.concurrency > 1:
+			self._executor = ThreadPoolExecutor(max_workers=self._config.concurrency)
+		try:
+			self._read_catalog()
+			if not self._config.pds_list_useapi and self._filter.is_pds_in_scope():
+				self._read_all_pds()
+			self._read_reflections()
+			self._read_rules()
+			self._read_queues()
+			self._read_votes()
+			# Make sure that all VDS dependencies included as per configuration
+			self._process_vds_dependencies()
+			self._logger.info("read_dremio_environment: " + self._principal_cache.get_stats_desc())
+			self._logger.info("read_dremio_environment: " + self._sql_extractor.get_stats_desc())
+			self._logger.info("read_dremio_environment: " + self._traversal_planner.get_stats_desc())
+			if self._baseline_versions is not None:
+				self._logger.info("read_dremio_environment: " + str(len(self._carried_forward_ids)) + " dataset(s) with unchanged version carried forward from baseline.")
+			if self._checkpoint is not None:
+				self._logger.info("read_dremio_environment: " + self._checkpoint.get_stats_desc())
+		finally:
+			if self._executor is not None:
+				self._executor.shutdown()
+				self._executor = None
 		return self._d
 
 	def _read_all_pds(self):
@@ -70,10 +140,12 @@ class DremioReader:
 												self._config.source_folder_filter_paths,
 												self._config.source_folder_exclude_filter,
 												self._config.pds_filter, self._config.pds_exclude_filter,
-												pds_error_list=self._d.pds_error_list)
+												pds_error_list=self._d.pds_error_list,
+												page_size=self._config.pds_list_page_size,
+												concurrency=self._config.concurrency)
 			for pds in pds_list:
 				if self._filter.match_pds_filter(pds):
-					self._d.pds_list.append(pds)
+					self._add('pds', pds)
 					self._read_acl(pds)
 					self._read_wiki(pds)
 					self._read_tags(pds)
@@ -81,9 +153,112 @@ class DremioReader:
 	# Read Dremio catalog from source environment recursively going to containers and their children objects 
 	def _read_catalog(self):
 		containers = self._dremio_env.list_catalog()['data']
+		self._prefetch([container for container in containers if self._is_container_in_scope(container)])
 		for container in containers:
 			self._logger.debug("_read_catalog: processing container " + self._utils.get_entity_desc(container))
 			self._process_container(container)
+			self._discard_prefetched(container)
+
+	# Incremental get: datasets whose version (tag) did not change since the baseline get are carried forward
+	def _load_baseline(self):
+		if self._config.baseline_filename is None or self._baseline_versions is not None:
+			return
+		baseline = DremioFile(self._config).read_dremio_environment_from_json_file(self._config.baseline_filename)
+		self._baseline_versions = {}
+		for version in baseline.catalog_versions:
+			self._baseline_versions[version['id']] = version['tag']
+		self._baseline_datasets = {}
+		for dataset in baseline.pds_list + baseline.vds_list:
+			self._baseline_datasets[dataset['id']] = dataset
+		if self._is_processed_in_baseline(baseline, 'wiki.process_mode'):
+			self._baseline_wikis = {}
+			for wiki in baseline.wikis:
+				self._baseline_wikis[wiki['entity_id']] = wiki
+		if self._is_processed_in_baseline(baseline, 'tag.process_mode'):
+			self._baseline_tags = {}
+			for tag in baseline.tags:
+				self._baseline_tags[tag['entity_id']] = tag
+		self._logger.info("_load_baseline: " + str(len(self._baseline_versions)) + " dataset version(s) loaded from " + self._config.baseline_filename)
+
+	def _is_processed_in_baseline(self, baseline, option):
+		for item in baseline.dremio_get_config:
+			if 'options' in item:
+				for option_item in item['options']:
+					if option in option_item:
+						return option_item[option] == 'process'
+		return False
+
+	# Carried forward datasets are served from the baseline as if they were prefetched, so the crawl
+	# does not request their definitions, wikis and tags. When resuming, datasets read by the interrupted
+	# run are served from the checkpoint the same way.
+	def _carry_forward(self, stubs):
+		for stub in stubs:
+			if stub.get('type') != 'DATASET' or 'id' not in stub:
+				continue
+			if self._checkpoint is not None and self._checkpoint.is_completed('dataset', stub['id']):
+				responses = self._checkpoint.get_data('dataset', stub['id'])
+				for response_type in responses:
+					self._prefetched[(response_type, stub['id'])] = responses[response_type]
+				self._checkpoint.count_resumed('dataset', stub['id'])
+				continue
+			if self._baseline_versions is None or 'tag' not in stub or stub['id'] not in self._baseline_datasets:
+				continue
+			if self._baseline_versions.get(stub['id']) != stub['tag']:
+				continue
+			self._prefetched[('entity', stub['id'])] = self._baseline_datasets[stub['id']]
+			if self._baseline_wikis is not None:
+				self._prefetched[('wiki', stub['id'])] = self._baseline_wikis.get(stub['id'])
+			if self._baseline_tags is not None:
+				self._prefetched[('tags', stub['id'])] = self._baseline_tags.get(stub['id'])
+			self._carried_forward_ids.add(stub['id'])
+
+	# Mirrors the checks done by _read_home, _read_space and _read_source before they read a container definition
+	def _is_container_in_scope(self, container):
+		if container['containerType'] == "HOME":
+			return self._config.home_process_mode == 'process'
+		elif container['containerType'] == "SPACE":
+			return self._filter.match_space_filter(container)
+		elif container['containerType'] == "SOURCE":
+			return (self._config.source_process_mode == 'process' or (self._config.pds_process_mode == 'process' and self._config.pds_list_useapi)) and \
+				self._filter.match_source_filter(container, loginfo=False)
+		return False
+
+	# Fetch catalog entities (and their wikis and tags) for the given stubs concurrently, ahead of the depth-first crawl.
+	# The crawl itself stays sequential and consumes these responses, so the order of DremioData is not affected.
+	def _prefetch(self, stubs):
+		if self._executor is None:
+			return
+		ids = [stub['id'] for stub in stubs if 'id' in stub and ('entity', stub['id']) not in self._prefetched]
+		for responses in self._executor.map(self._fetch_catalog_entity, ids):
+			self._prefetched.update(responses)
+
+	# Executed by the thread pool
+	def _fetch_catalog_entity(self, entity_id):
+		responses = {}
+		entity = self._dremio_env.get_catalog_entity_by_id(entity_id)
+		responses[('entity', entity_id)] = entity
+		# Entities identified by path (non-promoted files and folders in sources) may come back with a different id
+		if entity is None or entity_id[:7] == 'dremio:':
+			return responses
+		if self._config.wiki_process_mode == 'process':
+			responses[('wiki', entity_id)] = self._dremio_env.get_catalog_wiki(entity_id)
+		if entity.get('entityType') == 'dataset' and (self._config.tag_process_mode == 'process' or
+				(entity.get('type') == 'VIRTUAL_DATASET' and self._filter.is_vds_tag_filter_set())):
+			responses[('tags', entity_id)] = self._dremio_env.get_catalog_tags(entity_id)
+		return responses
+
+	def _get_prefetched(self, response_type, entity_id, request_function, consume=True):
+		key = (response_type, entity_id)
+		if key not in self._prefetched:
+			return request_function(entity_id)
+		if consume:
+			return self._prefetched.pop(key)
+		return self._prefetched[key]
+
+	def _discard_prefetched(self, stub):
+		if 'id' in stub:
+			for response_type in ['entity', 'wiki', 'tags']:
+				self._prefetched.pop((response_type, stub['id']), None)
 
 	# Identify a container and delegate processing 
 	def _process_container(self, container):
@@ -105,7 +280,7 @@ class DremioReader:
 		self._logger.debug("_read_home: processing container: " + self._utils.get_entity_desc(container))
 		if self._config.home_process_mode == 'process':
 			self._top_level_hierarchy_context = "HOME"
-			self._d.containers.append(container)
+			self._add('containers', container)
 			entity = self._get_entity_definition_by_id(container)
 			if entity is not None:
 				self._logger.info("_read_home: " + self._utils.get_entity_desc(entity))
@@ -113,7 +288,7 @@ class DremioReader:
 					entity.pop("createdAt")
 				if "tag" in entity:
 					entity.pop("tag")
-				self._d.homes.append(entity)
+				self._add('homes', entity)
 				self._read_acl(entity)
 				self._read_wiki(entity)
 				self._read_space_children(entity)
@@ -126,7 +301,7 @@ class DremioReader:
 		self._logger.debug("_read_space: processing container: " + self._utils.get_entity_desc(container))
 		self._top_level_hierarchy_context = "SPACE"
 		if self._filter.match_space_filter(container):
-			self._d.containers.append(container)
+			self._add('containers', container)
 			entity = self._get_entity_definition_by_id(container)
 			if entity is not None:
 				self._logger.debug("_read_space: " + self._utils.get_entity_desc(container))
@@ -134,7 +309,7 @@ class DremioReader:
 					entity.pop("createdAt")
 				if "tag" in entity:
 					entity.pop("tag")
-				self._d.spaces.append(entity)
+				self._add('spaces', entity)
 				self._read_acl(entity)
 				self._read_wiki(entity)
 				self._read_space_children(entity)
@@ -147,7 +322,7 @@ class DremioReader:
 		if self._config.source_process_mode == 'process' or (self._config.pds_process_mode == 'process' and self._config.pds_list_useapi):
 			self._top_level_hierarchy_context = "SOURCE"
 			if self._filter.match_source_filter(container):
-				self._d.containers.append(container)
+				self._add('containers', container)
 				entity = self._get_entity_definition_by_id(container)
 				if entity is not None:
 					# Re-validate the filter with entity since there is more details in entity
@@ -157,7 +332,7 @@ class DremioReader:
 						entity.pop("tag")
 					if self._filter.match_source_filter(entity):
 						self._logger.debug("_read_source: " + self._utils.get_entity_desc(entity))
-						self._d.sources.append(entity)
+						self._add('sources', entity)
 						self._read_acl(entity)
 						self._read_wiki(entity)
 						# Depending on the useapi flag, PDSs can be collected via INFORMATION_SCHEMA. See also DX16597
@@ -182,19 +357,18 @@ class DremioReader:
 			entity.pop("tag")
 		if self._top_level_hierarchy_context == "HOME" or self._filter.match_space_folder_filter(folder):
 			self._logger.debug("_read_space_folder: " + self._utils.get_entity_desc(folder))
-			self._d.folders.append(entity)
+			self._add('folders', entity)
+			self._folder_names.add(entity['path'][-1])
 			self._read_acl(entity)
 			self._read_wiki(entity)
 			# Validate all parent folders in the path have been saved already
 			folder_path = entity['path']
 			for i in range(1, len(folder_path)-1):
-				folderSaved = False
-				for item in self._d.folders:
-					if item['path'][-1] == folder_path[i]:
-						folderSaved = True
-				if not folderSaved:
+				if folder_path[i] not in self._folder_names:
 					parent_entity = self._get_entity_definition_by_path(folder_path[0:i+1])
-					self._d.folders.append(parent_entity)
+					self._add('folders', parent_entity)
+					if parent_entity is not None:
+						self._folder_names.add(parent_entity['path'][-1])
 		self._read_space_children(entity)
 
 	def _read_space_children(self, parent_entity):
@@ -202,19 +376,22 @@ class DremioReader:
 		if 'entityType' not in parent_entity:
 			self._logger.error("_read_space_children: bad data, skipping entity: " + self._utils.get_entity_desc(parent_entity))
 			return
-		for child in parent_entity['children']:
+		children = self._traversal_planner.plan_children(parent_entity['children'], self._top_level_hierarchy_context)
+		self._carry_forward(children)
+		self._prefetch([child for child in children if child['type'] != "FILE"])
+		for child in children:
 			if "createdAt" in child:
 				child.pop("createdAt")
-			if "tag" in child:
-				child.pop("tag")
+			version = child.pop("tag", None)
 			if child['type'] == "DATASET":
-				self._read_dataset(child)
+				self._read_dataset(child, version)
 			elif child['type'] == "FILE":
 				self._read_file(child)
 			elif child['containerType'] == "FOLDER":
 				self._read_space_folder(child)
 			else:
 				self._logger.error("_read_space_children: not supported entity type " + child['type'])
+			self._discard_prefetched(child)
 
 	def _read_source_folder(self, folder):
 		self._logger.debug("_read_source_folder: processing folder: " + self._utils.get_entity_desc(folder))
@@ -235,21 +412,26 @@ class DremioReader:
 		if 'entityType' not in parent_entity:
 			self._logger.error("_read_source_children: bad data, skipping entity: " + self._utils.get_entity_desc(parent_entity))
 			return
-		for child in parent_entity['children']:
+		children = self._traversal_planner.plan_children(parent_entity['children'], self._top_level_hierarchy_context)
+		self._carry_forward(children)
+		if self._top_level_hierarchy_context == "SOURCE":
+			self._prefetch([child for child in children if child['type'] != "FILE"])
+		for child in children:
 			if "createdAt" in child:
 				child.pop("createdAt")
-			if "tag" in child:
-				child.pop("tag")
+			version = child.pop("tag", None)
 			if child['type'] == "DATASET":
-				self._read_dataset(child)
+				self._read_dataset(child, version)
 			elif child['type'] == "FILE":
 				self._read_file(child)
 			elif child['containerType'] == "FOLDER":
 				self._read_source_folder(child)
 			else:
 				self._logger.error("_read_source_children: not supported entity type " + child['type'])
+			self._discard_prefetched(child)
 
-	def _read_dataset(self, dataset):
+	# version: tag of the dataset in the listing of its parent, recorded for an incremental get
+	def _read_dataset(self, dataset, version=None):
 		self._logger.debug("_read_dataset: processing dataset: " + self._utils.get_entity_desc(dataset))
 		entity = self._get_entity_definition_by_id(dataset)
 		if entity is not None:
@@ -260,16 +442,29 @@ class DremioReader:
 			self._logger.debug("_read_dataset: " + dataset['datasetType'] + " : " + self._utils.get_entity_desc(dataset))
 			if dataset['datasetType'] == "PROMOTED" or dataset['datasetType'] == "DIRECT":
 				if self._filter.match_pds_filter(dataset):
-					self._d.pds_list.append(entity)
+					self._add('pds', entity)
 			elif dataset['datasetType'] == "VIRTUAL":
-				tags = self._dremio_env.get_catalog_tags(entity['id'])
+				tags = None
+				if self._filter.is_vds_tag_filter_set():
+					# Kept for _read_tags, so tags are requested once
+					tags = self._get_prefetched('tags', entity['id'], self._dremio_env.get_catalog_tags, consume=False)
+					self._prefetched[('tags', entity['id'])] = tags
 				if self._filter.match_vds_filter(dataset, tags=tags):
-					self._d.vds_list.append(entity)
+					self._add('vds', entity)
 			else:
 				self._logger.error("_read_dataset: Unexpected dataset type " + dataset['datasetType'] + " for " + self._utils.get_entity_desc(dataset) + ".")
 			self._read_acl(entity)
-			self._read_wiki(entity)
-			self._read_tags(entity)
+			wiki = self._read_wiki(entity)
+			tags = self._read_tags(entity)
+			if version is not None:
+				self._add('catalog_versions', {'id': dataset['id'], 'tag': version})
+			if self._checkpoint is not None and not self._checkpoint.is_completed('dataset', dataset['id']):
+				responses = {'entity': entity}
+				if self._config.wiki_process_mode == 'process':
+					responses['wiki'] = wiki
+				if self._config.tag_process_mode == 'process':
+					responses['tags'] = tags
+				self._checkpoint.complete('dataset', dataset['id'], responses)
 
 	def _read_file(self, file_name):
 		# do nothing
@@ -297,7 +492,7 @@ class DremioReader:
 					reflection_path = reflection_dataset['path']
 					self._logger.debug("_read_reflections: processing reflection " + reflection['id'] + " path: " + str(reflection_path))
 					reflection["path"] = reflection_path
-					self._d.reflections.append(reflection)
+					self._add('reflections', reflection)
 		elif self._config.reflection_process_mode == 'process' and self._config.source_ce:
 			# If processing reflections for CE, the reflections IDs must be specified in reflection_id_include_list
 			for reflection_id in self._config.reflection_id_include_list:
@@ -313,38 +508,40 @@ class DremioReader:
 					reflection_path = reflection_dataset['path']
 					self._logger.debug("_read_reflections: processing CE reflection " + reflection['id'] + " path: " + str(reflection_path))
 					reflection["path"] = reflection_path
-					self._d.reflections.append(reflection)
+					self._add('reflections', reflection)
 		else:
 			self._logger.debug("_read_reflections: skipping reflections processing as per job configuration")
 
 	def _is_reflection_in_vds_list(self, reflection):
 		if not self._config.reflection_only_matching_vds:
 			return True
-		for vds in self._d.vds_list:
-			if vds['id'] == reflection['datasetId']:
-				return True
-		return False
+		return reflection['datasetId'] in self._vds_ids
 
 	# Note, tags are only available for datasets
+	# Returns the tags read, None if there are none or tags are not processed
 	def _read_tags(self, entity):
 		self._logger.debug("_read_tags: for entity " + self._utils.get_entity_desc(entity))
 		if self._config.tag_process_mode == 'process':
-			tag = self._dremio_env.get_catalog_tags(entity['id'])
+			tag = self._get_prefetched('tags', entity['id'], self._dremio_env.get_catalog_tags)
 			if tag is not None:
 				tag['entity_id'] = entity['id']
 				if entity['entityType'] == 'space' or entity['entityType'] == 'source':
 					tag['path'] = [entity['name']]
 				else:
 					tag['path'] = entity['path']
-				if tag not in self._d.tags:
-					self._d.tags.append(tag)
+				if ('tags', entity['id']) not in self._collaboration_ids:
+					self._collaboration_ids.add(('tags', entity['id']))
+					self._add('tags', tag)
+			return tag
 		else:
 			self._logger.debug("_read_tags: skipping tags processing as per job configuration")
+			return None
 
+	# Returns the wiki read, None if there is none or wikis are not processed
 	def _read_wiki(self, entity):
 		self._logger.debug("_read_wiki: for entity " + self._utils.get_entity_desc(entity))
 		if self._config.wiki_process_mode == 'process':
-			wiki = self._dremio_env.get_catalog_wiki(entity['id'])
+			wiki = self._get_prefetched('wiki', entity['id'], self._dremio_env.get_catalog_wiki)
 			if wiki is not None:
 				if "createdAt" in wiki:
 					wiki.pop("createdAt")
@@ -355,10 +552,13 @@ class DremioReader:
 					wiki['path'] = [entity['name']]
 				else:
 					wiki['path'] = entity['path']
-				if wiki not in self._d.wikis:
-					self._d.wikis.append(wiki)
+				if ('wikis', entity['id']) not in self._collaboration_ids:
+					self._collaboration_ids.add(('wikis', entity['id']))
+					self._add('wikis', wiki)
+			return wiki
 		else:
 			self._logger.debug("_read_wiki: skipping wiki processing as per job configuration")
+			return None
 
 	def _read_acl(self, entity):
 		self._logger.debug("_read_acl: for entity " + self._utils.get_entity_desc(entity))
@@ -366,38 +566,31 @@ class DremioReader:
 			acl = entity['accessControlList']
 			if 'users' in acl:
 				for user in acl['users']:
-					user_entity = self._dremio_env.get_user(user['id'])
-					if user_entity is not None:
-						if "createdAt" in user_entity:
-							user_entity.pop("createdAt")
-						if "tag" in user_entity:
-							user_entity.pop("tag")
-						if user_entity not in self._d.referenced_users:
-							self._d.referenced_users.append(user_entity)
+					self._add_referenced_principal('user', user['id'], self._principal_cache.get_user, 'referenced_users')
 			if 'groups' in acl:
 				for group in acl['groups']:
-					group_entity = self._dremio_env.get_group(group['id'])
-					if group_entity is not None:
-						if "createdAt" in group_entity:
-							group_entity.pop("createdAt")
-						if "tag" in group_entity:
-							group_entity.pop("tag")
-						if group_entity not in self._d.referenced_groups:
-							self._d.referenced_groups.append(group_entity)
-
+					self._add_referenced_principal('group', group['id'], self._principal_cache.get_group, 'referenced_groups')
 			if 'roles' in acl:
 				for role in acl['roles']:
-					role_entity = self._dremio_env.get_role(role['id'])
-					if role_entity is not None:
-						if "createdAt" in role_entity:
-							role_entity.pop("createdAt")
-						if "tag" in role_entity:
-							role_entity.pop("tag")
-						if role_entity not in self._d.referenced_roles:
-							self._d.referenced_roles.append(role_entity)
+					self._add_referenced_principal('role', role['id'], self._principal_cache.get_role, 'referenced_roles')
+
+	def _add_referenced_principal(self, principal_type, principal_id, get_principal, section):
+		if (principal_type, principal_id) in self._referenced_principal_ids:
+			return
+		principal_entity = get_principal(principal_id)
+		if principal_entity is not None:
+			if "createdAt" in principal_entity:
+				principal_entity.pop("createdAt")
+			if "tag" in principal_entity:
+				principal_entity.pop("tag")
+			self._referenced_principal_ids.add((principal_type, principal_id))
+			self._add(section, principal_entity)
 
 	def _process_vds_dependencies(self):
 		if self._config.vds_dependencies_process_mode == 'get':
+			if self._config.source_ce or not self._config.source_graph_support:
+				# Parse SQL of all read VDSs in bulk, dependencies discovered later are parsed one at a time
+				self._sql_extractor.tables_in_queries([vds['sql'] for vds in self._d.vds_list])
 			for vds in self._d.vds_list:
 				self._discover_dependencies(vds)
 			for vds in self._d.vds_list:
@@ -412,11 +605,11 @@ class DremioReader:
 				return
 			if dataset['type'] == 'PHYSICAL_DATASET':
 				if dataset not in self._d.pds_list:
-					self._d.pds_list.append(dataset)
+					self._add('pds', dataset)
 				return
 			elif dataset['type'] == 'VIRTUAL_DATASET':
 				if dataset not in self._d.vds_list:
-					self._d.vds_list.append(dataset)
+					self._add('vds', dataset)
 				# Process VDS dependencies
 				sql_dependency_paths = self._get_vds_dependency_paths(dataset)
 				for dependency_path in sql_dependency_paths:
@@ -441,17 +634,17 @@ class DremioReader:
 		vds_parent_list = self._get_vds_dependency_paths(vds)
 		vds_parent_json = {'id':vds['id'], 'path':vds['path'], 'parents':vds_parent_list }
 		if not self._config.source_ce and self._config.source_graph_support:
-			self._d.vds_parents.append(vds_parent_json)
+			self._add('vds_parents', vds_parent_json)
 
 	def _get_vds_dependency_paths(self, vds):
 		self._logger.debug("_get_vds_dependency_paths: processing vds: " + self._utils.get_entity_desc(vds))
 		if self._config.source_ce or not self._config.source_graph_support:
-			return parse_sql.tables_in_query(vds['sql'])
+			return self._sql_extractor.tables_in_query(vds['sql'])
 		else:
 			graph = self._dremio_env.get_catalog_entity_graph_by_id(vds['id'])
 			if graph is None:
 				self._logger.warn("Could not receive Graph via API. Try to set graph_api_support to False in the job configuration.")
-				return parse_sql.tables_in_query(vds['sql'])
+				return self._sql_extractor.tables_in_query(vds['sql'])
 			vds_parent_list = []
 			for parent in graph['parents']:
 				vds_parent_list.append(self._utils.normalize_path(parent['path']))
@@ -459,12 +652,10 @@ class DremioReader:
 
 	def _find_entity(self, path):
 		self._logger.debug("_find_entity: processing path: " + str(path))
-		for vds in self._d.vds_list:
-			if 'path' in vds and self._utils.normalize_path(vds['path']) == path:
-				return vds
-		for pds in self._d.pds_list:
-			if 'path' in pds and self._utils.normalize_path(pds['path']) == path:
-				return pds
+		vds = self._d.vds_list.get_by_path(path)
+		if vds is not None:
+			return vds
+		return self._d.pds_list.get_by_path(path)
 
 	# Helper method, used by most read* methods
 	def _get_entity_definition_by_id(self, src):
@@ -473,7 +664,7 @@ class DremioReader:
 			self._logger.error("_read_entity_definition: bad data, skipping entity: " + self._utils.get_entity_desc(src))
 			return None
 		else:
-			entity = self._dremio_env.get_catalog_entity_by_id(src['id'])
+			entity = self._get_prefetched('entity', src['id'], self._dremio_env.get_catalog_entity_by_id)
 			if entity is None:
 				self._logger.error("_read_entity_definition: cannot retrieve entity for id: " + src['id'])
 			return entity
@@ -491,9 +682,9 @@ class DremioReader:
 		if self._config.wlm_queue_process_mode == 'process' and not self._config.source_ce:
 			list_queues = self._dremio_env.list_queues()
 			if list_queues and 'data' in list_queues:
-				self._d.queues = list_queues['data']
+				self._set('queues', list_queues['data'])
 			else:
-				self._d.queues = []
+				self._set('queues', [])
 		else:
 			self._logger.debug("_read_queues: skipping as per job configuration")
 
@@ -502,9 +693,9 @@ class DremioReader:
 		if self._config.wlm_rule_process_mode == 'process' and not self._config.source_ce:
 			list_rules = self._dremio_env.list_rules()
 			if list_rules and 'rules' in list_rules:
-				self._d.rules = list_rules['rules']
+				self._set('rules', list_rules['rules'])
 			else:
-				self._d.rules = []
+				self._set('rules', [])
 		else:
 			self._logger.debug("read_rules: skipping as per job configuration")
 
@@ -513,11 +704,34 @@ class DremioReader:
 		if self._config.vote_process_mode == 'process' and not self._config.source_ce:
 			list_votes = self._dremio_env.list_votes()
 			if list_votes and 'data' in list_votes:
-				self._d.votes = list_votes['data']
+				self._set('votes', list_votes['data'])
 			else:
-				self._d.votes = []
+				self._set('votes', [])
 		else:
 			self._logger.debug("read_votes: skipping as per job configuration")
 
+	# Every read entity is added through _add. When streaming, the entity is written to the file stream
+	# and only kept in DremioData if its section is used later in the crawl.
+	def _add(self, section, entity):
+		if section == 'vds':
+			self._vds_ids.add(entity['id'])
+		if self._file_stream is not None:
+			self._file_stream.add(section, entity)
+			if section not in self._retained_sections:
+				return
+		getattr(self._d, self._get_section_attribute(section)).append(entity)
+
+	def _set(self, section, entities):
+		setattr(self._d, self._get_section_attribute(section), [])
+		for entity in entities:
+			self._add(section, entity)
+
+	def _get_section_attribute(self, section):
+		if section == 'pds':
+			return 'pds_list'
+		if section == 'vds':
+			return 'vds_list'
+		return section
+
 	def get_errors_count(self):
 		return self._logger.errors_encountered
\ No newline at end of file
@@ -18,6 +18,7 @@ from DremioData import DremioData
 from datetime import datetime
 import json
 from DremioClonerUtils import DremioClonerUtils
+from DremioPrincipalCache import DremioPrincipalCache
 
 
 class DremioReportAcl:
@@ -34,6 +35,9 @@ class DremioReportAcl:
 	# Dremio Utils
 	_utils = None
 
+	# Users, groups and roles of the source environment, normally shared with the DremioReader that produced dremio_data
+	_principal_cache = None
+
 	# File descriptor
 	_f = None
 
@@ -41,9 +45,10 @@ class DremioReportAcl:
 	_delimeter = None
 	_newline = None
 
-	def __init__(self, source_dremio, dremio_data, config):
+	def __init__(self, source_dremio, dremio_data, config, principal_cache=None):
 		self._config = config
 		self._dremio_env = source_dremio
+		self._principal_cache = principal_cache if principal_cache is not None else DremioPrincipalCache(source_dremio)
 		self._d = dremio_data
 		self._delimeter = self._config.report_csv_delimiter
 		self._newline = self._config.report_csv_newline
@@ -248,19 +253,17 @@ class DremioReportAcl:
 						  '' + self._delimeter + '' + self._newline)
 
 	def _get_user_name(self, user_id):
-		for user in self._d.referenced_users:
-			if user['id'] == user_id:
-				return user['name']
+		return self._get_principal_name(self._principal_cache.get_user(user_id))
 
 	def _get_group_name(self, group_id):
-		for group in self._d.referenced_groups:
-			if group['id'] == group_id:
-				return group['name']
+		return self._get_principal_name(self._principal_cache.get_group(group_id))
 
 	def _get_role_name(self, role_id):
-		for role in self._d.referenced_roles:
-			if role['id'] == role_id:
-				return role['name']
+		return self._get_principal_name(self._principal_cache.get_role(role_id))
+
+	def _get_principal_name(self, principal):
+		if principal is not None:
+			return principal['name']
 
 	def _normalize_path(self, path):
 		new_path = []
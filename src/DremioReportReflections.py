@@ -21,6 +21,7 @@ import json
 import time
 from DremioClonerUtils import DremioClonerUtils
 from DremioClonerLogger import DremioClonerLogger
+from DremioPathTrie import DremioPathTrie, split_name
 
 
 class DremioReportReflections:
@@ -32,6 +33,8 @@ class DremioReportReflections:
 
 	# Dremio object pointing to the source Dremio environment
 	_dremio_env = None
+	# Catalog paths recovered from dataset names
+	_path_trie = None
 
 	# Misc
 	_delimeter = None
@@ -45,6 +48,7 @@ class DremioReportReflections:
 		self._newline = self._config.report_csv_newline
 		self._logger = DremioClonerLogger(self._config.max_errors, self._config.logging_verbose)
 		self._utils = DremioClonerUtils(config)
+		self._path_trie = DremioPathTrie(self._catalog_path_exists)
 
 	def process_dremio_reflections(self):
 		_query_reflections = self._retrieve_reflections()
@@ -194,19 +198,11 @@ class DremioReportReflections:
 			self._f.write(line)
 		self._f.close()
 
+	# Dataset names are dot separated, with elements containing dots enclosed in double quotes.
+	# Only the containers of the dataset need to be probed.
 	def _normalize_dataset_path(self, path):
-		path = path.split('.')
-		normalized_path = ""
-		for i in range(0, len(path)):
-			if path[i].startswith('"') and path[i].endswith('"'):
-				normalized_path = normalized_path + path[i][1:-1]
-			else:
-				normalized_path = normalized_path + path[i]
-			if normalized_path.startswith('"') and normalized_path.endswith('"'):
-				normalized_path = normalized_path[1:-1]
-			entity = self._dremio_env.get_catalog_entity_by_path(normalized_path, report_error=False)
-			if entity is not None:
-				normalized_path = normalized_path + '/'
-			else:
-				normalized_path = normalized_path + '.'
-		return normalized_path[:-1]
+		elements = split_name(path)
+		return self._path_trie.normalize_elements(elements[:-1]) + elements[-1][0]
+
+	def _catalog_path_exists(self, path):
+		return self._dremio_env.get_catalog_entity_by_path(path, report_error=False) is not None
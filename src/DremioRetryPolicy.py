@@ -0,0 +1,91 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import random
+import requests
+import threading
+
+
+###
+# Decides whether DremioHttpSession retries a failed API call and how long it waits before the next attempt.
+# Calls that can be repeated without side effects (GET, HEAD, DELETE) are retried after a timeout, a connection
+# error or a response with a retryable status code. Other calls (POST, PUT) may already have been processed
+# by Dremio when they fail, they are only retried when Dremio did not process them: connection timeout,
+# HTTP 429 or 503.
+# The wait grows exponentially from the base backoff up to the max backoff, with full jitter, unless
+# the response tells how long to wait with a Retry-After header.
+###
+class DremioRetryPolicy:
+
+	_REPEATABLE_METHODS = ['GET', 'HEAD', 'DELETE']
+	# Responses of calls rejected before being processed
+	_REJECTED_STATUS_CODES = [429, 503]
+
+	_max_attempts = 1
+	_backoff = None
+	_max_backoff = None
+	_jitter = True
+	_status_codes = None
+	_random = None
+	_lock = None
+
+	_retries = 0
+
+	def __init__(self, max_attempts=1, backoff=0.5, max_backoff=30.0, jitter=True, status_codes=None):
+		self._max_attempts = max_attempts
+		self._backoff = backoff
+		self._max_backoff = max_backoff
+		self._jitter = jitter
+		self._status_codes = status_codes if status_codes is not None else [429, 502, 503, 504]
+		self._random = random.Random()
+		self._lock = threading.Lock()
+
+	def is_retryable_response(self, method, response, attempt):
+		if attempt >= self._max_attempts or response.status_code not in self._status_codes:
+			return False
+		return method.upper() in self._REPEATABLE_METHODS or response.status_code in self._REJECTED_STATUS_CODES
+
+	def is_retryable_error(self, method, error, attempt):
+		if attempt >= self._max_attempts:
+			return False
+		if method.upper() in self._REPEATABLE_METHODS:
+			return isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+		return isinstance(error, requests.exceptions.ConnectTimeout)
+
+	# Seconds to wait before the attempt following the given one
+	def get_delay(self, attempt, response=None):
+		with self._lock:
+			self._retries += 1
+		retry_after = self._get_retry_after(response)
+		if retry_after is not None:
+			return min(retry_after, self._max_backoff)
+		delay = min(self._max_backoff, self._backoff * (2 ** (attempt - 1)))
+		if self._jitter:
+			with self._lock:
+				delay = self._random.uniform(0, delay)
+		return delay
+
+	def _get_retry_after(self, response):
+		if response is None or 'Retry-After' not in response.headers:
+			return None
+		try:
+			return max(0.0, float(response.headers['Retry-After']))
+		except ValueError:
+			# HTTP date format is not used by Dremio
+			return None
+
+	def get_stats_desc(self):
+		return "retry policy: " + str(self._retries) + " API call(s) retried"
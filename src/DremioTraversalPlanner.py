@@ -0,0 +1,69 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+
+###
+# Plans the catalog traversal of DremioReader: children listed by a parent entity are evaluated against
+# the filters on their stubs (path, type), before their definitions, wikis or tags are requested.
+# - datasets are read only if they match the VDS or PDS filters, vds.filter.tag aside,
+# - folders of spaces are read only if the folder or a folder or VDS below it can match the filters,
+#   so a subtree out of scope is pruned as a whole. Folders of homes are always read.
+# - folders of sources are read only if they match the source folder filters.
+###
+class DremioTraversalPlanner:
+
+	# Dremio Cloner Config and Filter
+	_config = None
+	_filter = None
+
+	# Run metrics
+	_pruned_folders = 0
+	_pruned_datasets = 0
+
+	def __init__(self, config, cloner_filter):
+		self._config = config
+		self._filter = cloner_filter
+
+	# Children of a parent entity to be read, in the listing order
+	def plan_children(self, children, hierarchy_context):
+		planned_children = []
+		for child in children:
+			if self.is_in_scope(child, hierarchy_context):
+				planned_children.append(child)
+			elif child['type'] == 'DATASET':
+				self._pruned_datasets += 1
+			else:
+				self._pruned_folders += 1
+		return planned_children
+
+	def is_in_scope(self, stub, hierarchy_context):
+		if stub['type'] == 'DATASET':
+			if stub.get('datasetType') == 'VIRTUAL':
+				return self._filter.match_vds_path_filter(stub, loginfo=False)
+			if stub.get('datasetType') in ['PROMOTED', 'DIRECT']:
+				return self._filter.match_pds_filter(stub, loginfo=False)
+			# Unexpected dataset types are reported by the crawl
+			return True
+		if stub.get('containerType') == 'FOLDER':
+			if hierarchy_context == 'SPACE':
+				return self._filter.match_space_folder_subtree_filter(stub)
+			if hierarchy_context == 'SOURCE':
+				return self._filter.match_source_folder_filter(stub, loginfo=False)
+		return True
+
+	def get_stats_desc(self):
+		return "traversal planner: " + str(self._pruned_folders) + " folder subtree(s) and " + \
+			str(self._pruned_datasets) + " dataset(s) pruned before reading their definitions"
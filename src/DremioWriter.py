@@ -20,9 +20,16 @@ from DremioClonerConfig import DremioClonerConfig
 from DremioClonerUtils import DremioClonerUtils
 from DremioClonerLogger import DremioClonerLogger
 from DremioClonerFilter import DremioClonerFilter
+from DremioPrincipalCache import DremioPrincipalCache
+from DremioCatalogSnapshot import DremioCatalogSnapshot
+from DremioDependencyGraph import DremioDependencyGraph
+from DremioDeletionPlanner import DremioDeletionPlanner
+from DremioEntityDiff import DremioEntityDiff
 import datetime
+import threading
 import json
 import parse_sql
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 
 ###
@@ -42,10 +49,32 @@ class DremioWriter:
 	# Dremio Data to write
 	_d = None
 
-	# VDS list grouped by hierarchy
+	# Snapshot of the target catalog, used for existence checks when enabled by configuration
+	_catalog_snapshot = None
+
+	# Compares entities with the target environment and counts created, updated and unchanged entities
+	_entity_diff = None
+
+	# Plans and executes deletions of create_overwrite_delete process modes
+	_deletion_planner = None
+
+	# DremioCheckpoint recording written entities, wikis, tags and reflections, None if not configured
+	_checkpoint = None
+
+	# Tables referenced by VDS SQL, each SQL is parsed once
+	_sql_extractor = None
+
+	# VDS list grouped by hierarchy level
 	_vds_hierarchy = []
-	_hierarchy_depth = 0
+	_vds_graph = None
 	_unresolved_vds = []
+	# Parents of each VDS from the source file, keyed by path
+	_vds_parents_by_path = None
+	# Paths of PDSs from the source file
+	_pds_paths = None
+
+	# Users, groups and roles of the target environment, possibly shared with other commands
+	_principal_cache = None
 
 	# Referenced Users, Groups and Roles in the target environment
 	_target_dremio_users = []
@@ -60,21 +89,36 @@ class DremioWriter:
 	# Dremio target reflections
 	_target_reflections = []
 	_target_reflections_vds_filtered = []
+	# Target reflections keyed by (dataset id, reflection name), built on first use
+	_target_reflections_by_key = None
 
-	# Dry run collections
-	_dry_run_processed_vds_list = []
-	_dry_run_processed_pds_list = []
+	# Dry run collections, VDSs are added by worker threads when concurrency is greater than 1
+	_dry_run_processed_vds_list = None
+	_dry_run_processed_pds_list = None
+	_dry_run_lock = None
 
-	def __init__(self, target_dremio, dremio_data, config):
+	def __init__(self, target_dremio, dremio_data, config, principal_cache=None, checkpoint=None):
 		self._config = config
 		self._dremio_env = target_dremio
+		self._principal_cache = principal_cache if principal_cache is not None else DremioPrincipalCache(target_dremio)
 		self._d = dremio_data
 		self._logger = DremioClonerLogger(self._config.max_errors, self._config.logging_verbose)
 		self._filter = DremioClonerFilter(config)
 		self._utils = DremioClonerUtils(config)
+		self._entity_diff = DremioEntityDiff()
+		self._deletion_planner = DremioDeletionPlanner(config)
+		self._checkpoint = checkpoint
+		self._sql_extractor = parse_sql.SqlTableExtractor(processes=self._config.sql_processes)
+		self._dry_run_processed_vds_list = []
+		self._dry_run_processed_pds_list = []
+		self._dry_run_lock = threading.Lock()
 
 	def write_dremio_environment(self):
 		self._retrieve_users_groups()
+		if self._config.catalog_snapshot:
+			self._catalog_snapshot = DremioCatalogSnapshot(self._dremio_env, self._config)
+			self._catalog_snapshot.load()
+
 		if self._config.acl_transformation != {} and self._d.referenced_users == [] and self._d.referenced_groups == [] and self._d.referenced_roles == []:
 			self._logger.warn("ACL Transformation has been defined while Referenced Users and Referenced Groups/Roles are not present in the Source Dremio Data.")
 
@@ -86,20 +130,17 @@ class DremioWriter:
 			self._read_target_folders_and_vds_list()
 
 		if self._config.reflection_process_mode == 'create_overwrite_delete':
-			unmatched_target_reflections = self._find_deletable_reflections()
-			for reflection in unmatched_target_reflections:
-				self._logger.info("write_dremio_environment: Deleting reflection " + "/".join(reflection['path']) + " -> " + reflection['name'])
-				self._dremio_env.delete_reflection(reflection['id'], dry_run = self._config.dry_run, report_error=True)
+			waves = self._deletion_planner.plan_reflections(self._target_reflections_vds_filtered, self._d.reflections)
+			self._logger.info("write_dremio_environment: reflections: " + self._deletion_planner.get_plan_desc(waves))
+			self._deletion_planner.execute(waves, self._delete_reflection)
 		if self._config.vds_process_mode == 'create_overwrite_delete':
-			unmatched_target_vds = self._find_deletable_vds()
-			for vds in unmatched_target_vds:
-				self._logger.info("write_dremio_environment: Deleting VDS " + "/".join(vds['path']))
-				self._dremio_env.delete_catalog_entity(vds['id'], dry_run = self._config.dry_run, report_error=True)
+			waves = self._deletion_planner.plan_vds(self._target_vds_list, self._d.vds_list, self._get_target_vds_dependency_paths)
+			self._logger.info("write_dremio_environment: VDSs: " + self._deletion_planner.get_plan_desc(waves))
+			self._deletion_planner.execute(waves, self._delete_vds)
 		if self._config.folder_process_mode == 'create_overwrite_delete':
-			unmatched_target_folders = self._find_deletable_folders()
-			for folder in unmatched_target_folders:
-				self._logger.info("write_dremio_environment: Deleting folder " + "/".join(folder['path']))
-				self._dremio_env.delete_catalog_entity(folder['id'], dry_run = self._config.dry_run, report_error=True)
+			waves = self._deletion_planner.plan_folders(self._target_folders, self._d.folders)
+			self._logger.info("write_dremio_environment: folders: " + self._deletion_planner.get_plan_desc(waves))
+			self._deletion_planner.execute(waves, self._delete_folder)
 
 		if self._config.source_process_mode == 'skip':
 			# even though they are being skipped, we still need to map source names in case other objects depend on them
@@ -131,7 +172,7 @@ class DremioWriter:
 			self._logger.info("write_dremio_environment: Skipping VDS processing due to configuration vds.process_mode=skip.")
 		else:
 			self._map_vds_source()
-			self._order_vds(0)
+			self._order_vds()
 			self._write_vds_hierarchy()
 			self._write_remainder_vds()
 		if self._config.reflection_process_mode == 'skip':
@@ -144,7 +185,7 @@ class DremioWriter:
 						self._logger.debug(
 							"write_dremio_environment: skipping reflection id " + reflection['id'] + ", not in include list")
 						continue
-				self._write_reflection(reflection, self._config.reflection_process_mode)
+				self._write_checkpointed('reflection', reflection['path'] + [reflection['name']], self._write_reflection, reflection, self._config.reflection_process_mode)
 		if self._config.reflection_refresh_mode != 'refresh':
 			self._logger.info("write_dremio_environment: Skipping reflection refresh due to configuration reflection.refresh_mode=skip.")
 		else:
@@ -154,59 +195,38 @@ class DremioWriter:
 			self._logger.info("write_dremio_environment: Skipping wiki processing due to configuration wiki.process_mode=skip.")
 		else:
 			for wiki in self._d.wikis:
-				self._write_wiki(wiki, self._config.wiki_process_mode)
+				self._write_checkpointed('wiki', wiki['path'], self._write_wiki, wiki, self._config.wiki_process_mode)
 		if self._config.tag_process_mode == 'skip':
 			self._logger.info("write_dremio_environment: Skipping tag processing due to configuration tag.process_mode=skip.")
 		else:
 			for tags in self._d.tags:
-				self._write_tags(tags, self._config.tag_process_mode)
-
-	def _find_deletable_folders(self):
-		# Find unmatched reflections in target system
-		unmatched_folders = []
-		for target_folder in self._target_folders:
-			found = False
-			for applied_folder in self._d.folders:
-				if target_folder['path'] == applied_folder['path']:
-					found = True
-					break
-			if not found:
-				unmatched_folders.append(target_folder)
-		return unmatched_folders
-
-
-	def _find_deletable_vds(self):
-		# Find unmatched reflections in target system
-		unmatched_vds = []
-		for target_vds in self._target_vds_list:
-			found = False
-			for applied_vds in self._d.vds_list:
-				if target_vds['path'] == applied_vds['path']:
-					found = True
-					break
-			if not found:
-				unmatched_vds.append(target_vds)
-		return unmatched_vds
-
-	def _find_deletable_reflections(self):
-		# Find unmatched reflections in target system
-		unmatched_reflections = []
-		for target_reflection in self._target_reflections_vds_filtered:
-			found = False
-			for applied_reflection in self._d.reflections:
-				if target_reflection['path'] == applied_reflection['path'] and target_reflection['name'] == \
-						applied_reflection['name']:
-					found = True
-					break
-			if not found:
-				unmatched_reflections.append(target_reflection)
-		return unmatched_reflections
-
-	def _is_reflection_in_vds_list(self, reflection):
-		for vds in self._target_vds_list:
-			if vds['id'] == reflection['datasetId']:
-				return True
-		return False
+				self._write_checkpointed('tags', tags['path'], self._write_tags, tags, self._config.tag_process_mode)
+		if self._catalog_snapshot is not None:
+			self._logger.info("write_dremio_environment: " + self._catalog_snapshot.get_stats_desc())
+		self._logger.info("write_dremio_environment: " + self._entity_diff.get_stats_desc())
+		self._logger.info("write_dremio_environment: " + self._sql_extractor.get_stats_desc())
+		if self._checkpoint is not None:
+			self._logger.info("write_dremio_environment: " + self._checkpoint.get_stats_desc())
+
+	def _delete_reflection(self, reflection):
+		self._logger.info("write_dremio_environment: Deleting reflection " + "/".join(reflection['path']) + " -> " + reflection['name'])
+		self._dremio_env.delete_reflection(reflection['id'], dry_run = self._config.dry_run, report_error=True)
+
+	def _delete_vds(self, vds):
+		self._logger.info("write_dremio_environment: Deleting VDS " + "/".join(vds['path']))
+		self._delete_catalog_entity(vds)
+
+	def _delete_folder(self, folder):
+		self._logger.info("write_dremio_environment: Deleting folder " + "/".join(folder['path']))
+		self._delete_catalog_entity(folder)
+
+	def _delete_catalog_entity(self, entity):
+		self._dremio_env.delete_catalog_entity(entity['id'], dry_run = self._config.dry_run, report_error=True)
+		if self._catalog_snapshot is not None and not self._config.dry_run:
+			self._catalog_snapshot.remove(entity)
+
+	def _get_target_vds_dependency_paths(self, vds):
+		return self._sql_extractor.tables_in_query(vds['sql']) if 'sql' in vds else []
 
 	def _read_target_reflections(self):
 		self._logger.debug("_read_target_reflections")
@@ -218,14 +238,13 @@ class DremioWriter:
 		for container in containers:
 			self._logger.debug("_read_destination_folders_and_vds_list: processing container " + self._utils.get_entity_desc(container))
 			self._process_container(container)
+		# Paths of reflected VDSs are taken from the VDS definitions just read
+		target_vds_by_id = {}
+		for vds in self._target_vds_list:
+			target_vds_by_id[vds['id']] = vds
 		for reflection in self._target_reflections:
-			if self._is_reflection_in_vds_list(reflection):
-				reflection_dataset = self._dremio_env.get_catalog_entity_by_id(reflection['datasetId'])
-				if reflection_dataset is None:
-					self._logger.debug("_read_reflections: error processing reflection, cannot get path for dataset: " + reflection['datasetId'])
-					continue
-				reflection_path = reflection_dataset['path']
-				reflection["path"] = reflection_path
+			if reflection['datasetId'] in target_vds_by_id:
+				reflection["path"] = target_vds_by_id[reflection['datasetId']]['path']
 				self._target_reflections_vds_filtered.append(reflection)
 
 	# Identify a container and delegate processing
@@ -279,7 +298,7 @@ class DremioWriter:
 		if entity is not None:
 			self._logger.debug("_read_dataset: " + dataset['datasetType'] + " : " + self._utils.get_entity_desc(dataset))
 			if dataset['datasetType'] == "VIRTUAL":
-				tags = self._dremio_env.get_catalog_tags(entity['id'])
+				tags = self._dremio_env.get_catalog_tags(entity['id']) if self._filter.is_vds_tag_filter_set() else None
 				if self._filter.match_vds_filter(dataset, tags=tags):
 					self._target_vds_list.append(entity)
 			else:
@@ -309,7 +328,7 @@ class DremioWriter:
 	def _get_entity_definition_by_path(self, path):
 		self._logger.debug("_get_entity_definition_by_path: processing path: " + str(path))
 		path = self._utils.normalize_path(path)
-		entity = self._dremio_env.get_catalog_entity_by_path(path)
+		entity = self._get_target_entity_by_path(path)
 		if entity is None:
 			self._logger.error("_read_entity_definition: cannot retrieve entity for path: " + str(path))
 		return entity
@@ -436,19 +455,19 @@ class DremioWriter:
 
 	def _retrieve_users_groups(self):
 		for user in self._d.referenced_users:
-			target_user = self._dremio_env.get_user_by_name(user['name'])
+			target_user = self._principal_cache.get_user_by_name(user['name'])
 			if target_user is not None:
 				self._target_dremio_users.append(target_user)
 			else:
 				self._logger.error("_retrieve_users_groups: Unable to resolve user in target Dremio environment: " + str(user['name']))
 		for group in self._d.referenced_groups:
-			target_group = self._dremio_env.get_group_by_name(group['name'])
+			target_group = self._principal_cache.get_group_by_name(group['name'])
 			if target_group is not None:
 				self._target_dremio_groups.append(target_group)
 			else:
 				self._logger.error("_retrieve_users_groups: Unable to resolve group in target Dremio environment: " + str(group['name']))
 		for role in self._d.referenced_roles:
-			target_role = self._dremio_env.get_role_by_name(role['name'])
+			target_role = self._principal_cache.get_role_by_name(role['name'])
 			if target_role is not None:
 				self._target_dremio_roles.append(target_role)
 			else:
@@ -456,35 +475,67 @@ class DremioWriter:
 		# Retrieve acl transformation target users and groups/roles
 		for item in self._config.acl_transformation:
 			if 'user' in item['target']:
-				user = self._dremio_env.get_user_by_name(item['target']['user'])
+				user = self._principal_cache.get_user_by_name(item['target']['user'])
 				if user is not None:
 					# dont worry about dups
 					self._target_dremio_users.append(user)
 				else:
 					self._logger.error("_retrieve_users_groups: Unable to resolve ACL_TRANSFORMATION user in target Dremio environment: " + str(item['target']['user']))
 			if 'group' in item['target']:
-				group = self._dremio_env.get_group_by_name(item['target']['group'])
+				group = self._principal_cache.get_group_by_name(item['target']['group'])
 				if group is not None:
 					# dont worry about dups
 					self._target_dremio_groups.append(group)
 				else:
 					self._logger.error("_retrieve_users_groups: Unable to resolve ACL_TRANSFORMATION group in target Dremio environment: " + str(item['target']['group']))
 			if 'role' in item['target']:
-				role = self._dremio_env.get_role_by_name(item['target']['role'])
+				role = self._principal_cache.get_role_by_name(item['target']['role'])
 				if role is not None:
 					# dont worry about dups
 					self._target_dremio_roles.append(role)
 				else:
 					self._logger.error("_retrieve_users_groups: Unable to resolve ACL_TRANSFORMATION role in target Dremio environment: " + str(item['target']['role']))
+		self._logger.info("_retrieve_users_groups: " + self._principal_cache.get_stats_desc())
 
 	def _write_vds_hierarchy(self):
-		for level in range(0, self._hierarchy_depth + 1): # fix 20210319: need +1 here to ensure every element in the vds hierarchy gets processed
-			for item in self._vds_hierarchy:
-				if item[0] == level:
-					vds = item[1]
-					if self._filter.match_vds_filter(vds):
-						self._logger.debug("_write_vds_hierarchy: writing vds: " + self._utils.get_entity_desc(vds))
-						self._write_entity(vds, self._config.vds_process_mode, self._config.vds_ignore_missing_acl_user, self._config.vds_ignore_missing_acl_group)
+		if self._config.concurrency > 1:
+			self._write_vds_hierarchy_concurrently()
+			return
+		for level in self._vds_hierarchy:
+			for vds in level:
+				self._write_hierarchy_vds(vds)
+
+	# Writes up to "concurrency" VDSs at a time. A VDS is submitted as soon as all VDSs it depends on have been
+	# processed, without waiting for the rest of the previous hierarchy level. As with sequential processing,
+	# a VDS is attempted even if one of its dependencies could not be written.
+	def _write_vds_hierarchy_concurrently(self):
+		graph = self._vds_graph
+		pending_dependencies = {}
+		for position in graph.get_leveled_positions():
+			pending_dependencies[position] = graph.get_dependency_count(position)
+		executor = ThreadPoolExecutor(max_workers=self._config.concurrency)
+		try:
+			futures = {}
+			for position in graph.get_leveled_positions():
+				if pending_dependencies[position] == 0:
+					futures[executor.submit(self._write_hierarchy_vds, graph.get_vds(position))] = position
+			while len(futures) > 0:
+				done, not_done = wait(futures, return_when=FIRST_COMPLETED)
+				for future in done:
+					position = futures.pop(future)
+					# Propagate errors such as reaching max_errors
+					future.result()
+					for dependent in graph.get_leveled_dependents(position):
+						pending_dependencies[dependent] -= 1
+						if pending_dependencies[dependent] == 0:
+							futures[executor.submit(self._write_hierarchy_vds, graph.get_vds(dependent))] = dependent
+		finally:
+			executor.shutdown(wait=True, cancel_futures=True)
+
+	def _write_hierarchy_vds(self, vds):
+		if self._filter.match_vds_filter(vds):
+			self._logger.debug("_write_vds_hierarchy: writing vds: " + self._utils.get_entity_desc(vds))
+			self._write_entity(vds, self._config.vds_process_mode, self._config.vds_ignore_missing_acl_user, self._config.vds_ignore_missing_acl_group)
 
 	def _write_remainder_vds(self):
 		if not self._d.vds_list and not self._unresolved_vds:
@@ -529,7 +580,25 @@ class DremioWriter:
 			return True
 		self._logger.error("_write_user: Cannot create users. API is not implemented.")
 
+	# Writes with a checkpoint are skipped when resuming if they have completed in the interrupted run
+	def _write_checkpointed(self, kind, path, write_function, *args):
+		if self._checkpoint is None:
+			return write_function(*args)
+		key = "/".join(path)
+		if self._checkpoint.is_completed(kind, key):
+			self._logger.debug("_write_checkpointed: Skipping " + kind + " completed before resuming: " + key)
+			self._checkpoint.count_resumed(kind, key)
+			return True
+		result = write_function(*args)
+		if result is True and not self._config.dry_run:
+			self._checkpoint.complete(kind, key)
+		return result
+
 	def _write_entity(self, entity, process_mode, ignore_missing_acl_user_flag, ignore_missing_acl_group_flag, report_error = True):
+		path = entity['path'] if 'path' in entity else [entity['name']]
+		return self._write_checkpointed('entity', path, self._write_entity_definition, entity, process_mode, ignore_missing_acl_user_flag, ignore_missing_acl_group_flag, report_error)
+
+	def _write_entity_definition(self, entity, process_mode, ignore_missing_acl_user_flag, ignore_missing_acl_group_flag, report_error = True):
 		self._logger.debug("_write_entity: processing entity: " + self._utils.get_entity_desc(entity))
 		# Clean up the definition
 		if 'id' in entity:
@@ -562,20 +631,28 @@ class DremioWriter:
 				self._logger.warn("_write_entity: Dry Run, NOT Creating entity: " + self._utils.get_entity_desc(entity))
 				# For dry run, keep it in a seperate collection to suppress errors
 				if self._utils.is_vds(entity):
-					self._dry_run_processed_vds_list.append(entity)
+					with self._dry_run_lock:
+						self._dry_run_processed_vds_list.append(entity)
 				return False
 			# Note for the CE target env, the ACL should have been popped out by _process_acl
 			new_entity = self._dremio_env.create_catalog_entity(entity, self._config.dry_run)
+			self._update_catalog_snapshot(entity, new_entity)
 			if new_entity is None:
 				if report_error:
 					self._logger.error("_write_entity: could not create entity: " + self._utils.get_entity_desc(entity))
 				else:
 					self._logger.debug("_write_entity: could not create entity: " + self._utils.get_entity_desc(entity))
 				return False
+			self._entity_diff.count_created()
 		else:  # Entity already exists in the target environment
 			if process_mode == 'create_only':
 				self._logger.info("_write_entity: Found existing entity and process_mode is set to create_only. Skipping entity: " + self._utils.get_entity_desc(entity))
 				return True
+			# Updating an identical entity would only invalidate reflections depending on it
+			if self._config.diff_skip_unchanged and self._entity_diff.is_unchanged(entity, existing_entity):
+				self._logger.debug("_write_entity: Skipping unchanged entity: " + self._utils.get_entity_desc(entity))
+				self._entity_diff.count_unchanged()
+				return True
 			self._logger.debug("_write_entity: Overwriting entity definition as per process_mode configuration : " + self._utils.get_entity_desc(entity))
 			# Update entity definition with data from entity existing in the target environment
 			entity['id'] = existing_entity['id']
@@ -597,14 +674,23 @@ class DremioWriter:
 				self._logger.warn("_write_entity: Dry Run, NOT Updating entity: " + self._utils.get_entity_desc(entity))
 				return False
 			updated_entity = self._dremio_env.update_catalog_entity(entity['id'], entity, self._config.dry_run, report_error)
+			self._update_catalog_snapshot(entity, updated_entity)
 			if updated_entity is None:
 				if report_error:
 					self._logger.error("_write_entity: Error updating entity: " + self._utils.get_entity_desc(entity))
 				else:
 					self._logger.debug("_write_entity: Error updating entity: " + self._utils.get_entity_desc(entity))
 				return False
+			self._entity_diff.count_updated()
 		return True
 
+	def _update_catalog_snapshot(self, entity, written_entity):
+		if self._catalog_snapshot is not None:
+			if written_entity is not None:
+				self._catalog_snapshot.update(written_entity)
+			else:
+				self._catalog_snapshot.invalidate(entity['path'] if 'path' in entity else entity['name'])
+
 	def _write_pds(self, entity, process_mode, ignore_missing_acl_user_flag, ignore_missing_acl_group_flag):
 		self._logger.debug("_write_pds: processing entity: " + self._utils.get_entity_desc(entity))
 		if self._filter.match_pds_filter(entity):
@@ -652,6 +738,7 @@ class DremioWriter:
 			return True
 		self._logger.debug("_promote_pds: promoting pds: " + self._utils.get_entity_desc(entity))
 		new_pds_entity = self._dremio_env.promote_pds(entity, self._config.dry_run)
+		self._update_catalog_snapshot(entity, new_pds_entity)
 		if new_pds_entity is None:
 			self._logger.error("_promote_pds: Error promoting PDS: " + self._utils.get_entity_desc(entity))
 			return False
@@ -683,7 +770,7 @@ class DremioWriter:
 		reflection_path = reflection['path']
 		# Write Reflection
 		reflection.pop("path")
-		reflected_dataset = self._dremio_env.get_catalog_entity_by_path(self._utils.normalize_path(reflection_path))
+		reflected_dataset = self._get_target_entity_by_path(self._utils.normalize_path(reflection_path))
 		if reflected_dataset is None:
 			self._logger.error("_write_reflection: Could not resolve dataset for " + self._utils.get_entity_desc(reflection))
 			return None
@@ -737,19 +824,18 @@ class DremioWriter:
 			   (reflection.get('partitionFields') == existing_reflection.get('partitionFields')) and \
 			   (reflection.get('distributionFields') == existing_reflection.get('distributionFields'))
 
+	# Matches reflections by name and by dataset. The dataset was resolved by path in the target environment,
+	# so its id identifies the dataset with the same path without looking up the dataset of every reflection.
 	def _find_existing_reflection(self, reflection, dataset):
-		for existing_reflection in self._target_reflections:
-			# Match reflections by name
-			if reflection['name'] == existing_reflection['name']:
-				existing_dataset = self._dremio_env.get_catalog_entity_by_id(existing_reflection['datasetId'])
-				# Match reflections by respective dataset's path
-				if existing_dataset is not None and existing_dataset['path'] == dataset['path']:
-					return existing_reflection
-		return None
+		if self._target_reflections_by_key is None:
+			self._target_reflections_by_key = {}
+			for existing_reflection in self._target_reflections:
+				self._target_reflections_by_key.setdefault((existing_reflection['datasetId'], existing_reflection['name']), existing_reflection)
+		return self._target_reflections_by_key.get((dataset['id'], reflection['name']))
 
 
 	def _find_existing_dataset_by_path(self, path):
-		return self._dremio_env.get_catalog_entity_by_path(path)
+		return self._get_target_entity_by_path(path)
 
 
 # Searches for Users from entity's ACL in the target environment and either:
@@ -850,23 +936,23 @@ class DremioWriter:
 
 	def _find_matching_principal_for_userid(self, userid, permissions):
 		self._logger.debug("_find_matching_principal_for_userid: processing user_id: " + str(userid))
-		for user in self._d.referenced_users:
-			if user['id'] == userid:
-				transformed_principal = self._find_acl_transformation_by_username(user['name'], permissions)
-				if transformed_principal == "REMOVE":
-					self._logger.info("_find_matching_principal_for_userid: Source User " + user['name'] + " [" + user['id'] + "] is mapped as NONE.")
-					return "REMOVE"
-				# If no tranformation is defined for this user
-				elif transformed_principal is None:
-					for target_user in self._target_dremio_users:
-						if target_user['name'] == user['name']:
-							return {"user":target_user['id']}
-				elif "error" in transformed_principal:
-					# Something went wrong
-					self._logger.error("_find_matching_principal_for_userid: error " + transformed_principal['error'])
-					return None
-				else:
-					return transformed_principal
+		user = self._d.referenced_users.get_by_id(userid)
+		if user is not None:
+			transformed_principal = self._find_acl_transformation_by_username(user['name'], permissions)
+			if transformed_principal == "REMOVE":
+				self._logger.info("_find_matching_principal_for_userid: Source User " + user['name'] + " [" + user['id'] + "] is mapped as NONE.")
+				return "REMOVE"
+			# If no tranformation is defined for this user
+			elif transformed_principal is None:
+				for target_user in self._target_dremio_users:
+					if target_user['name'] == user['name']:
+						return {"user":target_user['id']}
+			elif "error" in transformed_principal:
+				# Something went wrong
+				self._logger.error("_find_matching_principal_for_userid: error " + transformed_principal['error'])
+				return None
+			else:
+				return transformed_principal
 		# If the username is already in the target list (i.e. the mapping already happened
 		# but the write_entity failed because parent objects were not yet created) then take username straight from target
 		for user in self._target_dremio_users:
@@ -926,23 +1012,23 @@ class DremioWriter:
 
 	def _find_matching_principal_for_groupid(self, groupid, permissions):
 		self._logger.debug("_find_matching_groupid: processing: " + str(groupid))
-		for group in self._d.referenced_groups:
-			if group['id'] == groupid:
-				transformed_principal = self._find_acl_transformation_by_groupname(group['name'], permissions)
-				if transformed_principal == "REMOVE":
-					self._logger.info("_find_matching_principal_for_groupid: Source Group " + group['name'] + " [" + group['id'] + "] is mapped as NONE.")
-					return "REMOVE"
-				# If no transformation is defined for this group
-				elif transformed_principal is None:
-					for target_group in self._target_dremio_groups:
-						if target_group['name'] == group['name']:
-							return {"group":target_group['id']}
-				elif "error" in transformed_principal:
-					# Something went wrong
-					self._logger.error("_find_matching_principal_for_groupid: error " + transformed_principal['error'])
-					return None
-				else:
-					return transformed_principal
+		group = self._d.referenced_groups.get_by_id(groupid)
+		if group is not None:
+			transformed_principal = self._find_acl_transformation_by_groupname(group['name'], permissions)
+			if transformed_principal == "REMOVE":
+				self._logger.info("_find_matching_principal_for_groupid: Source Group " + group['name'] + " [" + group['id'] + "] is mapped as NONE.")
+				return "REMOVE"
+			# If no transformation is defined for this group
+			elif transformed_principal is None:
+				for target_group in self._target_dremio_groups:
+					if target_group['name'] == group['name']:
+						return {"group":target_group['id']}
+			elif "error" in transformed_principal:
+				# Something went wrong
+				self._logger.error("_find_matching_principal_for_groupid: error " + transformed_principal['error'])
+				return None
+			else:
+				return transformed_principal
 		# If the group name is already in the target list (i.e. the mapping already happened
 		# but the write_entity failed because parent objects were not yet created) then take group name straight from target
 		for group in self._target_dremio_groups:
@@ -960,24 +1046,24 @@ class DremioWriter:
 
 	def _find_matching_principal_for_roleid(self, roleid, permissions):
 		self._logger.debug("_find_matching_roleid: processing: " + str(roleid))
-		for role in self._d.referenced_roles:
-			if role['id'] == roleid:
-				self._logger.debug("_find_matching_roleid: roleid " + str(roleid) + " has role name " + role['name'])
-				transformed_principal = self._find_acl_transformation_by_rolename(role['name'], permissions)
-				if transformed_principal == "REMOVE":
-					self._logger.info("_find_matching_principal_for_roleid: Source Role " + role['name'] + " [" + role['id'] + "] is mapped as NONE.")
-					return "REMOVE"
-				# If no transformation is defined for this role
-				elif transformed_principal is None:
-					for target_role in self._target_dremio_roles:
-						if target_role['name'] == role['name']:
-							return {"role":target_role['id']}
-				elif "error" in transformed_principal:
-					# Something went wrong
-					self._logger.error("_find_matching_principal_for_roleid: error " + transformed_principal['error'])
-					return None
-				else:
-					return transformed_principal
+		role = self._d.referenced_roles.get_by_id(roleid)
+		if role is not None:
+			self._logger.debug("_find_matching_roleid: roleid " + str(roleid) + " has role name " + role['name'])
+			transformed_principal = self._find_acl_transformation_by_rolename(role['name'], permissions)
+			if transformed_principal == "REMOVE":
+				self._logger.info("_find_matching_principal_for_roleid: Source Role " + role['name'] + " [" + role['id'] + "] is mapped as NONE.")
+				return "REMOVE"
+			# If no transformation is defined for this role
+			elif transformed_principal is None:
+				for target_role in self._target_dremio_roles:
+					if target_role['name'] == role['name']:
+						return {"role":target_role['id']}
+			elif "error" in transformed_principal:
+				# Something went wrong
+				self._logger.error("_find_matching_principal_for_roleid: error " + transformed_principal['error'])
+				return None
+			else:
+				return transformed_principal
 		# If the role name is already in the target list (i.e. the mapping already happened
 		# but the write_entity failed because parent objects were not yet created) then take role name straight from target
 		for role in self._target_dremio_roles:
@@ -1078,88 +1164,50 @@ class DremioWriter:
 						return {"role": target_role['id'], "permissions": new_permissions}
 		return None
 
+	# Target catalog lookup, answered from the catalog snapshot when it is enabled
+	def _get_target_entity_by_path(self, path):
+		if self._catalog_snapshot is not None:
+			return self._catalog_snapshot.get_catalog_entity_by_path(path)
+		return self._dremio_env.get_catalog_entity_by_path(path)
+
 	def _read_entity_definition(self, entity):
 		self._logger.debug("_read_entity_definition: processing entity: " + self._utils.get_entity_desc(entity))
 		if 'name' in entity:
-			return self._dremio_env.get_catalog_entity_by_path(entity['name'])
+			return self._get_target_entity_by_path(entity['name'])
 		elif 'path' in entity:
-			return self._dremio_env.get_catalog_entity_by_path(self._utils.normalize_path(entity['path']))
+			return self._get_target_entity_by_path(self._utils.normalize_path(entity['path']))
 		else:
 			self._logger.error("_read_entity_definition: bad data: " + self._utils.get_entity_desc(entity))
 			return None
 
-	# Process vds_list and save ordered list of VDSs into _vds_hierarchy. Recursive method.
-	def _order_vds(self, processing_level=0):
-		# Verify for the Max Hierarchy Depth
-		if processing_level >= self._config.vds_max_hierarchy_depth:
-			self._logger.debug("_order_vds: Finished processing with VDSs left to process:" + str(self._d.vds_list))
-			return
-		any_vds_leveled = False
-		# Iterate through the remainder VDS in the list
-		# Go with decreasing index so we can remove VDS from the list
-		for i in range(len(self._d.vds_list) - 1, -1, -1):
-			vds = self._d.vds_list[i]
-			self._logger.debug("_order_vds: processing vds " + self._utils.get_entity_desc(vds))
-			vds_hierarchy_level = processing_level
-			any_dependency_unresolved = False
-			sql_dependency_paths = self._get_vds_dependency_paths(vds)
-			# Iterate through SQL dependencies to determine level of hierarchy for each dependency and the VDS
-			for path in sql_dependency_paths:
-				self._logger.debug("_order_vds: processing sql dependency " + path)
-				# Validate the dependency against VDS and PDS
-				sql_context = self._utils.get_sql_context(vds)
-				dependency_vds = self._find_vds_by_path(self._utils.get_absolute_path(path, sql_context))
-				if dependency_vds is None:
-					dependency_pds = self._find_pds_by_path(self._utils.get_absolute_path(path, sql_context))
-					if dependency_pds is None:
-						# Dependency could not be resolved.
-						self._logger.warn("_order_vds: giving up on ordering VDS '" + self._utils.normalize_path(vds['path']) + "'. Could not resolve dependency '" + self._utils.get_absolute_path(path, sql_context) + "' Will try to process without ordering.")
-						# Move VDS into unresolved list
-						self._unresolved_vds.append(vds)
-						self._d.vds_list.remove(vds)
-						# Mark as do-not-process
-						any_dependency_unresolved = True
-						break
-					else:
-						# The dependency has been resolved as PDS, continue to the next dependency
-						continue
-				else:
-					# Dependency was found as VDS
-					dependency_hierarchy_level = self._find_vds_level_in_hierarchy(dependency_vds['id'])
-					if dependency_hierarchy_level is None:
-						# Dependency has not been processed yet, push this VDS to the next processing level
-						vds_hierarchy_level = None
-						break
-					# Find the highest level of hierarchy among dependencies
-					elif vds_hierarchy_level < dependency_hierarchy_level + 1:
-						vds_hierarchy_level = dependency_hierarchy_level + 1
-			if any_dependency_unresolved or vds_hierarchy_level is None:
-				# Do not process this VDS at this recursion
-				self._logger.debug("_order_vds: some dependencies cannot be validated for entity " + vds['id'] + " at processing level " + str(processing_level))
-			else:
-				# Add the current VDS to the vds_hierarchy_level
-				self._vds_hierarchy.append([vds_hierarchy_level, vds])
-				# Remove the current VDS from further processing
-				self._d.vds_list.remove(vds)
-				# Mark this hierarchy level as successful
-				any_vds_leveled = True
-				self._logger.debug("_order_vds: dependencies have been validated for entity " + vds['id'] + " for hierarchy level " + str(vds_hierarchy_level))
-		# Are we done yet with recursion
-		if not any_vds_leveled or len(self._d.vds_list) == 0:
-			self._hierarchy_depth = processing_level + 1
-			self._logger.debug("_order_vds: finished processing all VDS with hierarchy depth of :" + str(self._hierarchy_depth + 1))
-			return
-		# Process the next Hierarchy Level recursively
-		self._order_vds(processing_level + 1)
+	# Group vds_list into _vds_hierarchy levels. VDSs with unresolved dependencies are moved into _unresolved_vds,
+	# VDSs that could not be leveled are left in vds_list. Both are processed by _write_remainder_vds.
+	def _order_vds(self):
+		self._pds_paths = set([self._utils.normalize_path(pds['path']) for pds in self._d.pds_list if 'path' in pds])
+		# Parse SQL of VDSs without recorded parents in bulk before the graph is built
+		self._sql_extractor.tables_in_queries([vds['sql'] for vds in self._d.vds_list if self._get_vds_parents(vds) is None])
+		self._vds_graph = DremioDependencyGraph(self._d.vds_list, self._config, self._get_vds_dependency_paths, self._is_existing_dataset)
+		self._vds_hierarchy = self._vds_graph.get_levels()
+		self._unresolved_vds = self._vds_graph.get_unresolved()
+		self._d.vds_list[:] = self._vds_graph.get_unordered()
+		self._logger.debug("_order_vds: finished processing all VDS with hierarchy depth of :" + str(len(self._vds_hierarchy)))
 
 	def _get_vds_dependency_paths(self, vds):
+		parents = self._get_vds_parents(vds)
+		if parents is None:
+			return self._sql_extractor.tables_in_query(vds['sql'])
+		return parents
+
+	# Parents of the VDS recorded by "get", None if dependencies have to be parsed from the VDS SQL
+	def _get_vds_parents(self, vds):
 		if self._is_source_ce() or not self._d.vds_parents:
 			# CE does not support graph
-			return parse_sql.tables_in_query(vds['sql'])
-		else:
+			return None
+		if self._vds_parents_by_path is None:
+			self._vds_parents_by_path = {}
 			for vds_entry in self._d.vds_parents:
-				if vds_entry['path'] == vds['path']:
-					return vds_entry['parents']
+				self._vds_parents_by_path[self._utils.normalize_path(vds_entry['path'])] = vds_entry['parents']
+		return self._vds_parents_by_path.get(self._utils.normalize_path(vds['path']))
 
 	def _is_source_ce(self):
 		for item in self._d.dremio_get_config:
@@ -1169,45 +1217,21 @@ class DremioWriter:
 						return eval(param['is_community_edition'])
 		return False
 
-	def _find_vds_by_path(self, path):
-		# First, try finding in the VDS list from the source file
-		for vds in self._d.vds_list:
-			if path == self._utils.normalize_path(vds['path']):
-				return vds
-		# For dry run, check processed vds
-		if self._config.dry_run:
-			for vds in self._dry_run_processed_vds_list:
-				if path == self._utils.normalize_path(vds['path']):
-					return vds
-		# Finally, try finding in the target environment
-		entity = self._dremio_env.get_catalog_entity_by_path(path)
-		# Make sure we get VDS and not folder/file
-		if entity is not None and self._utils.is_vds(entity):
-			return entity
-		return None
-
-	def _find_pds_by_path(self, path):
-		# First, try finding in the PDS list from the source file
-		for pds in self._d.pds_list:
-			if "path" in pds and path == self._utils.normalize_path(pds['path']):
-				return pds
-		# For dry run, check processed pds
+	# Used for VDS dependencies outside of the VDS list. The dependency may be a PDS from the source file,
+	# a dataset processed in dry run mode or a dataset existing in the target environment.
+	def _is_existing_dataset(self, path):
+		if path in self._pds_paths:
+			return True
+		# For dry run, check processed datasets
 		if self._config.dry_run:
-			for pds in self._dry_run_processed_pds_list:
-				if "path" in pds and path == self._utils.normalize_path(pds['path']):
-					return pds
-		# Finally, try finding in the target environment
-		entity = self._dremio_env.get_catalog_entity_by_path(path)
-		# Make sure we get promoted PDS and not folder/file
-		if entity is not None and self._utils.is_pds(entity):
-			return entity
-		return None
-
-	def _find_vds_level_in_hierarchy(self, vds_id):
-		for item in self._vds_hierarchy:
-			if item[1]['id'] == vds_id:
-				return item[0]
-		return None
+			with self._dry_run_lock:
+				dry_run_datasets = self._dry_run_processed_vds_list + self._dry_run_processed_pds_list
+			for dataset in dry_run_datasets:
+				if "path" in dataset and path == self._utils.normalize_path(dataset['path']):
+					return True
+		entity = self._get_target_entity_by_path(path)
+		# Make sure we get VDS or promoted PDS and not folder/file
+		return entity is not None and (self._utils.is_vds(entity) or self._utils.is_pds(entity))
 
 	def get_errors_count(self):
 		return self._logger.errors_encountered
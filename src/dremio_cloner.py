@@ -19,6 +19,7 @@ from Dremio import Dremio
 from DremioCloud import DremioCloud
 from DremioData import DremioData
 from DremioFile import DremioFile
+from DremioFileStream import DremioFileStream
 from DremioReader import DremioReader
 from DremioWriter import DremioWriter
 from DremioReportAcl import DremioReportAcl
@@ -27,6 +28,11 @@ from DremioCascadeAcl import DremioCascadeAcl
 from DremioDelete import DremioDelete
 from DremioDescribeJob import DremioDescribeJob
 from DremioClonerConfig import DremioClonerConfig
+from DremioPrincipalCache import DremioPrincipalCache
+from DremioCheckpoint import DremioCheckpoint
+from DremioRateLimiter import DremioRateLimiter
+from DremioRetryPolicy import DremioRetryPolicy
+from DremioCircuitBreaker import DremioCircuitBreaker
 from datetime import datetime
 import logging
 import sys
@@ -36,12 +42,17 @@ import getpass
 
 def main():
 	config = None
+	argv = [arg for arg in sys.argv if arg != '--resume']
 
-	if len(sys.argv) != 2 and (len(sys.argv) != 4 or sys.argv[2] != '-p'):
+	if len(argv) != 2 and (len(argv) != 4 or argv[2] != '-p'):
 		print_usage()
 	else:
-		config = DremioClonerConfig(sys.argv[1])
-		obtain_password(config, sys.argv)
+		config = DremioClonerConfig(argv[1])
+		config.checkpoint_resume = len(argv) != len(sys.argv)
+		if config.checkpoint_resume and config.checkpoint_filename is None:
+			print("--resume requires checkpoint.filename to be defined in the config file.")
+			return
+		obtain_password(config, argv)
 		# Execute command
 		if config.command == DremioClonerConfig.CMD_GET:
 			get_dremio_environment(config)
@@ -62,22 +73,41 @@ def main():
 
 
 def print_usage():
-	print("""usage: dremio_cloner config_file -p password
+	print("""usage: dremio_cloner config_file [-p password] [--resume]
 Make sure the config file is correct. """)
 
 
 def get_dremio_environment(config):
 	logging.info("Executing command 'get'.")
 	# Added a DremioCloud class for interacting directly with Dremio Cloud without upsetting the DremioWriter and DremioReader code
+	rate_limiter = create_rate_limiter(config.source_rate_limit, config.source_max_concurrency, config.source_latency_target_ms)
+	retry_policy = create_retry_policy(config)
+	circuit_breaker = create_circuit_breaker(config)
 	if config.source_dremio_cloud:
 		dremio = DremioCloud(config.source_endpoint, config.source_username, config.source_password, config.source_dremio_cloud_org_id, config.source_dremio_cloud_project_id,
-						   config.http_timeout,	verify_ssl=config.source_verify_ssl)
+						   config.http_timeout, retry_timedout_source=config.source_retry_timedout, verify_ssl=config.source_verify_ssl, http_pool_size=config.http_pool_size, rate_limiter=rate_limiter, retry_policy=retry_policy, circuit_breaker=circuit_breaker)
 	else:
-		dremio = Dremio(config.source_endpoint, config.source_username, config.source_password, False, config.http_timeout, config.source_retry_timedout, config.source_verify_ssl)
-	reader = DremioReader(dremio, config)
+		dremio = Dremio(config.source_endpoint, config.source_username, config.source_password, False, config.http_timeout, config.source_retry_timedout, config.source_verify_ssl, config.http_pool_size, rate_limiter, retry_policy, circuit_breaker)
+	file_stream = None
+	if config.target_streaming:
+		file_stream = DremioFileStream(config)
+		file_stream.open()
+	checkpoint = open_checkpoint(config)
+	reader = DremioReader(dremio, config, file_stream=file_stream, checkpoint=checkpoint)
 	dremio_data = reader.read_dremio_environment()
-	file = DremioFile(config)
-	file.save_dremio_environment(dremio_data)
+	if file_stream is not None:
+		file_stream.close()
+	else:
+		file = DremioFile(config)
+		file.save_dremio_environment(dremio_data)
+	if checkpoint is not None:
+		checkpoint.remove()
+	if rate_limiter is not None:
+		logging.info(rate_limiter.get_stats_desc())
+	if retry_policy is not None:
+		logging.info(retry_policy.get_stats_desc())
+	if circuit_breaker is not None:
+		logging.info(circuit_breaker.get_stats_desc())
 	logging.info("Command 'get' finished with " + str(reader.get_errors_count()) + " error(s).")
 	print("Done with " + str(reader.get_errors_count()) + " error(s). Please review log file for details.")
 
@@ -87,64 +117,123 @@ def put_dremio_environment(config):
 	file = DremioFile(config)
 	dremio_data = file.read_dremio_environment()
 	#Added a DremioCloud class for interacting directly with Dremio Cloud without upsetting the DremioWriter and DremioReader code
+	rate_limiter = create_rate_limiter(config.target_rate_limit, config.target_max_concurrency, config.target_latency_target_ms)
+	retry_policy = create_retry_policy(config)
+	circuit_breaker = create_circuit_breaker(config)
 	if config.target_dremio_cloud:
 		dremio = DremioCloud(config.target_endpoint, config.target_username, config.target_password, config.target_dremio_cloud_org_id, config.target_dremio_cloud_project_id,
-						   config.http_timeout,	verify_ssl=config.target_verify_ssl)
+						   config.http_timeout, retry_timedout_source=config.source_retry_timedout, verify_ssl=config.target_verify_ssl, http_pool_size=config.http_pool_size, rate_limiter=rate_limiter, retry_policy=retry_policy, circuit_breaker=circuit_breaker)
 	else:
-		dremio = Dremio(config.target_endpoint, config.target_username, config.target_password, config.target_accept_eula, config.http_timeout, verify_ssl=config.target_verify_ssl)
-	writer = DremioWriter(dremio, dremio_data, config)
+		dremio = Dremio(config.target_endpoint, config.target_username, config.target_password, config.target_accept_eula, config.http_timeout, retry_timedout_source=config.source_retry_timedout, verify_ssl=config.target_verify_ssl, http_pool_size=config.http_pool_size, rate_limiter=rate_limiter, retry_policy=retry_policy, circuit_breaker=circuit_breaker)
+	checkpoint = open_checkpoint(config)
+	writer = DremioWriter(dremio, dremio_data, config, checkpoint=checkpoint)
 	writer.write_dremio_environment()
+	if checkpoint is not None:
+		checkpoint.remove()
+	if rate_limiter is not None:
+		logging.info(rate_limiter.get_stats_desc())
+	if retry_policy is not None:
+		logging.info(retry_policy.get_stats_desc())
+	if circuit_breaker is not None:
+		logging.info(circuit_breaker.get_stats_desc())
 	logging.info("Command 'put' finished with " + str(writer.get_errors_count()) + " error(s).")
 	print("Done with " + str(writer.get_errors_count()) + " error(s). Please review log file for details.")
 
 
 def report_acl(config):
 	logging.info("Executing command 'report-acl'.")
-	dremio = Dremio(config.source_endpoint, config.source_username, config.source_password, False, config.http_timeout, config.source_retry_timedout, config.source_verify_ssl)
-	reader = DremioReader(dremio, config)
+	circuit_breaker = create_circuit_breaker(config)
+	dremio = Dremio(config.source_endpoint, config.source_username, config.source_password, False, config.http_timeout, config.source_retry_timedout, config.source_verify_ssl, config.http_pool_size, rate_limiter=create_rate_limiter(config.source_rate_limit, config.source_max_concurrency, config.source_latency_target_ms), retry_policy=create_retry_policy(config), circuit_breaker=circuit_breaker)
+	principal_cache = DremioPrincipalCache(dremio)
+	reader = DremioReader(dremio, config, principal_cache)
 	dremio_data = reader.read_dremio_environment()
-	dremio_report = DremioReportAcl(dremio, dremio_data, config)
+	dremio_report = DremioReportAcl(dremio, dremio_data, config, principal_cache)
 	dremio_report.save_dremio_report_acl()
+	if circuit_breaker is not None:
+		logging.info(circuit_breaker.get_stats_desc())
 	logging.info("Command 'report-acl' finished with " + str(reader.get_errors_count()) + " error(s).")
 	print("Done with " + str(reader.get_errors_count()) + " error(s). Please review log file for details.")
 
 
 def report_reflections(config):
 	logging.info("Executing command 'report-reflections'.")
-	dremio = Dremio(config.source_endpoint, config.source_username, config.source_password, False, config.http_timeout, config.source_retry_timedout, config.source_verify_ssl)
+	circuit_breaker = create_circuit_breaker(config)
+	dremio = Dremio(config.source_endpoint, config.source_username, config.source_password, False, config.http_timeout, config.source_retry_timedout, config.source_verify_ssl, config.http_pool_size, rate_limiter=create_rate_limiter(config.source_rate_limit, config.source_max_concurrency, config.source_latency_target_ms), retry_policy=create_retry_policy(config), circuit_breaker=circuit_breaker)
 	dremio_report = DremioReportReflections(dremio, config)
 	dremio_report.process_dremio_reflections()
+	if circuit_breaker is not None:
+		logging.info(circuit_breaker.get_stats_desc())
 	print("Done. Please review log file for details.")
 
 
 def cascade_acl(config):
 	logging.info("Executing command 'cascade-acl'.")
-	dremio = Dremio(config.target_endpoint, config.target_username, config.target_password, False, config.http_timeout, verify_ssl=config.target_verify_ssl)
+	circuit_breaker = create_circuit_breaker(config)
+	dremio = Dremio(config.target_endpoint, config.target_username, config.target_password, False, config.http_timeout, retry_timedout_source=config.source_retry_timedout, verify_ssl=config.target_verify_ssl, http_pool_size=config.http_pool_size, rate_limiter=create_rate_limiter(config.target_rate_limit, config.target_max_concurrency, config.target_latency_target_ms), retry_policy=create_retry_policy(config), circuit_breaker=circuit_breaker)
 	cascader = DremioCascadeAcl(dremio, config)
 	cascader.cascade_acl()
+	if circuit_breaker is not None:
+		logging.info(circuit_breaker.get_stats_desc())
 	logging.info("Command 'cascade-acl' finished with " + str(cascader.get_errors_count()) + " error(s).")
 	print("Done with " + str(cascader.get_errors_count()) + " error(s). Please review log file for details.")
 
 
 def describe_job(config):
 	logging.info("Executing command 'describe-job'.")
-	dremio = Dremio(config.source_endpoint, config.source_username, config.source_password, False, config.http_timeout, verify_ssl=config.source_verify_ssl)
+	circuit_breaker = create_circuit_breaker(config)
+	dremio = Dremio(config.source_endpoint, config.source_username, config.source_password, False, config.http_timeout, retry_timedout_source=config.source_retry_timedout, verify_ssl=config.source_verify_ssl, http_pool_size=config.http_pool_size, rate_limiter=create_rate_limiter(config.source_rate_limit, config.source_max_concurrency, config.source_latency_target_ms), retry_policy=create_retry_policy(config), circuit_breaker=circuit_breaker)
 	describer = DremioDescribeJob(dremio, config)
 	if config.target_type == 'sql-dependencies':
 		dremio_data = describer.describe_job_sql_dependencies()
 	else:
 		print_usage()
+	if circuit_breaker is not None:
+		logging.info(circuit_breaker.get_stats_desc())
 
 
 def delete_objects(config):
 	logging.info("Executing command '" + DremioClonerConfig.CMD_DELETE + "'.")
-	dremio = Dremio(config.target_endpoint, config.target_username, config.target_password, False, config.http_timeout, verify_ssl=config.target_verify_ssl)
+	circuit_breaker = create_circuit_breaker(config)
+	dremio = Dremio(config.target_endpoint, config.target_username, config.target_password, False, config.http_timeout, retry_timedout_source=config.source_retry_timedout, verify_ssl=config.target_verify_ssl, http_pool_size=config.http_pool_size, rate_limiter=create_rate_limiter(config.target_rate_limit, config.target_max_concurrency, config.target_latency_target_ms), retry_policy=create_retry_policy(config), circuit_breaker=circuit_breaker)
 	deleter = DremioDelete(dremio, config)
 	deleter.delete()
+	if circuit_breaker is not None:
+		logging.info(circuit_breaker.get_stats_desc())
 	logging.info("Command '" + DremioClonerConfig.CMD_DELETE + "' finished with " + str(deleter.get_errors_count()) + " error(s).")
 	print("Done with " + str(deleter.get_errors_count()) + " error(s). Please review log file for details.")
 
 
+# Throttling of the API calls to a Dremio environment, None if not configured
+def create_rate_limiter(rate_limit, max_concurrency, latency_target_ms):
+	if rate_limit <= 0 and max_concurrency <= 0:
+		return None
+	return DremioRateLimiter(rate_limit, max_concurrency, latency_target_ms / 1000.0)
+
+
+# Retries of API calls failing with a transient error, None if not configured
+def create_retry_policy(config):
+	if config.api_retry_max_attempts <= 1:
+		return None
+	return DremioRetryPolicy(config.api_retry_max_attempts, config.api_retry_backoff_ms / 1000.0, config.api_retry_max_backoff_ms / 1000.0,
+							 config.api_retry_jitter, config.api_retry_status_codes)
+
+
+# Skips API calls to Sources that are not responding, None if Sources are always retried
+def create_circuit_breaker(config):
+	if config.source_retry_timedout:
+		return None
+	return DremioCircuitBreaker(config.source_circuit_breaker_failures, config.source_circuit_breaker_cool_down)
+
+
+# Progress journal used to resume an interrupted get or put, None if not configured
+def open_checkpoint(config):
+	if config.checkpoint_filename is None:
+		return None
+	checkpoint = DremioCheckpoint(config)
+	checkpoint.open()
+	return checkpoint
+
+
 def obtain_password(config, argv):
 	# Try to get the password from the parameters first
 	if len(argv) == 4:
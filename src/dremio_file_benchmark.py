@@ -0,0 +1,130 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+# Compares the serial and the parallel directory export and import of DremioFile on a generated environment.
+# Both runs must produce identical directories and identical data read back from them.
+
+from DremioData import DremioData
+from DremioFile import DremioFile
+from DremioClonerConfig import DremioClonerConfig
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def main():
+	if len(sys.argv) < 2 or len(sys.argv) > 4:
+		print_usage()
+		return
+	vds_count = int(sys.argv[1])
+	concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+	file_processes = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+	with tempfile.TemporaryDirectory() as work_directory:
+		config = create_config(work_directory)
+		dremio_data = generate_dremio_data(vds_count)
+		serial = run(config, dremio_data, os.path.join(work_directory, 'serial'), 1, 0)
+		parallel = run(config, dremio_data, os.path.join(work_directory, 'parallel'), concurrency, file_processes)
+	print("%d VDSs, %d files" % (vds_count, serial['files']))
+	print("%-40s %10s %10s" % ("", "save (s)", "read (s)"))
+	print("%-40s %10.2f %10.2f" % ("serial", serial['save'], serial['read']))
+	print("%-40s %10.2f %10.2f" % ("concurrency %d, file.processes %d" % (concurrency, file_processes), parallel['save'], parallel['read']))
+	if serial['directory_digest'] != parallel['directory_digest']:
+		print("ERROR: saved directories differ.")
+	elif serial['data_digest'] != parallel['data_digest']:
+		print("ERROR: data read from directories differs.")
+	else:
+		print("Saved directories and data read from them are identical.")
+
+
+def print_usage():
+	print("""usage: dremio_file_benchmark vds_count [concurrency [file_processes]]""")
+
+
+def create_config(work_directory):
+	config_filename = os.path.join(work_directory, 'config.json')
+	f = open(config_filename, "w", encoding="utf-8")
+	json.dump({'dremio_get_config': [
+		{'command': 'get'},
+		{'source': [{'endpoint': 'http://localhost:9047/'}, {'username': 'benchmark'}, {'password': 'benchmark'}]},
+		{'target': [{'directory': os.path.join(work_directory, 'unused')}]},
+		{'options': [{'logging.level': 'logging.WARN'}, {'logging.filename': os.path.join(work_directory, 'benchmark.log')},
+					 {'space.process_mode': 'process'}, {'folder.process_mode': 'process'}, {'vds.process_mode': 'process'},
+					 {'wiki.process_mode': 'process'}, {'tag.process_mode': 'process'}]}]}, f)
+	f.close()
+	return DremioClonerConfig(config_filename)
+
+
+def generate_dremio_data(vds_count):
+	dremio_data = DremioData()
+	dremio_data.spaces = []
+	dremio_data.folders = []
+	dremio_data.vds_list = []
+	dremio_data.wikis = []
+	dremio_data.tags = []
+	for i in range(max(1, vds_count // 1000)):
+		dremio_data.spaces.append({'id': 'space-%d' % i, 'entityType': 'space', 'name': 'Space%d' % i, 'children': []})
+	for i in range(max(1, vds_count // 20)):
+		space = dremio_data.spaces[i % len(dremio_data.spaces)]
+		dremio_data.folders.append({'id': 'folder-%d' % i, 'entityType': 'folder', 'path': [space['name'], 'Folder%d' % i], 'children': []})
+	for i in range(vds_count):
+		folder = dremio_data.folders[i % len(dremio_data.folders)]
+		vds = {'id': 'vds-%d' % i, 'entityType': 'dataset', 'type': 'VIRTUAL_DATASET', 'path': folder['path'] + ['View%d' % i],
+			   'sql': 'SELECT * FROM "Source"."table_%d" WHERE id > %d' % (i, i), 'sqlContext': folder['path'],
+			   'fields': [{'name': 'column_%d' % j, 'type': {'name': 'VARCHAR'}} for j in range(20)]}
+		dremio_data.vds_list.append(vds)
+		if i % 4 == 0:
+			dremio_data.wikis.append({'entity_id': vds['id'], 'path': vds['path'], 'text': 'Description of ' + vds['path'][-1], 'version': 0})
+			dremio_data.tags.append({'entity_id': vds['id'], 'path': vds['path'], 'tags': ['benchmark'], 'version': 0})
+	return dremio_data
+
+
+def run(config, dremio_data, directory, concurrency, file_processes):
+	config.concurrency = concurrency
+	config.file_processes = file_processes
+	config.target_directory = directory
+	config.source_directory = directory
+	file = DremioFile(config)
+	start = time.time()
+	file.save_dremio_environment_as_directory(dremio_data)
+	save_time = time.time() - start
+	start = time.time()
+	read_data = file.read_dremio_environment_from_directory()
+	read_time = time.time() - start
+	files, directory_digest = get_directory_digest(directory)
+	data_digest = hashlib.sha256(json.dumps([read_data.spaces, read_data.folders, read_data.vds_list, read_data.wikis, read_data.tags]).encode('utf-8')).hexdigest()
+	return {'save': save_time, 'read': read_time, 'files': files, 'directory_digest': directory_digest, 'data_digest': data_digest}
+
+
+def get_directory_digest(directory):
+	digest = hashlib.sha256()
+	files = 0
+	for (dirpath, dirnames, filenames) in os.walk(directory):
+		dirnames.sort()
+		for filename in sorted(filenames):
+			filepath = os.path.join(dirpath, filename)
+			digest.update(os.path.relpath(filepath, directory).encode('utf-8'))
+			f = open(filepath, "rb")
+			digest.update(f.read())
+			f.close()
+			files += 1
+	return files, digest.hexdigest()
+
+
+if __name__ == "__main__":
+	main()
@@ -5,6 +5,7 @@ from mo_sql_parsing import parse
 from mo_sql_parsing import format
 import sqlparse
 
+import parse_sql
 from DremioFile import DremioFile
 from DremioClonerConfig import DremioClonerConfig
 import json
@@ -267,11 +268,13 @@ def main():
     # Parse SQL in VDS list
     new_vds_list = []
     error_idx = 1
-    for vds in dremio_data.vds_list:
+    sql_list = [replace_slashed_comments(vds['sql']) for vds in dremio_data.vds_list]
+    parsed_sql_list = parse_sql.parse_queries(sql_list, config.sql_processes)
+    for vds, sql, parsed_sql in zip(dremio_data.vds_list, sql_list, parsed_sql_list):
         try:
             print("PARSING SQL - VDS migration: " + '.'.join(vds['path']))
-            sql = replace_slashed_comments(vds['sql'])
-            vds['parsedSql'] = parse(sql)
+            # SQL that could not be parsed is parsed again to report the error
+            vds['parsedSql'] = parsed_sql if parsed_sql is not None else parse(sql)
             new_vds_list.append(vds)
         except ParseException as e:
             content = build_error_message_sql_parse(e, vds)
@@ -16,18 +16,26 @@
 ########
 
 from mo_sql_parsing import parse
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
 import json, re
+import threading
 
-tablist = []
-def traverse(v, prefix=''):
+# mo_sql_parsing keeps parser state between calls, queries are parsed one at a time
+_parse_lock = threading.Lock()
+
+def traverse(v, prefix='', tablist=None):
+    if tablist is None:
+        tablist = []
     if isinstance(v, dict):
         for k, v2 in v.items():
             p2 = "{}['{}']".format(prefix, k)
-            traverse(v2, p2)
+            traverse(v2, p2, tablist)
     elif isinstance(v, list):
         for i, v2 in enumerate(v):
             p2 = "{}".format(prefix)
-            traverse(v2, p2)
+            traverse(v2, p2, tablist)
     else:
         if (prefix.endswith("['from']['value']") 
             or prefix.endswith("['from']") 
@@ -99,7 +107,8 @@ def tables_in_query_a(sql):
 	# remove trailing -- and # comments
     sql = " ".join([re.split("--|#", line)[0] for line in lines])
 
-    parsed_query = parse(sql)
+    with _parse_lock:
+        parsed_query = parse(sql)
     # print(parsed_query)
     tables = traverse(parsed_query)
 
@@ -109,4 +118,94 @@ def tables_in_query(sql):
     try:
         return tables_in_query_a(sql)
     except:
-        return tables_in_query_b(sql)
\ No newline at end of file
+        return tables_in_query_b(sql)
+
+# Tables referenced by every SQL of sql_list, in the order of sql_list.
+# SQL is parsed by a pool of processes when processes is greater than 0.
+def tables_in_queries(sql_list, processes=0):
+    return _map(tables_in_query, sql_list, processes)
+
+# Parsed SQL of every SQL of sql_list, in the order of sql_list, None for SQL that could not be parsed.
+# SQL is parsed by a pool of processes when processes is greater than 0.
+def parse_queries(sql_list, processes=0):
+    return _map(_parse_query, sql_list, processes)
+
+def _parse_query(sql):
+    try:
+        return parse(sql)
+    except Exception:
+        return None
+
+def _map(fn, sql_list, processes):
+    if processes > 0 and len(sql_list) > 1:
+        # Several queries per task keep the process pool overhead low
+        chunksize = max(1, len(sql_list) // (processes * 4))
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            return list(executor.map(fn, sql_list, chunksize=chunksize))
+    return [fn(sql) for sql in sql_list]
+
+
+###
+# Thread-safe tables_in_query with an LRU cache keyed by a hash of the SQL, so that the SQL of a VDS
+# is parsed once however many times its dependencies are needed. Every caller gets its own copy of the result.
+###
+class SqlTableExtractor:
+
+    _max_size = None
+    _cache = None
+    _lock = None
+    # Processes parsing SQL passed to tables_in_queries, 0 to parse in the calling thread
+    _processes = 0
+
+    _hits = 0
+    _misses = 0
+
+    def __init__(self, max_size=100000, processes=0):
+        self._max_size = max_size
+        self._processes = processes
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def tables_in_query(self, sql):
+        key = hashlib.sha256(sql.encode('utf-8')).digest()
+        with self._lock:
+            tables = self._cache.get(key)
+            if tables is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return list(tables)
+            self._misses += 1
+        tables = tables_in_query(sql)
+        with self._lock:
+            self._cache[key] = tuple(tables)
+            if len(self._cache) > self._max_size:
+                self._cache.popitem(last=False)
+        return list(tables)
+
+    # Parses in bulk the SQL of sql_list that is not cached yet, returns tables referenced by every SQL in order
+    def tables_in_queries(self, sql_list):
+        keys = [hashlib.sha256(sql.encode('utf-8')).digest() for sql in sql_list]
+        results = {}
+        missing = {}
+        with self._lock:
+            for key, sql in zip(keys, sql_list):
+                if key in results or key in missing:
+                    continue
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    results[key] = self._cache[key]
+                else:
+                    missing[key] = sql
+            self._hits += len(keys) - len(missing)
+            self._misses += len(missing)
+        parsed = tables_in_queries(list(missing.values()), self._processes)
+        with self._lock:
+            for key, tables in zip(missing, parsed):
+                results[key] = tuple(tables)
+                self._cache[key] = results[key]
+            while len(self._cache) > self._max_size:
+                self._cache.popitem(last=False)
+        return [list(results[key]) for key in keys]
+
+    def get_stats_desc(self):
+        return "SQL parsing: " + str(self._misses) + " quer(ies) parsed, " + str(self._hits) + " served from cache"
@@ -0,0 +1,115 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import logging
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioCatalogSnapshot import DremioCatalogSnapshot
+
+
+# Target catalog of the tests: entity id -> entity
+CATALOG = {
+	'sp': {'id': 'sp', 'entityType': 'space', 'path': ['Space'], 'children': [
+		{'id': 'f1', 'path': ['Space', 'F1'], 'type': 'CONTAINER', 'containerType': 'FOLDER'},
+		{'id': 'v1', 'path': ['Space', 'V1'], 'type': 'DATASET', 'datasetType': 'VIRTUAL'}]},
+	'f1': {'id': 'f1', 'entityType': 'folder', 'path': ['Space', 'F1'], 'children': [
+		{'id': 'f2', 'path': ['Space', 'F1', 'F2'], 'type': 'CONTAINER', 'containerType': 'FOLDER'}]},
+	'f2': {'id': 'f2', 'entityType': 'folder', 'path': ['Space', 'F1', 'F2'], 'children': [
+		{'id': 'v2', 'path': ['Space', 'F1', 'F2', 'V2'], 'type': 'DATASET', 'datasetType': 'VIRTUAL'}]},
+	'v1': {'id': 'v1', 'entityType': 'dataset', 'path': ['Space', 'V1']},
+	'v2': {'id': 'v2', 'entityType': 'dataset', 'path': ['Space', 'F1', 'F2', 'V2']},
+}
+
+
+class FakeDremio:
+
+	def __init__(self, failing_ids):
+		# Lookups by id of these entities fail once, while the snapshot is loaded
+		self.failing_ids = set(failing_ids)
+		self.by_path = []
+
+	def list_catalog(self):
+		return {'data': [{'id': 'sp', 'path': ['Space'], 'type': 'CONTAINER', 'containerType': 'SPACE'}]}
+
+	def get_catalog_entity_by_id(self, entity_id):
+		if entity_id in self.failing_ids:
+			self.failing_ids.discard(entity_id)
+			return None
+		return CATALOG.get(entity_id)
+
+	def get_catalog_entity_by_path(self, path):
+		self.by_path.append(path)
+		for entity in CATALOG.values():
+			if '/'.join(entity['path']).lower() == path.lower():
+				return entity
+		return None
+
+
+class DremioCatalogSnapshotTest(unittest.TestCase):
+
+	def _load(self, failing_ids=()):
+		self.dremio = FakeDremio(failing_ids)
+		config = SimpleNamespace(max_errors=9999, logging_verbose=False, concurrency=2)
+		snapshot = DremioCatalogSnapshot(self.dremio, config)
+		logging.disable(logging.CRITICAL)
+		try:
+			snapshot.load()
+		finally:
+			logging.disable(logging.NOTSET)
+		return snapshot
+
+	def test_missing_paths_under_crawled_containers_are_answered(self):
+		snapshot = self._load()
+		self.assertEqual(snapshot.get_catalog_entity_by_path('Space/F1/F2/V2'), CATALOG['v2'])
+		self.assertIsNone(snapshot.get_catalog_entity_by_path('Space/F1/F2/Missing'))
+		self.assertIsNone(snapshot.get_catalog_entity_by_path('Other'))
+		self.assertEqual(self.dremio.by_path, [])
+
+	def test_paths_under_failed_sub_folder_are_looked_up(self):
+		snapshot = self._load(failing_ids=['f2'])
+		self.assertEqual(snapshot.get_catalog_entity_by_path('Space/F1/F2/V2'), CATALOG['v2'])
+		self.assertIsNone(snapshot.get_catalog_entity_by_path('Space/F1/F2/Missing'))
+		self.assertEqual(self.dremio.by_path, ['Space/F1/F2/V2', 'Space/F1/F2/Missing'])
+		# The failed folder itself was listed by its parent
+		self.assertEqual(snapshot.get_catalog_entity_by_path('Space/F1/F2'), CATALOG['f2'])
+
+	def test_paths_under_failed_folder_are_looked_up(self):
+		snapshot = self._load(failing_ids=['f1'])
+		self.assertEqual(snapshot.get_catalog_entity_by_path('Space/F1/F2/V2'), CATALOG['v2'])
+		self.assertEqual(self.dremio.by_path, ['Space/F1/F2/V2'])
+		self.assertIsNone(snapshot.get_catalog_entity_by_path('Space/Missing'))
+		self.assertEqual(len(self.dremio.by_path), 1)
+
+	def test_created_folder_is_empty(self):
+		snapshot = self._load()
+		snapshot.update({'id': 'f3', 'entityType': 'folder', 'path': ['Space', 'F3'], 'children': []})
+		self.assertIsNone(snapshot.get_catalog_entity_by_path('Space/F3/V3'))
+		self.assertEqual(self.dremio.by_path, [])
+
+	def test_removed_folder_is_looked_up(self):
+		snapshot = self._load()
+		snapshot.remove(CATALOG['f1'])
+		snapshot.get_catalog_entity_by_path('Space/F1/F2/Missing')
+		self.assertEqual(self.dremio.by_path, ['Space/F1/F2/Missing'])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,100 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from Dremio import Dremio
+from DremioCircuitBreaker import DremioCircuitBreaker
+
+
+# Catalog of the tests: entity id -> entity, NAS is not responding
+CATALOG = {
+	'': {'data': [{'id': 'nas', 'path': ['NAS'], 'type': 'CONTAINER'}, {'id': 's3', 'path': ['S3'], 'type': 'CONTAINER'}]},
+	'nas': {'id': 'nas', 'path': ['NAS'], 'children': [{'id': 'nas-f1', 'path': ['NAS', 'F1']}, {'id': 'nas-f2', 'path': ['NAS', 'F2']}]},
+	's3': {'id': 's3', 'path': ['S3'], 'children': [{'id': 's3-f1', 'path': ['S3', 'F1']}]},
+	's3-f1': {'id': 's3-f1', 'path': ['S3', 'F1']},
+}
+NOT_RESPONDING = ['nas-f1', 'nas-f2']
+
+
+class FakeResponse:
+
+	def __init__(self, status_code, json_data):
+		self.status_code = status_code
+		self._json = json_data
+
+	def json(self):
+		return self._json
+
+
+class FakeHttpSession:
+
+	def __init__(self, *args):
+		self.urls = []
+
+	def request(self, method, url, **kwargs):
+		if url.endswith('apiv2/login'):
+			return FakeResponse(200, {'token': 'token'})
+		self.urls.append(url)
+		entity_id = url.split('api/v3/catalog/')[1]
+		if entity_id in NOT_RESPONDING:
+			raise requests.exceptions.Timeout()
+		return FakeResponse(200, CATALOG[entity_id])
+
+
+class DremioCircuitBreakerTest(unittest.TestCase):
+
+	def setUp(self):
+		self.breaker = DremioCircuitBreaker(1, 60)
+		with mock.patch('Dremio.DremioHttpSession', FakeHttpSession):
+			self.dremio = Dremio('http://localhost:9047/', 'user', 'password', False, circuit_breaker=self.breaker)
+
+	def test_by_path_urls_are_resolved(self):
+		self.assertEqual(self.dremio._get_source_name('api/v3/catalog/by-path/NAS/F1'), 'NAS')
+
+	def test_unknown_ids_are_not_resolved(self):
+		self.assertIsNone(self.dremio._get_source_name('api/v3/catalog/unknown'))
+		self.assertIsNone(self.dremio._get_source_name('api/v3/reflection/nas'))
+
+	def test_ids_are_resolved_from_catalog_responses(self):
+		self.dremio.list_catalog()
+		self.assertEqual(self.dremio._get_source_name('api/v3/catalog/nas'), 'NAS')
+		self.dremio.get_catalog_entity_by_id('nas')
+		self.assertEqual(self.dremio._get_source_name('api/v3/catalog/nas-f2'), 'NAS')
+		self.assertEqual(self.dremio._get_source_name('api/v3/catalog/nas-f2/collaboration/wiki'), 'NAS')
+
+	def test_by_id_calls_to_not_responding_source_are_skipped(self):
+		self.dremio.list_catalog()
+		self.dremio.get_catalog_entity_by_id('nas')
+		self.dremio.get_catalog_entity_by_id('s3')
+		self.assertIsNone(self.dremio.get_catalog_entity_by_id('nas-f1'))
+		self.assertEqual(self.breaker.get_state('NAS'), DremioCircuitBreaker.OPEN)
+		self.dremio._http.urls = []
+		self.assertIsNone(self.dremio.get_catalog_entity_by_id('nas-f2'))
+		self.assertEqual(self.dremio._http.urls, [])
+		self.assertEqual(self.dremio.get_catalog_entity_by_id('s3-f1'), CATALOG['s3-f1'])
+		self.assertEqual(self.breaker.get_state('S3'), DremioCircuitBreaker.CLOSED)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,110 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import logging
+import os
+import sys
+import threading
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioClonerLogger import DremioClonerLogger
+from DremioDeletionPlanner import DremioDeletionPlanner
+
+
+def entity(path, dependencies=()):
+	return {'path': path.split('/'), 'dependencies': list(dependencies)}
+
+
+def get_dependency_paths(vds):
+	return vds['dependencies']
+
+
+class DremioDeletionPlannerTest(unittest.TestCase):
+
+	def setUp(self):
+		logging.disable(logging.CRITICAL)
+
+	def tearDown(self):
+		logging.disable(logging.NOTSET)
+
+	def _planner(self, concurrency=1, max_errors=9999):
+		config = SimpleNamespace(max_errors=max_errors, logging_verbose=False, vds_max_hierarchy_depth=100, concurrency=concurrency)
+		return DremioDeletionPlanner(config)
+
+	def _wave_paths(self, waves):
+		return [['/'.join(item['path']) for item in wave] for wave in waves]
+
+	def test_dependents_are_deleted_first(self):
+		target = [entity('S/A'), entity('S/B', ['S/A']), entity('S/C', ['S/B']), entity('S/D', ['S/A']), entity('S/Kept')]
+		waves = self._planner().plan_vds(target, [entity('S/Kept')], get_dependency_paths)
+		self.assertEqual(self._wave_paths(waves), [['S/C'], ['S/B', 'S/D'], ['S/A']])
+
+	def test_cyclic_and_unordered_vds_are_deleted_first_one_at_a_time(self):
+		target = [entity('S/A', ['S/B']), entity('S/B', ['S/A']), entity('S/C', ['S/A']), entity('S/D'), entity('S/E', ['S/D'])]
+		waves = self._planner().plan_vds(target, [], get_dependency_paths)
+		self.assertEqual(self._wave_paths(waves), [['S/A'], ['S/B'], ['S/C'], ['S/E'], ['S/D']])
+
+	def test_nothing_to_delete(self):
+		target = [entity('S/A')]
+		self.assertEqual(self._planner().plan_vds(target, [entity('S/A')], get_dependency_paths), [])
+		self.assertEqual(self._planner().plan_folders(target, [entity('S/A')]), [])
+		self.assertEqual(self._planner().plan_reflections([], []), [])
+
+	def test_folders_are_deleted_deepest_first(self):
+		target = [entity('S/F1'), entity('S/F1/F2'), entity('S/F3'), entity('S/F1/F2/F4'), entity('S/F5')]
+		waves = self._planner().plan_folders(target, [entity('S/F5')])
+		self.assertEqual(self._wave_paths(waves), [['S/F1/F2/F4'], ['S/F1/F2'], ['S/F1', 'S/F3']])
+
+	def test_unmatched_ignores_none_and_duplicates(self):
+		target = [None, entity('S/A'), entity('S/B'), None, entity('S/A'), entity('S/C')]
+		unmatched = self._planner()._get_unmatched(target, {('S', 'B')}, lambda item: tuple(item['path']))
+		self.assertEqual(self._wave_paths([unmatched]), [['S/A', 'S/C']])
+
+	def test_reflections_are_matched_by_path_and_name(self):
+		target = [{'path': ['S', 'A'], 'name': 'r1'}, {'path': ['S', 'A'], 'name': 'r2'}]
+		waves = self._planner().plan_reflections(target, [{'path': ['S', 'A'], 'name': 'r1'}])
+		self.assertEqual(waves, [[target[1]]])
+
+	def test_execute_deletes_waves_in_order(self):
+		waves = [[1, 2, 3], [4], [5, 6]]
+		for concurrency in [1, 4]:
+			deleted = []
+			lock = threading.Lock()
+			def delete(item):
+				with lock:
+					deleted.append(item)
+			self._planner(concurrency=concurrency).execute(waves, delete)
+			self.assertEqual(sorted(deleted[0:3]), [1, 2, 3])
+			self.assertEqual(deleted[3], 4)
+			self.assertEqual(sorted(deleted[4:]), [5, 6])
+
+	def test_execute_propagates_worker_errors(self):
+		logger = DremioClonerLogger(1, False)
+		deleted = []
+		def delete(item):
+			deleted.append(item)
+			logger.error("could not delete " + str(item))
+		with self.assertRaises(RuntimeError):
+			self._planner(concurrency=4).execute([[1], [2], [3], [4]], delete)
+		# Waves after the failing one are not started
+		self.assertEqual(deleted, [1, 2])
+
+
+if __name__ == '__main__':
+	unittest.main()
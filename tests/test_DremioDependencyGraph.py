@@ -0,0 +1,120 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import logging
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioDependencyGraph import DremioDependencyGraph
+
+
+# Existing datasets that are not in the VDS list
+EXISTING_DATASETS = ['Source/Table']
+
+
+def vds(path, dependencies, sql_context=None):
+	entity = {'path': path.split('/'), 'dependencies': dependencies}
+	if sql_context is not None:
+		entity['sqlContext'] = sql_context.split('/')
+	return entity
+
+
+class DremioDependencyGraphTest(unittest.TestCase):
+
+	def _graph(self, vds_list, max_depth=100):
+		config = SimpleNamespace(max_errors=9999, logging_verbose=False, vds_max_hierarchy_depth=max_depth)
+		logging.disable(logging.CRITICAL)
+		try:
+			return DremioDependencyGraph(vds_list, config, lambda entity: entity['dependencies'], lambda path: path in EXISTING_DATASETS)
+		finally:
+			logging.disable(logging.NOTSET)
+
+	def _paths(self, vds_list):
+		return ['/'.join(entity['path']) for entity in vds_list]
+
+	def _level_paths(self, graph):
+		return [self._paths(level) for level in graph.get_levels()]
+
+	def test_linear_chain(self):
+		graph = self._graph([
+			vds('S/C', ['S/B']),
+			vds('S/B', ['S/A']),
+			vds('S/A', ['Source/Table'])])
+		self.assertEqual(self._level_paths(graph), [['S/A'], ['S/B'], ['S/C']])
+		self.assertEqual(graph.get_unresolved(), [])
+		self.assertEqual(graph.get_unordered(), [])
+		self.assertEqual(graph.get_cycles(), [])
+
+	def test_diamond(self):
+		graph = self._graph([
+			vds('S/D', ['S/B', 'S/C']),
+			vds('S/B', ['S/A']),
+			vds('S/C', ['S/A']),
+			vds('S/A', [])])
+		self.assertEqual(self._level_paths(graph), [['S/A'], ['S/B', 'S/C'], ['S/D']])
+		self.assertEqual([graph.get_vds(i)['path'][1] for i in graph.get_leveled_positions()], ['A', 'B', 'C', 'D'])
+		self.assertEqual(graph.get_dependency_count(0), 2)
+		self.assertEqual(graph.get_leveled_dependents(3), [1, 2])
+
+	def test_two_node_cycle(self):
+		graph = self._graph([
+			vds('S/A', ['S/B']),
+			vds('S/B', ['S/A']),
+			vds('S/C', ['S/A']),
+			vds('S/D', [])])
+		self.assertEqual(self._level_paths(graph), [['S/D']])
+		self.assertEqual(self._paths(graph.get_cycles()), ['S/A', 'S/B'])
+		# Depending on a cycle leaves a VDS unordered, but not on the cycle
+		self.assertEqual(self._paths(graph.get_unordered()), ['S/A', 'S/B', 'S/C'])
+		self.assertEqual(graph.get_unresolved(), [])
+
+	def test_unresolved_dependency(self):
+		graph = self._graph([
+			vds('S/A', ['Source/Missing']),
+			vds('S/B', ['S/A']),
+			vds('S/C', ['Source/Table'])])
+		self.assertEqual(self._paths(graph.get_unresolved()), ['S/A'])
+		self.assertEqual(self._level_paths(graph), [['S/C']])
+		self.assertEqual(self._paths(graph.get_unordered()), ['S/B'])
+		self.assertEqual(graph.get_cycles(), [])
+
+	def test_relative_paths_use_sql_context(self):
+		graph = self._graph([
+			vds('S/F/B', ['A'], sql_context='S/F'),
+			vds('S/F/A', ['Table'], sql_context='Source'),
+			vds('S/C', ['A'])])
+		self.assertEqual(self._level_paths(graph), [['S/F/A'], ['S/F/B']])
+		# Without SQL context the relative path does not resolve
+		self.assertEqual(self._paths(graph.get_unresolved()), ['S/C'])
+
+	def test_max_hierarchy_depth(self):
+		graph = self._graph([
+			vds('S/A', []),
+			vds('S/B', ['S/A']),
+			vds('S/C', ['S/B']),
+			vds('S/D', ['S/C'])], max_depth=2)
+		self.assertEqual(self._level_paths(graph), [['S/A'], ['S/B']])
+		self.assertEqual(self._paths(graph.get_unordered()), ['S/C', 'S/D'])
+		self.assertEqual(graph.get_cycles(), [])
+		self.assertEqual(graph.get_leveled_dependents(1), [])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,124 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import copy
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioEntityDiff import DremioEntityDiff
+
+
+# VDS about to be written, with ACL mapped to the target environment
+VDS = {
+	'entityType': 'dataset', 'type': 'VIRTUAL_DATASET', 'path': ['Space', 'V1'],
+	'sql': 'SELECT * FROM Source.T1', 'sqlContext': ['Space'],
+	'accessControlList': {'users': [{'id': 'u1', 'permissions': ['SELECT', 'ALTER']}, {'id': 'u2', 'permissions': ['SELECT']}],
+		'groups': [{'id': 'g1', 'permissions': ['SELECT']}]},
+}
+
+# PDS about to be written
+PDS = {
+	'entityType': 'dataset', 'type': 'PHYSICAL_DATASET', 'path': ['Source', 'T1'],
+	'format': {'type': 'Parquet'},
+	'accelerationRefreshPolicy': {'refreshPeriodMs': 3600000, 'gracePeriodMs': 10800000, 'method': 'FULL'},
+}
+
+
+def existing(entity):
+	# Entity as retrieved from the target environment, with attributes assigned by Dremio
+	existing_entity = copy.deepcopy(entity)
+	existing_entity['id'] = 'id-in-target'
+	existing_entity['tag'] = 'tag-in-target'
+	existing_entity['createdAt'] = '2020-01-01T00:00:00.000Z'
+	existing_entity['children'] = [{'id': 'child'}]
+	existing_entity['fields'] = [{'name': 'c1', 'type': {'name': 'INTEGER'}}]
+	return existing_entity
+
+
+class DremioEntityDiffTest(unittest.TestCase):
+
+	def setUp(self):
+		self.diff = DremioEntityDiff()
+
+	def test_attributes_assigned_by_dremio_are_ignored(self):
+		self.assertTrue(self.diff.is_unchanged(VDS, existing(VDS)))
+		self.assertTrue(self.diff.is_unchanged(PDS, existing(PDS)))
+
+	def test_attributes_not_written_are_ignored(self):
+		existing_vds = existing(VDS)
+		existing_vds['owner'] = {'ownerId': 'u1', 'ownerType': 'USER'}
+		self.assertTrue(self.diff.is_unchanged(VDS, existing_vds))
+
+	def test_acl_order_and_version_are_ignored(self):
+		existing_vds = existing(VDS)
+		existing_vds['accessControlList'] = {'version': '3',
+			'groups': [{'id': 'g1', 'permissions': ['SELECT']}],
+			'users': [{'id': 'u2', 'permissions': ['SELECT']}, {'id': 'u1', 'permissions': ['ALTER', 'SELECT']}]}
+		self.assertTrue(self.diff.is_unchanged(VDS, existing_vds))
+
+	def test_missing_acl_is_empty_acl(self):
+		vds = copy.deepcopy(VDS)
+		del vds['accessControlList']
+		existing_vds = existing(vds)
+		existing_vds['accessControlList'] = {'version': '0', 'users': []}
+		self.assertTrue(self.diff.is_unchanged(vds, existing_vds))
+
+	def test_sql_change_is_detected(self):
+		existing_vds = existing(VDS)
+		existing_vds['sql'] = 'SELECT * FROM Source.T2'
+		self.assertFalse(self.diff.is_unchanged(VDS, existing_vds))
+
+	def test_sql_context_change_is_detected(self):
+		existing_vds = existing(VDS)
+		existing_vds['sqlContext'] = ['Other']
+		self.assertFalse(self.diff.is_unchanged(VDS, existing_vds))
+
+	def test_acl_grant_change_is_detected(self):
+		existing_vds = existing(VDS)
+		existing_vds['accessControlList']['users'][1]['permissions'] = ['SELECT', 'ALTER']
+		self.assertFalse(self.diff.is_unchanged(VDS, existing_vds))
+		existing_vds = existing(VDS)
+		del existing_vds['accessControlList']['groups']
+		self.assertFalse(self.diff.is_unchanged(VDS, existing_vds))
+
+	def test_format_change_is_detected(self):
+		existing_pds = existing(PDS)
+		existing_pds['format'] = {'type': 'Text', 'fieldDelimiter': ','}
+		self.assertFalse(self.diff.is_unchanged(PDS, existing_pds))
+
+	def test_acceleration_change_is_detected(self):
+		existing_pds = existing(PDS)
+		existing_pds['accelerationRefreshPolicy']['method'] = 'INCREMENTAL'
+		self.assertFalse(self.diff.is_unchanged(PDS, existing_pds))
+
+	def test_home_acl_is_ignored(self):
+		home = {'entityType': 'home', 'name': '@user', 'accessControlList': {'users': [{'id': 'u1', 'permissions': ['SELECT']}]}}
+		existing_home = existing(home)
+		existing_home['accessControlList'] = {'users': []}
+		self.assertTrue(self.diff.is_unchanged(home, existing_home))
+
+	def test_stats(self):
+		self.diff.count_created()
+		self.diff.count_updated()
+		self.diff.count_updated()
+		self.assertEqual(self.diff.get_stats_desc(), "entities: 1 created, 2 updated, 0 unchanged")
+
+
+if __name__ == '__main__':
+	unittest.main()
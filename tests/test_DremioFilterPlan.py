@@ -0,0 +1,166 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import fnmatch
+import os
+import re
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioClonerFilter import DremioClonerFilter
+from DremioFilterPlan import DremioFilterPlan
+
+
+FILTER_LISTS = [
+	[],
+	[''],
+	['F1'],
+	['F1/F2'],
+	['F1/'],
+	['F1/F2/F3/T1'],
+	['F1/F2', 'G*'],
+	['F*/F2', 'X'],
+	['F1/F2?', '[F]1/F3'],
+	['a.b/c', 'F1/F2'],
+	['F1/F2/F3', 'F1', 'X/Y'],
+	['*'],
+]
+
+PATHS = [
+	['S'],
+	['S', 'F1'],
+	['S', 'f1'],
+	['S', 'F2'],
+	['S', 'F1', 'F2'],
+	['S', 'F1', 'F2x'],
+	['S', 'F1', 'F3'],
+	['S', 'F1', 'F2', 'F3'],
+	['S', 'F1', 'F2', 'F3', 'T1'],
+	['S', 'F1', 'F2', 'F3', 'T2'],
+	['S', 'G1'],
+	['S', 'G1', 'H'],
+	['S', 'X'],
+	['S', 'X', 'Y'],
+	['S', 'X', 'Y', 'Z'],
+	['S', 'F', 'X'],
+	['S', 'Fx', 'F2'],
+	['S', 'a.b', 'c'],
+	['S', 'axb', 'c'],
+	['S', 'F1/F2'],
+	['S', 'F1/F2', 'F3'],
+	['S', '1/F2'],
+	['S', '2/F'],
+	['S', ''],
+]
+
+
+# String matching of DremioClonerFilter before filter paths were compiled, used as reference
+
+def _match(pattern, path):
+	return re.match(fnmatch.translate(pattern), path) is not None
+
+
+def reference_space_folder_paths(filters, path):
+	for space_folder_filter in filters:
+		for i in range(len(path)):
+			if _match(space_folder_filter, "/".join(path[1:len(path) - i])):
+				return True
+	return False
+
+
+def reference_source_folder_paths(filters, path):
+	for source_folder_filter in filters:
+		for i in range(len(path[1:])):
+			normalized_path = "/".join(path[1:len(path) - i])
+			if _match(source_folder_filter, normalized_path):
+				return True
+			if i == 0 and source_folder_filter.find(normalized_path) >= 0:
+				return True
+	return False
+
+
+def reference_vds_exclude_paths(filters, path):
+	for vds_exclude_filter in filters:
+		if _match(vds_exclude_filter, "/".join(path[1:])):
+			return True
+	return False
+
+
+class DremioFilterPlanTest(unittest.TestCase):
+
+	def _filter(self, filters):
+		config = SimpleNamespace(max_errors=9999, logging_verbose=False,
+			space_folder_filter_paths=filters, space_folder_exclude_filter_paths=filters,
+			source_folder_filter_paths=filters, vds_exclude_filter_paths=filters)
+		return DremioClonerFilter(config)
+
+	def _assert_same(self, name, filters, path, expected, actual):
+		self.assertEqual(actual, expected, name + " differs for filters " + str(filters) + " and path " + str(path))
+
+	def test_space_folder_filter_paths(self):
+		for filters in FILTER_LISTS:
+			cloner_filter = self._filter(filters)
+			for path in PATHS:
+				expected = filters == [] or reference_space_folder_paths(filters, path)
+				self._assert_same("space.folder.filter.paths", filters, path, expected, cloner_filter._match_listed_space_folder_filter_paths({'path': path}))
+
+	def test_space_folder_exclude_filter_paths(self):
+		for filters in FILTER_LISTS:
+			cloner_filter = self._filter(filters)
+			for path in PATHS:
+				expected = filters != [] and reference_space_folder_paths(filters, path)
+				self._assert_same("space.folder.exclude.filter.paths", filters, path, expected, cloner_filter._match_listed_space_folder_exclude_filter_paths({'path': path}))
+
+	def test_source_folder_filter_paths(self):
+		for filters in FILTER_LISTS:
+			cloner_filter = self._filter(filters)
+			for path in PATHS:
+				expected = filters == [] or reference_source_folder_paths(filters, path)
+				self._assert_same("source.folder.filter.paths", filters, path, expected, cloner_filter._match_listed_source_folder_paths({'path': path}))
+
+	def test_vds_exclude_filter_paths(self):
+		for filters in FILTER_LISTS:
+			cloner_filter = self._filter(filters)
+			for path in PATHS:
+				expected = filters != [] and reference_vds_exclude_paths(filters, path)
+				self._assert_same("vds.exclude.filter.paths", filters, path, expected, cloner_filter._match_listed_vds_exclude_filter_paths({'path': path}))
+
+	def test_entities_without_path(self):
+		cloner_filter = self._filter(['F1'])
+		self.assertFalse(cloner_filter._match_listed_space_folder_filter_paths({'name': 'S'}))
+		self.assertFalse(cloner_filter._match_listed_source_folder_paths({'name': 'S'}))
+		self.assertFalse(cloner_filter._match_listed_vds_exclude_filter_paths({'name': 'S'}))
+		cloner_filter = self._filter([])
+		self.assertTrue(cloner_filter._match_listed_space_folder_filter_paths({'name': 'S'}))
+		self.assertTrue(cloner_filter._match_listed_source_folder_paths({'name': 'S'}))
+
+	# Folders skipped by may_match_subtree must not contain a path matched by the filters
+	def test_may_match_subtree(self):
+		for filters in FILTER_LISTS:
+			plan = DremioFilterPlan(filters)
+			for path in PATHS:
+				if plan.may_match_subtree(path[1:]):
+					continue
+				for other_path in PATHS:
+					if other_path[:len(path)] == path:
+						self._assert_same("may_match_subtree", filters, other_path, False, reference_space_folder_paths(filters, other_path))
+
+
+if __name__ == '__main__':
+	unittest.main()
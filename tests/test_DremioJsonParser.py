@@ -0,0 +1,76 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import io
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioJsonParser import DremioJsonParser
+
+
+DOCUMENT = """{"data": [
+	{"dremio_environment": [{"file_version": "1.1", "endpoint": "http://localhost:9047/"}]},
+	{"vds_list": [{"id": "v1", "path": ["S", "F", "V1"], "values": [1, 2.5e3, -0.125, 3E-2, 10, 1.0e+10, 0]},
+		{"id": "v2", "path": ["S", "V2"], "flags": [true, false, null], "nested": {"a": {"b": [12345, "x,]}"]}}}]},
+	{"queues": []},
+	{"dremio_get_config": {"options": 42.75}},
+	{"empty": [{}]}
+], "version": 1.5e-3}"""
+
+
+class DremioJsonParserTest(unittest.TestCase):
+
+	def _parse(self, document, chunk_size):
+		parser = DremioJsonParser(io.StringIO(document))
+		parser._CHUNK_SIZE = chunk_size
+		return list(parser.iter_sections())
+
+	def _expected(self, document):
+		items = []
+		for section in json.loads(document)['data']:
+			for name, value in section.items():
+				if isinstance(value, list):
+					items.extend([(name, entity) for entity in value])
+				else:
+					items.append((name, value))
+		return items
+
+	def test_every_chunk_size_matches_json_load(self):
+		expected = self._expected(DOCUMENT)
+		for chunk_size in range(1, len(DOCUMENT) + 2):
+			self.assertEqual(self._parse(DOCUMENT, chunk_size), expected, "chunk size " + str(chunk_size))
+
+	def test_numbers_cut_at_chunk_boundary(self):
+		document = '{"data":[{"a":[1, 2.5e3, 2.5, 25, -7e-1]}]}'
+		for chunk_size in range(1, len(document) + 2):
+			self.assertEqual(self._parse(document, chunk_size), [('a', 1), ('a', 2500.0), ('a', 2.5), ('a', 25), ('a', -0.7)])
+
+	def test_empty_data(self):
+		self.assertEqual(self._parse('{"data": []}', 1), [])
+		self.assertEqual(self._parse('{}', 1), [])
+
+	def test_malformed_document_raises(self):
+		for document in ['{"data": [{"a": [1 2]}]}', '{"data": [{"a": [1,', '{"data": [{"a": [2.5e]}]}']:
+			with self.assertRaises(json.JSONDecodeError):
+				self._parse(document, 3)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,146 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DremioPathTrie import DremioPathTrie, split_name
+
+
+# Catalog of the tests, paths are case insensitive like Dremio catalog paths
+CATALOG = ['src', 'src/ab.c', 'src/ab.c/abc', 'src/folder', 'src/folder/sub', 'src/x"y']
+
+
+class FakeCatalog:
+
+	def __init__(self, paths):
+		self.paths = set([path.lower() for path in paths])
+		self.probed = []
+
+	def exists(self, path):
+		self.probed.append(path)
+		return path.lower() in self.paths
+
+
+class DremioPathTrieTest(unittest.TestCase):
+
+	def setUp(self):
+		self.catalog = FakeCatalog(CATALOG)
+		self.trie = DremioPathTrie(self.catalog.exists)
+
+	def test_normalize_probes_every_new_segment(self):
+		self.assertEqual(self.trie.normalize_name('src.ab.c.abc'), 'src/ab.c/abc/')
+		self.assertEqual(self.catalog.probed, ['src', 'src/ab', 'src/ab.c', 'src/ab.c/abc'])
+		self.assertEqual(self.trie.get_probes(), 4)
+
+	def test_shared_prefix_is_not_probed_again(self):
+		self.trie.normalize_name('src.ab.c.abc')
+		self.catalog.probed = []
+		self.assertEqual(self.trie.normalize_name('src.folder.sub'), 'src/folder/sub/')
+		self.assertEqual(self.catalog.probed, ['src/folder', 'src/folder/sub'])
+		self.catalog.probed = []
+		self.assertEqual(self.trie.normalize_name('src.ab.c.abc'), 'src/ab.c/abc/')
+		self.assertEqual(self.catalog.probed, [])
+
+	def test_insert_records_path_without_probing(self):
+		self.trie.insert(['src', 'ab.c', 'abc'])
+		self.assertEqual(self.catalog.probed, [])
+		self.assertEqual(self.trie.normalize_name('src."ab.c".abc'), 'src/ab.c/abc/')
+		self.assertEqual(self.catalog.probed, [])
+		# An unquoted name probes whether src/ab exists once
+		self.assertEqual(self.trie.normalize_name('src.ab.c.abc'), 'src/ab.c/abc/')
+		self.assertEqual(self.catalog.probed, ['src/ab'])
+		self.catalog.probed = []
+		self.assertEqual(self.trie.normalize_name('src.ab.c.abc'), 'src/ab.c/abc/')
+		self.assertEqual(self.catalog.probed, [])
+
+	def test_longest_prefix(self):
+		self.trie.normalize_name('src.ab.c')
+		self.catalog.probed = []
+		self.assertEqual(self.trie.longest_prefix(['src', 'ab', 'c', 'abc']), (3, 'src/ab.c/'))
+		self.assertEqual(self.trie.longest_prefix(['src', 'ab']), (2, 'src/ab.'))
+		self.assertEqual(self.trie.longest_prefix(['src']), (1, 'src/'))
+		self.assertEqual(self.catalog.probed, [])
+
+	def test_longest_prefix_stops_at_unprobed_name(self):
+		self.trie.insert(['src', 'ab.c'])
+		self.assertEqual(self.trie.longest_prefix(['src', 'ab', 'c']), (1, 'src/'))
+
+	def test_longest_prefix_no_match(self):
+		self.trie.insert(['src', 'folder'])
+		self.assertEqual(self.trie.longest_prefix(['other', 'folder']), (0, ''))
+		self.assertEqual(self.trie.longest_prefix([]), (0, ''))
+
+	def test_quoted_elements_are_not_probed(self):
+		self.assertEqual(self.trie.normalize_name('"src"."ab.c"."abc"'), 'src/ab.c/abc/')
+		self.assertEqual(self.catalog.probed, [])
+		self.assertEqual(self.trie.normalize_name('src."x""y"'), 'src/x"y/')
+		self.assertEqual(self.catalog.probed, [])
+
+	def test_quoted_and_unquoted_names_share_prefixes(self):
+		self.assertEqual(self.trie.normalize_name('src."ab.c"'), 'src/ab.c/')
+		self.assertEqual(self.catalog.probed, ['src'])
+		self.catalog.probed = []
+		self.assertEqual(self.trie.normalize_name('src.ab.c.abc'), 'src/ab.c/abc/')
+		self.assertEqual(self.catalog.probed, ['src/ab', 'src/ab.c/abc'])
+
+	def test_quoted_name_and_probed_folder_with_same_segment(self):
+		catalog = FakeCatalog(['src', 'src/ab', 'src/ab/x', 'src/ab.c'])
+		trie = DremioPathTrie(catalog.exists)
+		self.assertEqual(trie.normalize_name('src."ab.c"'), 'src/ab.c/')
+		self.assertEqual(trie.normalize_name('src.ab.x'), 'src/ab/x/')
+		self.assertEqual(catalog.probed, ['src', 'src/ab', 'src/ab/x'])
+		catalog.probed = []
+		self.assertEqual(trie.normalize_name('src."ab.c"'), 'src/ab.c/')
+		self.assertEqual(trie.normalize_name('src.ab.x'), 'src/ab/x/')
+		self.assertEqual(catalog.probed, [])
+
+	def test_probed_folder_does_not_split_quoted_name(self):
+		catalog = FakeCatalog(['src', 'src/ab', 'src/ab/x', 'src/ab.c'])
+		trie = DremioPathTrie(catalog.exists)
+		self.assertEqual(trie.normalize_name('src.ab.x'), 'src/ab/x/')
+		catalog.probed = []
+		self.assertEqual(trie.normalize_name('src."ab.c"'), 'src/ab.c/')
+		self.assertEqual(catalog.probed, [])
+
+	def test_case_variants_share_prefixes(self):
+		self.assertEqual(self.trie.normalize_name('SRC.Folder'), 'SRC/Folder/')
+		self.catalog.probed = []
+		self.assertEqual(self.trie.normalize_name('src.folder.Sub'), 'src/folder/Sub/')
+		self.assertEqual(self.catalog.probed, ['src/folder/Sub'])
+
+	def test_no_match_keeps_dots(self):
+		self.assertEqual(self.trie.normalize_name('missing.a.b'), 'missing.a.b.')
+		self.assertEqual(self.catalog.probed, ['missing', 'missing.a', 'missing.a.b'])
+		self.catalog.probed = []
+		self.assertEqual(self.trie.normalize_name('missing.a.b'), 'missing.a.b.')
+		self.assertEqual(self.catalog.probed, [])
+
+	def test_normalize_segments(self):
+		self.assertEqual(self.trie.normalize(['src', 'ab', 'c']), 'src/ab.c/')
+
+	def test_split_name(self):
+		self.assertEqual(split_name('abc."ab.c"."x""y"'), [('abc', False), ('ab.c', True), ('x"y', True)])
+		self.assertEqual(split_name('abc.ab.c'), [('abc', False), ('ab', False), ('c', False)])
+		self.assertEqual(split_name('a"b.c'), [('a"b', False), ('c', False)])
+		self.assertEqual(split_name(''), [('', False)])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,126 @@
+########
+# Copyright (C) 2019-2020 Dremio Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+########
+
+import logging
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from Dremio import Dremio
+from DremioPrincipalCache import DremioPrincipalCache
+
+
+USERS = {'u1': {'id': 'u1', 'name': 'alice'}}
+
+
+class FakeDremio:
+
+	def __init__(self, failing_ids):
+		# Requests for these users fail once
+		self.failing_ids = set(failing_ids)
+		self.requested = []
+
+	def get_user(self, user_id, not_found=None):
+		self.requested.append(user_id)
+		if user_id in self.failing_ids:
+			self.failing_ids.discard(user_id)
+			return None
+		return USERS.get(user_id, not_found)
+
+	def get_user_by_name(self, username, not_found=None):
+		self.requested.append(username)
+		for user in USERS.values():
+			if user['name'] == username:
+				return user
+		return not_found
+
+
+class FakeResponse:
+
+	def __init__(self, status_code, json_data):
+		self.status_code = status_code
+		self._json = json_data
+		self.text = ""
+
+	def json(self):
+		return self._json
+
+
+class FakeHttpSession:
+
+	def __init__(self, *args):
+		self.urls = []
+
+	def request(self, method, url, **kwargs):
+		if url.endswith('apiv2/login'):
+			return FakeResponse(200, {'token': 'token'})
+		self.urls.append(url)
+		user_id = url.split('api/v3/user/')[1]
+		if user_id == 'error':
+			return FakeResponse(500, {'errorMessage': 'error'})
+		if user_id not in USERS:
+			return FakeResponse(404, {'errorMessage': 'not found'})
+		return FakeResponse(200, USERS[user_id])
+
+
+class DremioPrincipalCacheTest(unittest.TestCase):
+
+	def test_principal_is_requested_once(self):
+		dremio = FakeDremio([])
+		cache = DremioPrincipalCache(dremio)
+		self.assertEqual(cache.get_user('u1'), USERS['u1'])
+		self.assertEqual(cache.get_user('u1'), USERS['u1'])
+		# Known by name once fetched by id
+		self.assertEqual(cache.get_user_by_name('alice'), USERS['u1'])
+		self.assertEqual(dremio.requested, ['u1'])
+		self.assertEqual(cache.get_stats_desc(), "principal cache: 2 hit(s), 1 miss(es)")
+
+	def test_not_found_is_cached(self):
+		dremio = FakeDremio([])
+		cache = DremioPrincipalCache(dremio)
+		self.assertIsNone(cache.get_user('u2'))
+		self.assertIsNone(cache.get_user('u2'))
+		self.assertEqual(dremio.requested, ['u2'])
+
+	def test_failed_request_is_not_cached(self):
+		dremio = FakeDremio(['u1'])
+		cache = DremioPrincipalCache(dremio)
+		self.assertIsNone(cache.get_user('u1'))
+		self.assertEqual(cache.get_user('u1'), USERS['u1'])
+		self.assertEqual(cache.get_user('u1'), USERS['u1'])
+		self.assertEqual(dremio.requested, ['u1', 'u1'])
+
+	def test_dremio_tells_not_found_from_failure(self):
+		with mock.patch('Dremio.DremioHttpSession', FakeHttpSession):
+			dremio = Dremio('http://localhost:9047/', 'user', 'password', False)
+		cache = DremioPrincipalCache(dremio)
+		logging.disable(logging.CRITICAL)
+		try:
+			self.assertIsNone(cache.get_user('u2'))
+			self.assertIsNone(cache.get_user('u2'))
+			self.assertIsNone(cache.get_user('error'))
+			self.assertIsNone(cache.get_user('error'))
+		finally:
+			logging.disable(logging.NOTSET)
+		self.assertEqual([url.split('/')[-1] for url in dremio._http.urls], ['u2', 'error', 'error'])
+		self.assertIsNone(dremio.get_user('u2'))
+
+
+if __name__ == '__main__':
+	unittest.main()